@@ -5,6 +5,7 @@
 # Salidas:  outputs/analysis/analisis_ABC.csv (opcional)
 
 import os
+import sys
 import pandas as pd
 
 # === 1. Cargar el archivo CSV ===
@@ -13,6 +14,9 @@ project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 data_dir = os.path.join(project_root, 'data')
 output_dir = os.path.join(project_root, 'outputs', 'analysis')
 
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+
 os.makedirs(output_dir, exist_ok=True)
 
 filename = 'sales_data_sample_clean.csv'
@@ -21,7 +25,9 @@ file_path = os.path.join(data_dir, filename)
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de tener el dataset en data/")
 
+traza.etapa('carga')
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
 # Confirmar tipos de producto disponibles
 print("Tipos de producto encontrados:", df['PRODUCTLINE'].unique())
@@ -42,6 +48,8 @@ catalog = [
 ]
 
 # === 3. Calcular las cantidades y valores totales por componente ===
+traza.etapa('agregacion')
+traza.filas(len(df))
 # Inicializamos un diccionario para acumular totales
 totals = {c["component"]: {"total_quantity": 0, "unit_cost": c["unit_cost"]} for c in catalog}
 
@@ -68,6 +76,8 @@ res = pd.DataFrame([
     for comp, v in totals.items()
 ])
 
+traza.etapa('clasificacion')
+traza.filas(len(res))
 # === 4. Ordenar y calcular porcentajes acumulados ===
 res = res.sort_values("total_value", ascending=False).reset_index(drop=True)
 res["cum_value"] = res["total_value"].cumsum()
@@ -100,6 +110,8 @@ print("\n=== RESUMEN POR COMPONENTE (cantidad × precio unitario) ===\n")
 summary = res[["component", "total_quantity", "unit_cost", "total_value"]]
 print(summary.to_string(index=False))
 
+traza.fin()
+
 # ============================
 # Fin del análisis
 # ============================
@@ -5,6 +5,8 @@
 # Salidas:  outputs/analysis/analisis_XYZ.csv (opcional)
 
 import os
+import sys
+import numpy as np
 import pandas as pd
 
 # === 1. Cargar el archivo CSV ===
@@ -13,6 +15,11 @@ project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 data_dir = os.path.join(project_root, 'data')
 output_dir = os.path.join(project_root, 'outputs', 'analysis')
 
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+from instrumentacion import traza
+from variabilidad import cv_estandar
+
 os.makedirs(output_dir, exist_ok=True)
 
 filename = 'sales_data_sample_clean.csv'
@@ -21,7 +28,9 @@ file_path = os.path.join(data_dir, filename)
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de tener el dataset en data/")
 
+traza.etapa('carga')
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
 # === 2. Asegurar que ORDERDATE sea fecha y agregar columna de mes ===
 df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'], errors='coerce')
@@ -43,29 +52,30 @@ catalog = [
 ]
 
 # === 4. Calcular consumo mensual por componente ===
-# Inicializar dataframe de resultados mensuales
-monthly_usage = []
-
-for comp in catalog:
-    subset = df[df['PRODUCTLINE'].isin(comp['applies_to'])]
-    monthly = (
-        subset.groupby('MES')['QUANTITYORDERED']
-        .sum()
-        .reset_index(name='qty')
-        .assign(component=comp['component'],
-                usage=lambda x: x['qty'] * comp['usage_per_vehicle'])
-    )
-    monthly_usage.append(monthly)
-
-monthly_df = pd.concat(monthly_usage, ignore_index=True)
+# Ventas (líneas x meses) por una sola tabla dinámica; el consumo de todos los
+# componentes sale de multiplicarla por el uso por vehículo (componentes x líneas).
+traza.etapa('agregacion')
+traza.filas(len(df))
+lineas = sorted({linea for comp in catalog for linea in comp['applies_to']})
+ventas = (
+    df[df['PRODUCTLINE'].isin(lineas)]
+    .pivot_table(index='PRODUCTLINE', columns='MES', values='QUANTITYORDERED', aggfunc='sum', fill_value=0)
+    .reindex(lineas, fill_value=0)
+)
+uso = np.array([[comp['usage_per_vehicle'] * (linea in comp['applies_to']) for linea in lineas]
+                for comp in catalog], dtype=float)
+consumo = uso @ ventas.to_numpy(dtype=float)                     # (componentes, meses)
 
+traza.etapa('clasificacion')
+traza.filas(len(catalog))
 # === 5. Calcular coeficiente de variación por componente ===
-summary = (
-    monthly_df.groupby('component')['usage']
-    .agg(['mean', 'std'])
-    .reset_index()
-)
-summary['coef_var'] = (summary['std'] / summary['mean']) * 100
+summary = pd.DataFrame({
+    'component': [comp['component'] for comp in catalog],
+    'mean': consumo.mean(axis=1),
+    'std': consumo.std(axis=1, ddof=1),
+})
+summary['coef_var'] = cv_estandar(consumo, ddof=1) * 100
+summary = summary.sort_values('component', ignore_index=True)
 
 # === 6. Clasificar según CV ===
 def xyz_class(cv):
@@ -86,6 +96,8 @@ summary = summary.rename(columns={'mean': 'Promedio mensual', 'std': 'Desvío es
 print("\n=== RESULTADOS DEL ANÁLISIS XYZ ===\n")
 print(summary.to_string(index=False))
 
+traza.fin()
+
 # ============================
 # Fin del análisis
 # ============================
@@ -0,0 +1,271 @@
+# BENCHMARK DE ETAPAS DEL PIPELINE
+# --------------------------------
+# Mide tiempo de reloj, CPU y RSS pico de cada etapa del pipeline (las definidas
+# en el orquestador: limpieza, ventas mensuales, ABC/XYZ, pronósticos, EOQ
+# estacional, sensibilidad, CV por períodos y capacidad de almacén) a distintas
+# escalas de datos sintéticos. Funciona offline y sólo con CPU.
+#
+# Cada escala se corre en una copia temporal del proyecto (src/ + data/ generada
+# con generar_datos_sinteticos.py), así los outputs del repositorio no se tocan.
+# Las etapas cuyo paquete no está instalado (prophet, statsmodels) se marcan como
+# omitidas; si falta Prophet, las etapas que dependen de su pronóstico usan el
+# prophet_forecast.csv de referencia del repositorio.
+#
+# Uso:
+#   python src/benchmark/benchmark_etapas.py run --escalas 10000,100000,1000000
+#   python src/benchmark/benchmark_etapas.py run --guardar-base
+#   python src/benchmark/benchmark_etapas.py comparar outputs/benchmark/benchmark_<fecha>.json
+#
+# Resultados: outputs/benchmark/benchmark_<fecha>.json (línea base: base.json).
+# `comparar` marca como regresión toda etapa cuyo tiempo o RSS empeora más que
+# --umbral (relativo) y que --piso-segundos / --piso-mb (absoluto); sale con código 1
+# si encuentra alguna.
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+BENCH_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'benchmark')
+BASE_PATH = os.path.join(BENCH_DIR, 'base.json')
+PRONOSTICO_REFERENCIA = os.path.join(PROJECT_ROOT, 'outputs', 'forecast', 'prophet', 'prophet_forecast.csv')
+
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'pipeline'))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'preprocessing'))
+from orquestador import ETAPAS, construir_dependencias, orden_topologico, ejecutar_etapa
+from instrumentacion import combinar_trazas
+from generar_datos_sinteticos import generar
+
+ESCALAS_DEFECTO = [10_000, 100_000, 1_000_000]
+
+
+# Utilidades ---------------------------------------------------------------------
+
+def info_maquina():
+    return {
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def preparar_proyecto(destino: str, filas: int, semilla: int):
+    """Copia src/ a un directorio temporal y genera data/sales_data_sample_raw.csv con `filas` filas."""
+    shutil.copytree(os.path.join(PROJECT_ROOT, 'src'), os.path.join(destino, 'src'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    os.makedirs(os.path.join(destino, 'data'))
+    t0 = time.perf_counter()
+    generar(os.path.join(destino, 'data', 'sales_data_sample_raw.csv'), filas=filas, skus=109, clientes=92,
+            meses=29, inicio='2003-01', estacionalidad=1.0, intermitencia=0.3, max_lineas=18,
+            bloque=1_000_000, semilla=semilla)
+    return time.perf_counter() - t0
+
+
+def dependencia_faltante(log: str):
+    """Nombre del módulo faltante si el proceso terminó por ModuleNotFoundError."""
+    m = re.search(r"ModuleNotFoundError: No module named '([^']+)'", log)
+    return m.group(1).split('.')[0] if m else None
+
+
+def usar_pronostico_referencia(raiz: str):
+    destino = os.path.join(raiz, 'outputs', 'forecast', 'prophet', 'prophet_forecast.csv')
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    shutil.copyfile(PRONOSTICO_REFERENCIA, destino)
+
+
+def resumir_subetapas(traza_dir: str):
+    """{subetapa: {segundos, filas_por_segundo}} de la última repetición (traza de instrumentacion.py)."""
+    if not os.path.isdir(traza_dir):
+        return {}
+    registros = combinar_trazas(traza_dir, os.path.join(traza_dir, 'combinada.json'))
+    return {r['etapa']: {'segundos': r['segundos'], 'filas': r['filas'],
+                         'filas_por_segundo': r['filas_por_segundo']} for r in registros}
+
+
+# Ejecución ----------------------------------------------------------------------
+
+def medir_escala(filas: int, etapas_objetivo, repeticiones: int, semilla: int):
+    """Corre las etapas (en orden del DAG, de a una) sobre una copia del proyecto con `filas` filas."""
+    dependencias = construir_dependencias(ETAPAS)
+    por_nombre = {e.nombre: e for e in ETAPAS}
+    orden = orden_topologico(set(por_nombre), dependencias)
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix='bench_io_') as raiz:
+        seg_gen = preparar_proyecto(raiz, filas, semilla)
+        print(f"\n=== Escala {filas:,} filas (datos generados en {seg_gen:.1f} s) ===")
+        estado = {}
+        for nombre in orden:
+            etapa = por_nombre[nombre]
+            fila = {'escala': filas, 'etapa': nombre, 'estado': None}
+            fallidas = [d for d in dependencias[nombre] if estado.get(d) not in ('ok', 'referencia')]
+            if fallidas:
+                fila.update(estado='bloqueada', motivo=f"dependencia sin ejecutar: {', '.join(sorted(fallidas))}")
+            else:
+                tiempos, cpus, rss = [], [], []
+                for rep in range(repeticiones):
+                    traza_dir = os.path.join(raiz, 'trazas', nombre)
+                    shutil.rmtree(traza_dir, ignore_errors=True)
+                    r = ejecutar_etapa(etapa, {'IO_TRAZA_DIR': traza_dir}, raiz=raiz)
+                    if r['codigo'] != 0:
+                        break
+                    tiempos.append(r['segundos'])
+                    cpus.append(r['cpu_segundos'])
+                    rss.append(r['rss_pico_mb'])
+                if r['codigo'] == 0:
+                    fila.update(
+                        estado='ok',
+                        segundos=round(statistics.median(tiempos), 4),
+                        segundos_min=round(min(tiempos), 4),
+                        cpu_segundos=round(statistics.median(cpus), 4) if None not in cpus else None,
+                        rss_pico_mb=round(max(rss), 1) if None not in rss else None,
+                        repeticiones=len(tiempos),
+                        subetapas=resumir_subetapas(traza_dir),
+                    )
+                else:
+                    faltante = dependencia_faltante(r['log'])
+                    if faltante:
+                        fila.update(estado='omitida', motivo=f'falta el paquete {faltante}')
+                    else:
+                        fila.update(estado='fallida', motivo=r['log'][-500:])
+                    if nombre == 'prophet' and os.path.exists(PRONOSTICO_REFERENCIA):
+                        usar_pronostico_referencia(raiz)
+                        fila['estado'] = 'referencia' if faltante else fila['estado']
+            estado[nombre] = fila['estado']
+            if nombre in etapas_objetivo:
+                resultados.append(fila)
+                imprimir_fila(fila)
+    return resultados
+
+
+def imprimir_fila(fila):
+    if fila['estado'] == 'ok':
+        cpu = f"{fila['cpu_segundos']:.2f}" if fila['cpu_segundos'] is not None else '-'
+        rss = f"{fila['rss_pico_mb']:.0f}" if fila['rss_pico_mb'] is not None else '-'
+        print(f"  {fila['etapa']:<26} {fila['segundos']:>9.3f} s  CPU {cpu:>7} s  RSS {rss:>6} MB")
+    else:
+        motivo = fila.get('motivo', '').strip().splitlines()
+        print(f"  {fila['etapa']:<26} {fila['estado'].upper():>9}  {motivo[-1] if motivo else ''}")
+
+
+def comando_run(args):
+    nombres = [e.nombre for e in ETAPAS]
+    objetivo = args.etapas.split(',') if args.etapas else nombres
+    desconocidas = [e for e in objetivo if e not in nombres]
+    if desconocidas:
+        raise SystemExit(f"Etapas desconocidas: {desconocidas}. Disponibles: {nombres}")
+    escalas = [int(x) for x in args.escalas.split(',')]
+
+    print("=" * 60)
+    print("BENCHMARK DE ETAPAS DEL PIPELINE")
+    print("=" * 60)
+    resultados = []
+    for filas in escalas:
+        resultados.extend(medir_escala(filas, set(objetivo), args.repeticiones, args.semilla))
+
+    informe = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'maquina': info_maquina(),
+        'parametros': {'escalas': escalas, 'repeticiones': args.repeticiones, 'semilla': args.semilla},
+        'resultados': resultados,
+    }
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    salida = args.salida or os.path.join(BENCH_DIR, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] Resultados: {salida}")
+    if args.guardar_base:
+        shutil.copyfile(salida, BASE_PATH)
+        print(f"[OK] Guardado como línea base: {BASE_PATH}")
+    elif os.path.exists(BASE_PATH) and not args.sin_comparar:
+        return comparar(salida, BASE_PATH, args.umbral, args.piso_segundos, args.piso_mb)
+    return 0
+
+
+# Comparación --------------------------------------------------------------------
+
+def comparar(actual_path: str, base_path: str, umbral: float, piso_segundos: float, piso_mb: float) -> int:
+    """Compara dos corridas por (escala, etapa). Devuelve 1 si hay regresiones."""
+    with open(actual_path, encoding='utf-8') as f:
+        actual = json.load(f)
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    indice_base = {(r['escala'], r['etapa']): r for r in base['resultados'] if r['estado'] == 'ok'}
+
+    print("\n" + "=" * 60)
+    print(f"COMPARACIÓN contra {base_path} ({base['fecha']})")
+    print("=" * 60)
+    print(f"  {'Escala':>10} {'Etapa':<26} {'Base (s)':>9} {'Actual (s)':>10} {'Δ%':>7} {'RSS Δ%':>7}  ")
+    regresiones = 0
+    for r in actual['resultados']:
+        b = indice_base.get((r['escala'], r['etapa']))
+        if r['estado'] != 'ok' or b is None:
+            continue
+        dt = r['segundos'] / b['segundos'] - 1 if b['segundos'] else 0.0
+        peor_tiempo = dt > umbral and r['segundos'] - b['segundos'] > piso_segundos
+        drss, peor_rss = None, False
+        if r.get('rss_pico_mb') and b.get('rss_pico_mb'):
+            drss = r['rss_pico_mb'] / b['rss_pico_mb'] - 1
+            peor_rss = drss > umbral and r['rss_pico_mb'] - b['rss_pico_mb'] > piso_mb
+        marca = 'REGRESIÓN' if peor_tiempo or peor_rss else ('mejora' if dt < -umbral else '')
+        regresiones += bool(peor_tiempo or peor_rss)
+        drss_txt = f"{drss:+.0%}" if drss is not None else '-'
+        print(f"  {r['escala']:>10,} {r['etapa']:<26} {b['segundos']:>9.3f} {r['segundos']:>10.3f} "
+              f"{dt:>+7.0%} {drss_txt:>7}  {marca}")
+    sin_base = [f"{r['escala']}:{r['etapa']}" for r in actual['resultados']
+                if r['estado'] == 'ok' and (r['escala'], r['etapa']) not in indice_base]
+    if sin_base:
+        print(f"\n  Sin línea base: {', '.join(sin_base)}")
+    print(f"\n  Regresiones: {regresiones} (umbral {umbral:.0%}, piso {piso_segundos} s / {piso_mb} MB)")
+    return 1 if regresiones else 0
+
+
+def comando_comparar(args):
+    return comparar(args.actual, args.base, args.umbral, args.piso_segundos, args.piso_mb)
+
+
+# CLI ----------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de las etapas del pipeline a distintas escalas')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    def agregar_umbrales(p):
+        p.add_argument('--umbral', type=float, default=0.15, help='Empeoramiento relativo tolerado (0.15 = 15%%)')
+        p.add_argument('--piso-segundos', type=float, default=0.05, help='Diferencia mínima en segundos')
+        p.add_argument('--piso-mb', type=float, default=10.0, help='Diferencia mínima de RSS en MB')
+
+    p_run = sub.add_parser('run', help='Ejecuta el benchmark y guarda un JSON')
+    p_run.add_argument('--escalas', default=','.join(str(e) for e in ESCALAS_DEFECTO),
+                       help='Filas de datos sintéticos, separadas por coma')
+    p_run.add_argument('--etapas', default=None, help='Etapas a medir, separadas por coma (default: todas)')
+    p_run.add_argument('--repeticiones', type=int, default=3)
+    p_run.add_argument('--semilla', type=int, default=42)
+    p_run.add_argument('--salida', default=None, help='Archivo JSON de resultados')
+    p_run.add_argument('--guardar-base', action='store_true', help='Guarda esta corrida como línea base')
+    p_run.add_argument('--sin-comparar', action='store_true', help='No compara contra la línea base')
+    agregar_umbrales(p_run)
+    p_run.set_defaults(func=comando_run)
+
+    p_cmp = sub.add_parser('comparar', help='Compara una corrida contra la línea base')
+    p_cmp.add_argument('actual', help='JSON de la corrida a evaluar')
+    p_cmp.add_argument('--base', default=BASE_PATH, help='JSON de la línea base')
+    agregar_umbrales(p_cmp)
+    p_cmp.set_defaults(func=comando_comparar)
+
+    args = parser.parse_args()
+    if args.func is comando_run and args.repeticiones < 1:
+        p_run.error('--repeticiones debe ser al menos 1')
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
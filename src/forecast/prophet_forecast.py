@@ -13,6 +13,8 @@ Salida:  outputs/forecast/prophet_*.csv, outputs/forecast/prophet_*.png
 """
 
 import os
+import sys
+from contextlib import closing
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -31,6 +33,10 @@ project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 data_dir = os.path.join(project_root, 'data')
 output_dir = os.path.join(project_root, 'outputs', 'forecast', 'prophet')
 
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+from resultados_db import DB_PATH, conectar, registrar_corrida, guardar_pronostico
+
 # Asegurar que existe el directorio de salida
 os.makedirs(output_dir, exist_ok=True)
 
@@ -40,9 +46,11 @@ file_path = os.path.join(data_dir, filename)
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de tener el dataset en data/")
 
+traza.etapa('carga')
 # Usar un caracter ASCII para evitar problemas de encoding en Windows
 print(f"\n[CARGA] Cargando datos desde: {file_path}")
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
 # === 2. PREPARACIÓN DE DATOS TEMPORALES ===
 print("\n--- Preparando serie temporal ---")
@@ -50,6 +58,7 @@ print("\n--- Preparando serie temporal ---")
 # Convertir ORDERDATE a formato datetime
 df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'], format='%m/%d/%Y %H:%M', errors='coerce')
 
+traza.etapa('agregacion')
 # Crear columna de periodo (Año-Mes) para agregación
 df['PERIOD'] = df['ORDERDATE'].dt.to_period('M')
 
@@ -103,10 +112,14 @@ print(prophet_df.head())
 print("\n--- Estadísticas descriptivas mensuales ---")
 print(prophet_df['y'].describe())
 
+traza.filas(len(df))
+
 # === 5. MODELO PROPHET ===
 print("\n--- Ajustando modelo Prophet ---")
 
 try:
+    traza.etapa('ajuste')
+    traza.filas(len(prophet_df))
     # Configurar y ajustar el modelo Prophet
     # Prophet detecta automáticamente:
     # - Tendencia (lineal o logística)
@@ -178,6 +191,7 @@ try:
     forecast_periods = 12
     print(f"\n--- Generando pronóstico para {forecast_periods} periodos futuros ---")
     
+    traza.etapa('pronostico')
     # Crear dataframe futuro
     future = model.make_future_dataframe(periods=forecast_periods, freq='MS')
     
@@ -221,6 +235,7 @@ try:
     formatted_total = f"${future_forecast['yhat'].sum():,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
     print(f"\n{'TOTAL PRONOSTICADO:'} {formatted_total}")
 
+    traza.etapa('grafico')
     # === 9. VISUALIZACIONES ===
     print("\n--- Generando gráficos ---")
     
@@ -311,6 +326,7 @@ try:
     print(f"[OK] Componentes guardados: {components_path}")
     plt.close(fig_components)
     
+    traza.etapa('exportacion')
     # === 11. EXPORTAR RESULTADOS ===
     print("\n--- Exportando resultados ---")
     
@@ -344,17 +360,6 @@ try:
     forecast_export_df['Autos_Clasicos'] = forecast_export_df['Autos_Clasicos'].round(0)
     forecast_export_df['Autos_Vintage'] = forecast_export_df['Autos_Vintage'].round(0)
 
-    # Agregar fila de totales
-    total_row = {
-        'Periodo': 'TOTAL',
-        'Pronostico': forecast_export_df['Pronostico'].sum(),
-        'Limite_Inferior': forecast_export_df['Limite_Inferior'].sum(),
-        'Limite_Superior': forecast_export_df['Limite_Superior'].sum(),
-        'Autos_Clasicos': forecast_export_df['Autos_Clasicos'].sum(),
-        'Autos_Vintage': forecast_export_df['Autos_Vintage'].sum()
-    }
-    forecast_export_df = pd.concat([forecast_export_df, pd.DataFrame([total_row])], ignore_index=True)
-
     # === 8.1. CALCULAR AUTOS CLÁSICOS Y VINTAGE POR PERIODO ===
     PRECIO_PROMEDIO_AUTO = 3500
     PROPORCION_CLASSIC = 0.65
@@ -365,10 +370,23 @@ try:
     results_df.to_csv(results_path, index=False)
     forecast_path = os.path.join(output_dir, 'prophet_forecast.csv')
     forecast_export_df.to_csv(forecast_path, index=False)
-    
+
+    # Guardar en la base de resultados (los consumidores leen de ahí)
+    with closing(conectar()) as con, con:
+        corrida = registrar_corrida(con, 'prophet', {'periodos': forecast_periods,
+                                                     'precio_promedio_auto': PRECIO_PROMEDIO_AUTO,
+                                                     'proporcion_classic': PROPORCION_CLASSIC})
+        guardar_pronostico(con, corrida, 'prophet', forecast_export_df)
+
     print(f"[OK] Resultados históricos: {results_path}")
     print(f"[OK] Pronóstico: {forecast_path}")
+    print(f"[OK] Base de resultados: {DB_PATH} (corrida {corrida})")
+    print(f"     Total pronosticado: ${forecast_export_df['Pronostico'].sum():,.2f} | "
+          f"Autos clásicos: {forecast_export_df['Autos_Clasicos'].sum():.0f} | "
+          f"Autos vintage: {forecast_export_df['Autos_Vintage'].sum():.0f}")
     
+    traza.fin()
+
     # === 12. RESUMEN FINAL ===
     print("\n" + "="*60)
     print("RESUMEN DEL ANÁLISIS")
@@ -9,10 +9,12 @@ Modelo SARIMA para pronóstico de series temporales estacionales.
 MAPE ~41.48% - Intervalos de confianza amplios con pocos datos.
 
 Entrada: data/sales_data_sample_clean.csv
-Salida:  outputs/forecast/sarima_*.csv, outputs/forecast/sarima_*.png
+Salida:  outputs/forecast/sarima/sarima_*.csv, outputs/forecast/sarima/sarima_*.png
 """
 
 import os
+import sys
+from contextlib import closing
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -31,7 +33,11 @@ print("="*60)
 script_dir = os.path.dirname(__file__) or os.getcwd()
 project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 data_dir = os.path.join(project_root, 'data')
-output_dir = os.path.join(project_root, 'outputs', 'forecast')
+output_dir = os.path.join(project_root, 'outputs', 'forecast', 'sarima')
+
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+from resultados_db import conectar, registrar_corrida, guardar_pronostico
 
 os.makedirs(output_dir, exist_ok=True)
 
@@ -41,12 +47,16 @@ file_path = os.path.join(data_dir, filename)
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de tener el dataset en data/")
 
+traza.etapa('carga')
 print(f"\n[CARGA] Cargando datos desde: {file_path}")
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
 # === 2. PREPARACIÓN DE DATOS TEMPORALES ===
 print("\n--- Preparando serie temporal ---")
 
+traza.etapa('agregacion')
+traza.filas(len(df))
 # Convertir ORDERDATE a formato datetime
 df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'], format='%m/%d/%Y %H:%M', errors='coerce')
 
@@ -121,6 +131,8 @@ try:
     print(f"      Q (SMA): {seasonal_order[2]} - Terminos MA estacionales")
     print(f"      s:       {seasonal_order[3]} - Periodo estacional (meses)")
     
+    traza.etapa('ajuste')
+    traza.filas(len(monthly_sales))
     # Ajustar modelo SARIMA
     model = SARIMAX(
         monthly_sales,
@@ -164,6 +176,7 @@ try:
     print(f"    BIC:  {fitted_model.bic:.2f}")
     print(f"    HQIC: {fitted_model.hqic:.2f}")
     
+    traza.etapa('pronostico')
     # === 6. PRONÓSTICO ===
     forecast_periods = 12
     print(f"\n--- Generando pronostico para {forecast_periods} periodos futuros ---")
@@ -212,6 +225,7 @@ try:
     formatted_total = f"${forecast.sum():,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
     print(f"\n{'TOTAL PRONOSTICADO:'} {formatted_total}")
     
+    traza.etapa('grafico')
     # === 9. VISUALIZACIONES ===
     print("\n--- Generando graficos ---")
     
@@ -344,6 +358,7 @@ try:
     print(f"[OK] Diagnostico guardado: {diag_path}")
     plt.close(fig_diag)
     
+    traza.etapa('exportacion')
     # === 11. EXPORTAR RESULTADOS ===
     print("\n--- Exportando resultados ---")
     
@@ -369,10 +384,16 @@ try:
     
     forecast_path = os.path.join(output_dir, 'sarima_forecast.csv')
     forecast_export_df.to_csv(forecast_path, index=False)
-    
+
+    with closing(conectar()) as con, con:
+        corrida = registrar_corrida(con, 'sarima', {'periodos': len(forecast_export_df)})
+        guardar_pronostico(con, corrida, 'sarima', forecast_export_df)
+
     print(f"[OK] Resultados historicos: {results_path}")
     print(f"[OK] Pronostico: {forecast_path}")
     
+    traza.fin()
+
     # === 12. RESUMEN FINAL ===
     print("\n" + "="*60)
     print("RESUMEN DEL ANALISIS")
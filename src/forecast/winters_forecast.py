@@ -9,10 +9,12 @@ Modelo Holt-Winters (Suavización Exponencial Triple).
 MAPE ~31.54% - Buena precisión para tendencia y estacionalidad.
 
 Entrada: data/sales_data_sample_clean.csv
-Salida:  outputs/forecast/winters_*.csv, outputs/forecast/winters_*.png
+Salida:  outputs/forecast/winters/winters_*.csv, outputs/forecast/winters/winters_*.png
 """
 
 import os
+import sys
+from contextlib import closing
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -29,7 +31,11 @@ print("="*60)
 script_dir = os.path.dirname(__file__) or os.getcwd()
 project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 data_dir = os.path.join(project_root, 'data')
-output_dir = os.path.join(project_root, 'outputs', 'forecast')
+output_dir = os.path.join(project_root, 'outputs', 'forecast', 'winters')
+
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+from resultados_db import conectar, registrar_corrida, guardar_pronostico
 
 os.makedirs(output_dir, exist_ok=True)
 
@@ -39,12 +45,16 @@ file_path = os.path.join(data_dir, filename)
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de tener el dataset en data/")
 
+traza.etapa('carga')
 print(f"\n[CARGA] Cargando datos desde: {file_path}")
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
 # === 2. PREPARACIÓN DE DATOS TEMPORALES ===
 print("\n--- Preparando serie temporal ---")
 
+traza.etapa('agregacion')
+traza.filas(len(df))
 # Convertir ORDERDATE a formato datetime
 df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'], format='%m/%d/%Y %H:%M', errors='coerce')
 
@@ -83,6 +93,8 @@ else:
     print(f"  [OK] Usando ciclo estacional de {seasonal_periods} meses")
 
 try:
+    traza.etapa('ajuste')
+    traza.filas(len(monthly_sales))
     # Ajustar modelo
     model = ExponentialSmoothing(
         monthly_sales,
@@ -103,6 +115,7 @@ try:
     print(f"    β (beta - tendencia):     {fitted_model.params['smoothing_trend']:.4f}")
     print(f"    γ (gamma - estacionalidad): {fitted_model.params['smoothing_seasonal']:.4f}")
     
+    traza.etapa('pronostico')
     # === 5. PRONÓSTICO ===
     # Pronosticar los próximos 12 meses
     forecast_periods = 12
@@ -138,6 +151,7 @@ try:
     formatted_total = f"${forecast.sum():,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
     print(f"\n{'TOTAL PRONOSTICADO:'} {formatted_total}")
     
+    traza.etapa('grafico')
     # === 8. VISUALIZACIONES ===
     print("\n--- Generando gráficos ---")
     
@@ -224,6 +238,7 @@ try:
     
     plt.show()
     
+    traza.etapa('exportacion')
     # === 9. EXPORTAR RESULTADOS ===
     print("\n--- Exportando resultados ---")
     
@@ -247,10 +262,16 @@ try:
     
     forecast_path = os.path.join(output_dir, 'winters_forecast.csv')
     forecast_df.to_csv(forecast_path, index=False)
-    
+
+    with closing(conectar()) as con, con:
+        corrida = registrar_corrida(con, 'winters', {'periodos': len(forecast_df)})
+        guardar_pronostico(con, corrida, 'winters', forecast_df)
+
     print(f"[OK] Resultados históricos: {results_path}")
     print(f"[OK] Pronóstico: {forecast_path}")
     
+    traza.fin()
+
     # === 10. RESUMEN FINAL ===
     print("\n" + "="*60)
     print("RESUMEN DEL ANÁLISIS")
@@ -5,6 +5,7 @@
 # Referencia: Winston - Inv. Operaciones, pág. 872-873
 # ============================
 import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -16,10 +17,18 @@ print("="*70)
 
 # Cargar datos
 script_dir = os.path.dirname(__file__) or os.getcwd()
-project_root = os.path.abspath(os.path.join(script_dir, '..'))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 prophet_forecast_path = os.path.join(project_root, 'outputs', 'forecast', 'prophet', 'prophet_forecast.csv')
+output_dir = os.path.join(project_root, 'outputs', 'inventory', 'cv')
+os.makedirs(output_dir, exist_ok=True)
 
-df = pd.read_csv(prophet_forecast_path)
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from resultados_db import leer_pronostico
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+from componentes import COMPONENTES, matriz_demanda
+from variabilidad import cv_winston, cv_ventanas, segmentar
+
+df = leer_pronostico('prophet', prophet_forecast_path)
 demandas = df['Pronostico'].values
 meses = [p[:7] for p in df['Periodo']]
 n = len(demandas)
@@ -28,13 +37,12 @@ print(f"\n--- Demandas Mensuales Pronosticadas ---")
 for i, (m, d) in enumerate(zip(meses, demandas)):
     print(f"  {i+1:2}. {m}: ${d:>12,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
 
-# Función para calcular CV
-def calcular_cv(datos):
-    """Calcula el Coeficiente de Variabilidad según Winston"""
-    datos = np.array(datos)
-    d_prom = np.mean(datos)
-    var_est = np.mean(datos**2) - d_prom**2
-    return var_est / (d_prom**2) if d_prom > 0 else float('inf')
+# Función para calcular CV (Winston): Var(d) / E[d]^2
+calcular_cv = cv_winston
+
+# CV de todas las ventanas contiguas (fila = tamaño 2..n, columna = mes de inicio),
+# con sumas prefijas: cada ventana sale en O(1) en lugar de recalcularse
+cv_matrix_completa = cv_ventanas(demandas)[0]
 
 # CV Total
 cv_total = calcular_cv(demandas)
@@ -100,7 +108,7 @@ for window_size in range(2, n+1):
     for start in range(n - window_size + 1):
         end = start + window_size
         datos_ventana = demandas[start:end]
-        cv = calcular_cv(datos_ventana)
+        cv = cv_matrix_completa[window_size-2, start]
         
         if cv < 0.20:
             encontradas += 1
@@ -169,6 +177,34 @@ normal_idx = [i for i in range(n) if i not in [4, 5]]  # Sin Oct ni Nov
 cv_normal = calcular_cv(demandas[normal_idx])
 print(f"    CV estación normal: {cv_normal:.4f} {'✓' if cv_normal < 0.20 else '✗'}")
 
+# === SEGMENTACIÓN ÓPTIMA ===
+print("\n" + "="*70)
+print("SEGMENTACIÓN ÓPTIMA: MÍNIMO DE PERÍODOS CONTIGUOS CON CV < 0.20")
+print("="*70)
+
+# Todas las series a la vez: pronóstico en $ y demanda de cada componente
+df['Mes'] = pd.to_datetime(df['Periodo']).dt.month
+series = ['Pronostico'] + list(COMPONENTES['Componente'])
+matriz = np.vstack([demandas, matriz_demanda(COMPONENTES, df)])
+n_periodos, etiquetas = segmentar(matriz, umbral=0.20, min_periodos=2)
+
+segmentos = []
+for serie, demanda_serie, k, fila in zip(series, matriz, n_periodos, etiquetas):
+    if k == 0:
+        print(f"\n  {serie}: sin partición válida (algún tramo de 2+ meses queda con CV >= 0.20)")
+        continue
+    print(f"\n  {serie}: {k} período(s)")
+    for p in range(k):
+        idx = np.where(fila == p)[0]
+        cv_p = calcular_cv(demanda_serie[idx])
+        print(f"    {meses[idx[0]]} a {meses[idx[-1]]} ({len(idx)} meses): CV = {cv_p:.4f}")
+        segmentos.append({'serie': serie, 'periodo': p + 1, 'inicio': meses[idx[0]], 'fin': meses[idx[-1]],
+                          'n_meses': len(idx), 'cv': cv_p})
+
+segmentos_path = os.path.join(output_dir, 'segmentacion_cv.csv')
+pd.DataFrame(segmentos).round(4).to_csv(segmentos_path, index=False)
+print(f"\n✓ Segmentación guardada: {segmentos_path}")
+
 # === VISUALIZACIÓN ===
 print("\n--- Generando gráfico ---")
 
@@ -204,9 +240,7 @@ ax2.grid(True, alpha=0.3)
 
 # Gráfico 3: CV acumulativo
 ax3 = axes[1, 0]
-cvs_acum = []
-for i in range(2, n+1):
-    cvs_acum.append(calcular_cv(demandas[:i]))
+cvs_acum = cv_matrix_completa[:, 0]
 ax3.plot(range(2, n+1), cvs_acum, 'o-', color='steelblue', linewidth=2, markersize=8)
 ax3.axhline(y=0.20, color='red', linestyle='--', linewidth=2, label='Umbral CV = 0.20')
 ax3.set_xlabel('Número de meses incluidos')
@@ -220,10 +254,7 @@ ax3.set_xticks(range(2, n+1))
 ax4 = axes[1, 1]
 # Crear matriz de CV para diferentes ventanas
 max_window = 6
-cv_matrix = np.full((max_window-1, n), np.nan)
-for w in range(2, max_window+1):
-    for start in range(n - w + 1):
-        cv_matrix[w-2, start] = calcular_cv(demandas[start:start+w])
+cv_matrix = cv_matrix_completa[:max_window-1]
 
 im = ax4.imshow(cv_matrix, cmap='RdYlGn_r', aspect='auto', vmin=0, vmax=0.5)
 ax4.set_yticks(range(max_window-1))
@@ -244,7 +275,7 @@ for w in range(2, max_window+1):
 
 plt.tight_layout()
 
-output_path = os.path.join(script_dir, 'analisis_cv_periodos.png')
+output_path = os.path.join(output_dir, 'analisis_cv_periodos.png')
 plt.savefig(output_path, dpi=150, bbox_inches='tight')
 print(f"✓ Gráfico guardado: {output_path}")
 plt.close()
@@ -0,0 +1,260 @@
+# LOTE DINÁMICO CAPACITADO (CLSP) POR MILP CON HORIZONTE RODANTE
+# --------------------------------------------------------------
+# lote_dinamico.py resuelve Wagner-Whitin ítem por ítem, sin capacidades. Cuando
+# el volumen del almacén (Volumen_m3) y la capacidad del proveedor limitan a todos
+# los ítems juntos, los lotes se acoplan y se plantea un MILP sobre ítems x períodos:
+#   min  sum_it K y_it + h_i I_it
+#   s.a. I_i,t-1 + x_it - I_it = d_it                  (balance)
+#        x_it <= M_it y_it,  y_it binaria               (hay pedido si hay lote)
+#        sum_i v_i (I_i,t-1 + x_it) <= C_vol            (m³ al recibir, como el
+#                                                        inventario máximo de
+#                                                        capacidad_minima_almacen.py)
+#        sum_i x_it <= C_prov                           (unidades por período)
+# M_it es lo menor entre la demanda que falta en la ventana, C_prov y C_vol / v_i.
+# Se arma con matrices dispersas y se resuelve con scipy.optimize.milp (HiGHS).
+# Horizonte rodante: se resuelven ventanas de --ventana períodos, se fijan los
+# primeros --paso y el inventario final de esos períodos pasa a la ventana
+# siguiente. Cada ventana tiene --limite-tiempo segundos, así que cientos de
+# ítems se resuelven en tiempo acotado. scipy.optimize.milp no recibe una
+# solución inicial: el plan de la ventana anterior (completado con lote por
+# lote) queda como incumbente y se usa si HiGHS no encuentra uno mejor a tiempo.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/inventory/optimizacion/clsp_plan.csv (lotes por ítem y período)
+#          outputs/inventory/optimizacion/clsp_ventanas.csv (estado de cada ventana)
+#
+# Uso: python src/inventory/clsp_milp.py --periodos semanal --ventana 12 --paso 4
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, matriz_demanda
+from lote_dinamico import costo_plan, demanda_semanal, wagner_whitin
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+
+
+# Modelo -------------------------------------------------------------------------
+
+def _cotas_lote(demanda, volumen, cap_volumen, cap_proveedor) -> np.ndarray:
+    """M_it: demanda restante de la ventana, acotada por las dos capacidades."""
+    restante = np.cumsum(demanda[:, ::-1], axis=1)[:, ::-1]
+    with np.errstate(divide='ignore'):
+        por_volumen = np.where(volumen > 0, cap_volumen / volumen, np.inf)[:, None]
+    return np.minimum(np.minimum(restante, cap_proveedor), por_volumen)
+
+
+def _evaluar(lotes, demanda, inicial, volumen, cap_volumen, cap_proveedor, K, h, tol=1e-6):
+    """Factibilidad y costo (K y + h I) de un plan de la ventana."""
+    inventario = inicial[:, None] + np.cumsum(lotes - demanda, axis=1)
+    previo = np.concatenate([inicial[:, None], inventario[:, :-1]], axis=1)
+    factible = (np.all(inventario >= -tol)
+                and np.all(volumen @ (previo + lotes) <= cap_volumen * (1 + tol) + tol)
+                and np.all(lotes.sum(axis=0) <= cap_proveedor * (1 + tol) + tol))
+    costo = K * (lotes > tol).sum() + (h[:, None] * np.clip(inventario, 0, None)).sum()
+    return factible, costo
+
+
+def resolver_ventana(demanda, inicial, volumen, h, K, cap_volumen, cap_proveedor,
+                     limite_tiempo=None, gap: float = 0.01) -> dict:
+    """CLSP de una ventana (ítems, períodos) con inventario inicial por ítem.
+
+    Variables por bloques [x | I | y], cada bloque en orden ítem-mayor (i * T + t).
+    Devuelve lotes, inventario, objetivo, estado y gap de HiGHS (lotes None si
+    no hubo solución factible dentro del límite de tiempo).
+    """
+    n, T = demanda.shape
+    nT = n * T
+    idx = np.arange(nT).reshape(n, T)
+    M = _cotas_lote(demanda, volumen, cap_volumen, cap_proveedor)
+    c = np.concatenate([np.zeros(nT), np.repeat(h, T), np.full(nT, float(K))])
+
+    filas, cols, vals = [], [], []
+
+    def agregar(f, col, v):
+        filas.append(np.ravel(f))
+        cols.append(np.ravel(col))
+        vals.append(np.broadcast_to(v, np.shape(f)).ravel())
+
+    # Balance: x_it - I_it + I_i,t-1 = d_it  (t = 0: x - I = d - I0)
+    agregar(idx, idx, 1.0)
+    agregar(idx, nT + idx, -1.0)
+    agregar(idx[:, 1:], nT + idx[:, :-1], 1.0)
+    lado_balance = demanda.ravel().astype(float).copy()
+    lado_balance[idx[:, 0]] -= inicial
+    # Enlace: x_it - M_it y_it <= 0
+    agregar(nT + idx, idx, 1.0)
+    agregar(nT + idx, 2 * nT + idx, -M)
+    # Volumen al recibir: sum_i v_i (I_i,t-1 + x_it) <= C_vol
+    base = 2 * nT
+    t_de = np.broadcast_to(np.arange(T), (n, T))
+    agregar(base + t_de, idx, volumen[:, None])
+    agregar(base + t_de[:, 1:], nT + idx[:, :-1], volumen[:, None])
+    lado_volumen = np.full(T, float(cap_volumen))
+    lado_volumen[0] -= volumen @ inicial
+    # Proveedor: sum_i x_it <= C_prov
+    agregar(base + T + t_de, idx, 1.0)
+    A = sparse.csr_array((np.concatenate(vals), (np.concatenate(filas), np.concatenate(cols))),
+                         shape=(2 * nT + 2 * T, 3 * nT))
+    inf = np.inf
+    restricciones = [LinearConstraint(A,
+                                      np.concatenate([lado_balance, np.full(nT + 2 * T, -inf)]),
+                                      np.concatenate([lado_balance, np.zeros(nT), lado_volumen,
+                                                      np.full(T, float(cap_proveedor))]))]
+    cotas = Bounds(np.zeros(3 * nT), np.concatenate([M.ravel(), np.full(nT, inf), np.ones(nT)]))
+    integralidad = np.concatenate([np.zeros(2 * nT), np.ones(nT)])
+    opciones = {'mip_rel_gap': gap, 'disp': False}
+    if limite_tiempo:
+        opciones['time_limit'] = limite_tiempo
+    res = milp(c, constraints=restricciones, integrality=integralidad, bounds=cotas, options=opciones)
+    if res.x is None:
+        return {'lotes': None, 'estado': res.status, 'mensaje': res.message, 'objetivo': np.nan,
+                'gap': np.nan}
+    # Sin pedido (y = 0) el lote es cero; HiGHS deja residuos del orden de su tolerancia
+    lotes = np.where(res.x[2 * nT:].reshape(n, T) > 0.5, np.clip(res.x[:nT].reshape(n, T), 0, None), 0.0)
+    return {'lotes': lotes, 'inventario': inicial[:, None] + np.cumsum(lotes - demanda, axis=1),
+            'estado': res.status, 'mensaje': res.message, 'objetivo': res.fun,
+            'gap': getattr(res, 'mip_gap', np.nan)}
+
+
+def horizonte_rodante(demanda, volumen, h, K, cap_volumen, cap_proveedor, ventana: int = 12,
+                      paso: int = 6, limite_tiempo: float = 30.0, gap: float = 0.01, inicial=None) -> dict:
+    """Resuelve ventanas de 'ventana' períodos y fija los primeros 'paso' de cada una.
+
+    El plan de la ventana anterior sobre los períodos que se solapan, más lote por
+    lote en los nuevos, es el incumbente de la siguiente: si es factible y HiGHS
+    no devuelve nada mejor dentro del límite de tiempo, se usa ese plan.
+    """
+    n, T = demanda.shape
+    inicial = np.zeros(n) if inicial is None else np.asarray(inicial, dtype=float)
+    lotes = np.zeros((n, T))
+    previo = None                         # plan (ítems, períodos) desde el inicio de la ventana
+    ventanas = []
+    t0 = 0
+    while t0 < T:
+        t1 = min(t0 + ventana, T)
+        d = demanda[:, t0:t1]
+        # Incumbente: lo que queda del plan anterior; lote por lote cubre el resto
+        candidato = np.zeros_like(d, dtype=float)
+        if previo is not None:
+            solapa = min(previo.shape[1], t1 - t0)
+            candidato[:, :solapa] = previo[:, :solapa]
+        inv = inicial[:, None] + np.cumsum(candidato - d, axis=1)
+        falta = -np.minimum.accumulate(np.minimum(inv, 0), axis=1)
+        candidato += np.diff(falta, axis=1, prepend=0)
+        factible, costo_inc = _evaluar(candidato, d, inicial, volumen, cap_volumen, cap_proveedor, K, h)
+
+        inicio = time.perf_counter()
+        res = resolver_ventana(d, inicial, volumen, h, K, cap_volumen, cap_proveedor, limite_tiempo, gap)
+        segundos = time.perf_counter() - inicio
+        if res['lotes'] is None and not factible:
+            raise RuntimeError(f"Ventana {t0}-{t1 - 1} sin solución: {res['mensaje']}")
+        usa_incumbente = factible and (res['lotes'] is None or costo_inc < res['objetivo'])
+        plan = candidato if usa_incumbente else res['lotes']
+
+        fijar = min(paso, t1 - t0) if t1 < T else t1 - t0
+        lotes[:, t0:t0 + fijar] = plan[:, :fijar]
+        inicial = inicial + (plan[:, :fijar] - d[:, :fijar]).sum(axis=1)
+        inicial = np.where(np.abs(inicial) < 1e-7, 0.0, inicial)
+        previo = plan[:, fijar:]
+        ventanas.append({'Desde': t0, 'Hasta': t1 - 1, 'Fijados': fijar, 'Estado': res['estado'],
+                         'Objetivo': res['objetivo'], 'Gap': res['gap'], 'Segundos': segundos,
+                         'Incumbente_Factible': factible, 'Costo_Incumbente': costo_inc,
+                         'Usa_Incumbente': usa_incumbente})
+        t0 += fijar
+    return {'lotes': lotes, 'ventanas': pd.DataFrame(ventanas)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lote dinámico capacitado (CLSP) por MILP con horizonte rodante')
+    parser.add_argument('--periodos', choices=['mensual', 'semanal'], default='mensual')
+    parser.add_argument('--ventana', type=int, default=12, help='Períodos por ventana')
+    parser.add_argument('--paso', type=int, default=6, help='Períodos que se fijan en cada ventana')
+    parser.add_argument('--capacidad', type=float,
+                        help='m³ del almacén (default: --holgura x el mayor volumen de demanda de un período)')
+    parser.add_argument('--capacidad-proveedor', type=float,
+                        help='Unidades por período (default: --holgura x la mayor demanda total de un período)')
+    parser.add_argument('--holgura', type=float, default=1.5, help='Multiplicador de las capacidades por defecto')
+    parser.add_argument('--limite-tiempo', type=float, default=30.0, help='Segundos por ventana')
+    parser.add_argument('--gap', type=float, default=0.01, help='Gap relativo de HiGHS (default 1%%)')
+    args = parser.parse_args()
+    if args.paso < 1 or args.paso > args.ventana:
+        parser.error('--paso debe estar entre 1 y --ventana')
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    mensual = matriz_demanda(componentes, df_pronostico)
+    if args.periodos == 'semanal':
+        demanda, por_anio = demanda_semanal(mensual, df_pronostico['Periodo']), 52
+        etiquetas = [f'S{k + 1:02d}' for k in range(52)]
+    else:
+        demanda, por_anio = mensual, 12
+        etiquetas = pd.to_datetime(df_pronostico['Periodo']).dt.strftime('%Y-%m').tolist()
+    volumen = componentes['Volumen_m3'].to_numpy(dtype=float)
+    h = componentes['Costo_Unitario'].to_numpy(dtype=float) * TASA_MANTENIMIENTO / por_anio
+    K = float(COSTO_ORDENAR)
+    cap_volumen = args.capacidad if args.capacidad is not None else args.holgura * (volumen @ demanda).max()
+    cap_proveedor = (args.capacidad_proveedor if args.capacidad_proveedor is not None
+                     else args.holgura * demanda.sum(axis=0).max())
+
+    traza.etapa('optimizacion')
+    traza.filas(demanda.size)
+    res = horizonte_rodante(demanda, volumen, h, K, cap_volumen, cap_proveedor, args.ventana, args.paso,
+                            args.limite_tiempo, args.gap)
+    lotes = res['lotes']
+    # Referencia sin capacidades: Wagner-Whitin de lote_dinamico.py
+    libre = wagner_whitin(demanda, K, h)
+
+    traza.etapa('exportacion')
+    inventario = np.cumsum(lotes - demanda, axis=1)
+    previo = np.concatenate([np.zeros((len(volumen), 1)), inventario[:, :-1]], axis=1)
+    plan = pd.DataFrame({
+        'Componente': np.repeat(componentes['Componente'].to_numpy(), demanda.shape[1]),
+        'Periodo': np.tile(etiquetas, demanda.shape[0]),
+        'Demanda': demanda.ravel(),
+        'Lote': lotes.ravel(),
+        'Inventario_Final': inventario.ravel(),
+        'Lote_Sin_Capacidad': libre.ravel(),
+    })
+    costo = costo_plan(lotes, demanda, K, h)
+    costo_libre = costo_plan(libre, demanda, K, h)
+    ocupacion = volumen @ (previo + lotes)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.periodos == 'mensual' else '_semanal'
+    salida = os.path.join(OUTPUT_DIR, f'clsp_plan{sufijo}.csv')
+    plan.to_csv(salida, index=False)
+    res['ventanas'].to_csv(os.path.join(OUTPUT_DIR, f'clsp_ventanas{sufijo}.csv'), index=False)
+    traza.fin()
+
+    total = (costo['Costo_Pedir'] + costo['Costo_Mantener']).sum()
+    total_libre = (costo_libre['Costo_Pedir'] + costo_libre['Costo_Mantener']).sum()
+    print("=" * 70)
+    print(f"CLSP ({demanda.shape[0]} ítems x {demanda.shape[1]} períodos, ventana {args.ventana}, paso {args.paso})")
+    print("=" * 70)
+    print(f"Capacidad del almacén: {cap_volumen:,.1f} m³ (pico usado {ocupacion.max():,.1f})")
+    print(f"Capacidad del proveedor: {cap_proveedor:,.1f} u/período (pico usado {lotes.sum(axis=0).max():,.1f})")
+    print(res['ventanas'].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\nCosto con capacidades: {total:,.2f}  |  sin capacidades (Wagner-Whitin): {total_libre:,.2f}")
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
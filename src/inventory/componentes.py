@@ -0,0 +1,74 @@
+# COMPONENTES Y PARÁMETROS COMUNES DE INVENTARIO
+# ----------------------------------------------
+# Tabla de componentes del caso y parámetros de costo compartidos por los
+# scripts de inventario, más la construcción de la matriz de demanda
+# componentes x meses a partir del pronóstico de autos.
+
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Tasa de mantenimiento anual (20% del costo unitario)
+TASA_MANTENIMIENTO = 0.20
+# Costo de ordenar por pedido
+COSTO_ORDENAR = 300
+# Z-score para nivel de servicio 95%
+Z_ALPHA = 1.645
+SEMANAS_POR_MES = 4.33
+
+# Costo de agotamiento c2 por unidad faltante, según el auto al que va el componente
+# (5% del precio de los insumos del auto; ver analisis_sensibilidad_v2.py)
+COSTO_AGOTAMIENTO = {'Clasico': 855, 'Vintage': 1520, 'Ambos': 387}
+
+# Líneas de producto del dataset de ventas que consume cada Auto_Foco
+LINEAS_POR_FOCO = {'Clasico': ['Classic Cars'], 'Vintage': ['Vintage Cars'],
+                   'Ambos': ['Classic Cars', 'Vintage Cars']}
+
+COMPONENTES = pd.DataFrame({
+    'Componente': [
+        'Carrocería Artesanal de Época',
+        'Motor de Alto Rendimiento V8',
+        'Motor de Cilindros de Línea Raro',
+        'Carrocería Estándar (Fibra)',
+        'Tapicería de Cuero Premium'
+    ],
+    'Auto_Foco': ['Vintage', 'Clásico', 'Vintage', 'Clásico', 'Ambos'],
+    'Costo_Unitario': [15000, 9000, 12000, 6500, 4000],
+    'Uso_por_Auto': [1, 1, 1, 1, 1],
+    'Volumen_m3': [4.0, 0.8, 0.9, 3.5, 0.5],
+    'Lead_Time_Semanas': [10, 6, 12, 4, 8],
+    # Desvío del lead time del proveedor (0 = lead time determinístico)
+    'Lead_Time_Desvio_Semanas': [0.0, 0.0, 0.0, 0.0, 0.0]
+})
+
+
+def normalizar_foco(foco: str) -> str:
+    """'Clásico' y 'Clasico' son el mismo foco (los scripts v2 no usan tildes)."""
+    sin_tildes = unicodedata.normalize('NFKD', str(foco)).encode('ascii', 'ignore').decode('ascii')
+    return sin_tildes.strip().capitalize()
+
+
+def costo_agotamiento(componentes: pd.DataFrame) -> np.ndarray:
+    """c2 de cada componente según su Auto_Foco."""
+    return componentes['Auto_Foco'].map(lambda f: COSTO_AGOTAMIENTO[normalizar_foco(f)]).to_numpy(dtype=float)
+
+
+def matriz_demanda(componentes: pd.DataFrame, df_pronostico: pd.DataFrame) -> np.ndarray:
+    """Demanda mensual de cada componente (filas) en cada mes del pronóstico (columnas).
+
+    Clásico usa Autos_Clasicos, Vintage usa Autos_Vintage y Ambos la suma de los dos,
+    siempre multiplicado por Uso_por_Auto. Un foco desconocido deja la fila en cero.
+    """
+    clasicos = df_pronostico['Autos_Clasicos'].to_numpy(dtype=float)
+    vintage = df_pronostico['Autos_Vintage'].to_numpy(dtype=float)
+    por_foco = {'Clasico': clasicos, 'Vintage': vintage, 'Ambos': clasicos + vintage}
+    demanda = np.zeros((len(componentes), len(df_pronostico)))
+    focos = componentes['Auto_Foco'].map(normalizar_foco).to_numpy()
+    uso = componentes['Uso_por_Auto'].to_numpy(dtype=float)
+    for foco, serie in por_foco.items():
+        filas = focos == foco
+        demanda[filas] = serie[None, :] * uso[filas, None]
+    for nombre, foco in zip(componentes['Componente'], componentes['Auto_Foco']):
+        if normalizar_foco(foco) not in por_foco:
+            print(f"[ADVERTENCIA] Auto_Foco inesperado: {foco} para componente {nombre}")
+    return demanda
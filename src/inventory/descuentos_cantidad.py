@@ -0,0 +1,184 @@
+# EOQ CON DESCUENTOS POR CANTIDAD (TODAS LAS UNIDADES E INCREMENTAL)
+# ------------------------------------------------------------------
+# motor_politicas.py calcula el EOQ con un Costo_Unitario fijo. Cuando el proveedor
+# cotiza escalas de precio (tramo j desde b_j unidades a precio p_j), el costo
+# anual incluye la compra y el costo de mantener pasa a ser H_j = TASA * precio:
+#   - Todas las unidades: el precio del tramo se aplica a todo el lote.
+#       CT_j(Q) = p_j D + K D / Q + TASA p_j Q / 2
+#   - Incremental: p_j solo para las unidades por encima de b_j. Con
+#     R_j = sum_{k<j} p_k (b_{k+1} - b_k) el costo de un lote es R_j + p_j (Q - b_j) y
+#       CT_j(Q) = p_j D + (K + R_j - p_j b_j) D / Q + TASA (R_j - p_j b_j + p_j Q) / 2
+# En cada tramo el óptimo es el Q* de su fórmula llevado a [b_j, b_{j+1}]; se evalúan
+# todos los tramos de todos los ítems como un arreglo (ítems, tramos) y se elige
+# el de menor costo. En todas las unidades, llevar Q* hasta b_{j+1} con el precio
+# p_j nunca gana al tramo j+1, así que el mismo recorte sirve para los dos esquemas.
+#
+# Entrada: pronóstico Prophet y CSV Componente,Desde,Precio con las escalas cotizadas
+#          (--escalas). Sin cotizaciones, --ejemplo usa ESCALA_EJEMPLO (descuentos
+#          inventados sobre el Costo_Unitario) solo para mostrar el cálculo.
+# Salida:  outputs/inventory/optimizacion/descuentos_cantidad.csv
+#          (con --ejemplo: descuentos_cantidad_ejemplo.csv; el ahorro no es un resultado)
+#
+# Uso: python src/inventory/descuentos_cantidad.py --tipo incremental --escalas escalas.csv
+#      python src/inventory/descuentos_cantidad.py --tipo todas --ejemplo
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, matriz_demanda
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+# (desde unidades, descuento sobre Costo_Unitario). Inventada: no es una cotización.
+ESCALA_EJEMPLO = ((0, 0.00), (10, 0.02), (25, 0.04), (50, 0.06))
+
+
+# Escalas ------------------------------------------------------------------------
+
+def escalas_matriz(escalas: pd.DataFrame, componentes) -> tuple:
+    """Escalas largas (Componente, Desde, Precio) a matrices (ítems, tramos) ordenadas.
+
+    Los ítems con menos tramos se completan con NaN. El primer tramo de cada ítem
+    debe arrancar en 0.
+    """
+    escalas = escalas.sort_values(['Componente', 'Desde'])
+    tramo = escalas.groupby('Componente').cumcount().to_numpy()
+    fila = pd.Index(componentes).get_indexer(escalas['Componente'])
+    if np.any(fila < 0):
+        raise ValueError('Escalas para componentes desconocidos: '
+                         + ', '.join(sorted(set(escalas['Componente'][fila < 0]))))
+    desde = np.full((len(componentes), tramo.max() + 1), np.nan)
+    precio = np.full_like(desde, np.nan)
+    desde[fila, tramo] = escalas['Desde'].to_numpy(dtype=float)
+    precio[fila, tramo] = escalas['Precio'].to_numpy(dtype=float)
+    if not np.all(desde[:, 0] == 0):
+        raise ValueError('Cada componente necesita un tramo que empiece en 0 unidades')
+    return desde, precio
+
+
+def escala_ejemplo(componentes: pd.DataFrame) -> pd.DataFrame:
+    desde, descuento = np.array(ESCALA_EJEMPLO).T
+    return pd.DataFrame({
+        'Componente': np.repeat(componentes['Componente'].to_numpy(), len(desde)),
+        'Desde': np.tile(desde, len(componentes)),
+        'Precio': np.outer(componentes['Costo_Unitario'].to_numpy(dtype=float), 1 - descuento).ravel(),
+    })
+
+
+# Motor --------------------------------------------------------------------------
+
+def eoq_descuentos(D, desde, precio, tipo: str = 'todas', costo_ordenar=COSTO_ORDENAR,
+                   tasa=TASA_MANTENIMIENTO) -> dict:
+    """Lote de mínimo costo anual (compra + pedir + mantener) con escalas de precio.
+
+    D es la demanda anual por ítem; desde y precio son (ítems, tramos) con NaN en
+    los tramos que no existen. Devuelve Q, el tramo elegido, el precio unitario
+    medio del lote y el costo anual por ítem, más el Q y el costo de cada tramo.
+    """
+    D = np.asarray(D, dtype=float)[:, None]
+    desde = np.asarray(desde, dtype=float)
+    precio = np.asarray(precio, dtype=float)
+    K = float(costo_ordenar)
+    existe = ~np.isnan(precio)
+    hasta = np.concatenate([desde[:, 1:], np.full((len(desde), 1), np.nan)], axis=1)
+    hasta = np.where(np.isnan(hasta), np.inf, hasta)
+
+    if tipo == 'incremental':
+        ancho = np.nan_to_num(np.where(np.isinf(hasta), 0.0, hasta) - desde)
+        R = np.concatenate([np.zeros((len(desde), 1)),
+                            np.cumsum(np.nan_to_num(precio) * ancho, axis=1)[:, :-1]], axis=1)
+        fijo = R - precio * desde                      # compra de un lote = fijo + p_j Q
+    elif tipo == 'todas':
+        fijo = np.zeros_like(precio)
+    else:
+        raise ValueError(f"tipo de descuento desconocido: {tipo!r}")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Q_opt = np.sqrt(2 * D * (K + fijo) / (tasa * precio))
+        Q = np.clip(Q_opt, np.maximum(desde, 1e-12), hasta)
+        costo = precio * D + (K + fijo) * D / Q + tasa * (fijo + precio * Q) / 2
+    costo = np.where(existe, costo, np.inf)
+    tramo = np.argmin(costo, axis=1)
+    filas = np.arange(len(D))
+    Q_elegido = Q[filas, tramo]
+    return {
+        'Q': Q_elegido, 'tramo': tramo,
+        'precio_medio': (fijo[filas, tramo] + precio[filas, tramo] * Q_elegido) / Q_elegido,
+        'costo': costo[filas, tramo], 'Q_tramos': np.where(existe, Q, np.nan), 'costo_tramos': costo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EOQ con descuentos por cantidad')
+    parser.add_argument('--tipo', choices=['todas', 'incremental'], default='todas',
+                        help='Descuento sobre todas las unidades o incremental')
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument('--escalas', help='CSV con columnas Componente,Desde,Precio (cotización del proveedor)')
+    origen.add_argument('--ejemplo', action='store_true',
+                        help='Usar ESCALA_EJEMPLO (descuentos inventados del 2/4/6%%) para ver el cálculo')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    D = matriz_demanda(componentes, df_pronostico).sum(axis=1)
+    escalas = pd.read_csv(args.escalas) if args.escalas else escala_ejemplo(componentes)
+    desde, precio = escalas_matriz(escalas, componentes['Componente'])
+
+    traza.etapa('optimizacion')
+    traza.filas(desde.size)
+    res = eoq_descuentos(D, desde, precio, args.tipo)
+    # Referencia: EOQ de motor_politicas.py con Costo_Unitario fijo
+    CU = componentes['Costo_Unitario'].to_numpy(dtype=float)
+    eoq_lista = np.sqrt(2 * COSTO_ORDENAR * D / (TASA_MANTENIMIENTO * CU))
+    costo_lista = CU * D + np.sqrt(2 * COSTO_ORDENAR * D * TASA_MANTENIMIENTO * CU)
+
+    traza.etapa('exportacion')
+    filas = np.arange(len(D))
+    tabla = pd.DataFrame({
+        'Componente': componentes['Componente'].to_numpy(),
+        'Demanda_Anual': D,
+        'EOQ_Precio_Lista': eoq_lista,
+        'Costo_Anual_Precio_Lista': costo_lista,
+        'Tramo': res['tramo'] + 1,
+        'Desde_Tramo': desde[filas, res['tramo']],
+        'Precio_Tramo': precio[filas, res['tramo']],
+        'Precio_Medio_Lote': res['precio_medio'],
+        'Q_Descuento': res['Q'],
+        'Pedidos_Anio': D / res['Q'],
+        'Costo_Anual_Descuento': res['costo'],
+    })
+    tabla['Ahorro_Anual'] = tabla['Costo_Anual_Precio_Lista'] - tabla['Costo_Anual_Descuento']
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = ('' if args.tipo == 'todas' else f'_{args.tipo}') + ('_ejemplo' if args.ejemplo else '')
+    salida = os.path.join(OUTPUT_DIR, f'descuentos_cantidad{sufijo}.csv')
+    tabla.to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"EOQ CON DESCUENTOS POR CANTIDAD ({args.tipo}, {desde.shape[1]} tramos)")
+    print("=" * 70)
+    cols = ['Componente', 'EOQ_Precio_Lista', 'Tramo', 'Q_Descuento', 'Precio_Medio_Lote', 'Ahorro_Anual']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\nAhorro anual total{' (ejemplo)' if args.ejemplo else ''}: {tabla['Ahorro_Anual'].sum():,.2f}")
+    if args.ejemplo:
+        print("\n[AVISO] Escalas de ejemplo (ESCALA_EJEMPLO), no cotizadas por el proveedor:")
+        print("        el ahorro solo ilustra el cálculo. Usar --escalas con precios reales.")
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,33 +5,37 @@
 # - Estación PICO: Oct-Nov (CV = 0.0919 < 0.20)
 # - Estación NORMAL: Resto del año (CV = 0.0716 < 0.20)
 # - Recomendado cuando el CV anual >= 0.20.
-# Entradas: outputs/forecast/prophet_forecast.csv
-# Salidas:  outputs/inventory/eoq_estacional_*.csv, eoq_estacional_*.png
+# Con --estaciones auto cada componente recibe sus propias estaciones (1 a
+# --max-estaciones), agrupando los índices estacionales del pronóstico (estaciones.py);
+# el resultado va a eoq_estacional_auto_<modo>.csv y no reemplaza las salidas fijas.
+# Entradas: pronóstico Prophet (outputs/resultados.db; si no está, outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas:  outputs/inventory/eoq_estacional/eoq_estacional_*.csv, tabla_valores_clave*.csv, *.png
+#           tabla 'politicas' de outputs/resultados.db
 
 
 import os
 import sys
+from contextlib import closing
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 
-# --- Manejo de argumentos para definir 'modo' ---
-if len(sys.argv) > 2 and sys.argv[1] == '--modo':
-    modo = sys.argv[2].lower()
+# --- Manejo de argumentos: modo y esquema de estaciones ---
+opciones = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+if '--modo' in opciones:
+    modo = opciones['--modo'].lower()
     if modo not in ['costo', 'servicio']:
         print("Error: El modo debe ser 'costo' o 'servicio'.")
         sys.exit(1)
 else:
-    print("Uso: python eoq_estacional.py --modo [costo|servicio]")
+    print("Uso: python eoq_estacional.py --modo [costo|servicio] [--estaciones fijas|auto] [--max-estaciones N]")
     sys.exit(1)
-
-# Parámetro de tasa de mantenimiento anual (20% del costo unitario)
-TASA_MANTENIMIENTO = 0.20
-# Costo de ordenar por pedido
-COSTO_ORDENAR = 300
-# Z-score para nivel de servicio 95%
-Z_ALPHA = 1.645
+esquema = opciones.get('--estaciones', 'fijas').lower()
+if esquema not in ['fijas', 'auto']:
+    print("Error: --estaciones debe ser 'fijas' o 'auto'.")
+    sys.exit(1)
+max_estaciones = int(opciones.get('--max-estaciones', 3))
 
 # Definir rutas necesarias antes de usarlas
 script_dir = os.path.dirname(__file__) or os.getcwd()
@@ -39,352 +43,145 @@ project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
 output_dir = os.path.join(project_root, 'outputs', 'inventory', 'eoq_estacional')
 os.makedirs(output_dir, exist_ok=True)
 forecast_dir = os.path.join(project_root, 'outputs', 'forecast')
-componentes = pd.DataFrame({
-    'Componente': [
-        'Carrocería Artesanal de Época',
-        'Motor de Alto Rendimiento V8',
-        'Motor de Cilindros de Línea Raro',
-        'Carrocería Estándar (Fibra)',
-        'Tapicería de Cuero Premium'
-    ],
-    'Auto_Foco': [
-        'Vintage',
-        'Clásico',
-        'Vintage',
-        'Clásico',
-        'Ambos'
-    ],
-    'Costo_Unitario': [
-        15000,
-        9000,
-        12000,
-        6500,
-        4000
-    ],
-    'Uso_por_Auto': [
-        1, 1, 1, 1, 1
-    ],
-    'Volumen_m3': [
-        4.0,
-        0.8,
-        0.9,
-        3.5,
-        0.5
-    ],
-    'Lead_Time_Semanas': [
-        10,
-        6,
-        12,
-        4,
-        8
-    ]
-})
+
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+from resultados_db import conectar, registrar_corrida, guardar_politicas, leer_pronostico
+
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, Z_ALPHA, SEMANAS_POR_MES,
+                         matriz_demanda)
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas, estaciones_automaticas
+from motor_politicas import calcular_politicas, tabla_estacion
+
+componentes = COMPONENTES.copy()
 
 # === 3. CARGAR Y SEGMENTAR PRONÓSTICO PROPHET ===
 print("\n--- Cargando y segmentando pronóstico Prophet ---")
 
 
-# Usar exactamente los valores de Autos_Clasicos de prophet_forecast.csv
+traza.etapa('carga')
+# Usar exactamente los valores de Autos_Clasicos del último pronóstico Prophet
 prophet_forecast_path = os.path.join(forecast_dir, 'prophet', 'prophet_forecast.csv')
-df_pronostico = pd.read_csv(prophet_forecast_path)
-df_pronostico = df_pronostico[pd.to_datetime(df_pronostico['Periodo'], errors='coerce').notnull()].copy()
+df_pronostico = leer_pronostico('prophet', prophet_forecast_path)
 df_pronostico['Mes'] = pd.to_datetime(df_pronostico['Periodo']).dt.month
+traza.filas(len(df_pronostico))
 
-# Definir meses de cada estación
-MESES_PICO = [10, 11]
-MESES_NORMAL = [1, 2, 3, 4, 5, 6, 7, 8, 9, 12]
-
-
-# Demanda exacta de Autos_Clasicos y Autos_Vintage por estación
-demanda_pico_clasicos = df_pronostico[df_pronostico['Mes'].isin(MESES_PICO)]['Autos_Clasicos'].sum()
-demanda_normal_clasicos = df_pronostico[df_pronostico['Mes'].isin(MESES_NORMAL)]['Autos_Clasicos'].sum()
-demanda_pico_vintage = df_pronostico[df_pronostico['Mes'].isin(MESES_PICO)]['Autos_Vintage'].sum()
-demanda_normal_vintage = df_pronostico[df_pronostico['Mes'].isin(MESES_NORMAL)]['Autos_Vintage'].sum()
+demanda = matriz_demanda(componentes, df_pronostico)
 
-demanda_total_pico = demanda_pico_clasicos + demanda_pico_vintage
-demanda_total_normal = demanda_normal_clasicos + demanda_normal_vintage
-
-print("\nResultados EOQ estacional usando demanda EXACTA de cada temporada:")
-# Mostrar el EOQ para 'Motor de Alto Rendimiento V8' como ejemplo
-try:
-    eoq_pico = None
-    eoq_normal = None
-    if 'df_pico' in locals() and not df_pico.empty:
-        eoq_pico = df_pico[df_pico['Componente'] == 'Motor de Alto Rendimiento V8']['EOQ'].values[0]
-    if 'df_normal' in locals() and not df_normal.empty:
-        eoq_normal = df_normal[df_normal['Componente'] == 'Motor de Alto Rendimiento V8']['EOQ'].values[0]
-    print(f"\nTemporada pico (meses {MESES_PICO}):\n  Demanda total: {demanda_pico}\n  EOQ Motor V8: {eoq_pico:.2f}" if eoq_pico is not None else "EOQ Motor V8 no disponible para pico")
-    print(f"\nTemporada normal (meses {MESES_NORMAL}):\n  Demanda total: {demanda_normal}\n  EOQ Motor V8: {eoq_normal:.2f}" if eoq_normal is not None else "EOQ Motor V8 no disponible para normal")
-except Exception as e:
-    print(f"Error mostrando EOQ Motor V8: {e}")
-
-# === 4. CALCULAR DEMANDA ANUALIZADA POR ESTACIÓN ===
+# === 4. DEMANDA POR ESTACIÓN (esquema fijo PICO / NORMAL) ===
 print("\n" + "="*70)
 print("CÁLCULO DE DEMANDA POR ESTACIÓN")
 print("="*70)
 
-# Duración de cada estación (en meses y fracción del año)
-MESES_EN_PICO = len(MESES_PICO)  # 2 meses
-MESES_EN_NORMAL = len(MESES_NORMAL)  # 10 meses
-
-FRACCION_PICO = MESES_EN_PICO / 12  # 2/12 = 0.167
-FRACCION_NORMAL = MESES_EN_NORMAL / 12  # 10/12 = 0.833
-
-
-# Demanda total por estación (ya son escalares)
-demanda_total_anual = demanda_total_pico + demanda_total_normal
-
-# Demanda mensual promedio por estación
-demanda_mensual_pico = demanda_total_pico / MESES_EN_PICO if MESES_EN_PICO > 0 else 0
-demanda_mensual_normal = demanda_total_normal / MESES_EN_NORMAL if MESES_EN_NORMAL > 0 else 0
 
-print(f"\n  ESTACIÓN PICO ({MESES_EN_PICO} meses = {FRACCION_PICO*100:.1f}% del año):")
-print(f"    Demanda total:          ${demanda_total_pico:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-print(f"    Demanda mensual prom:   ${demanda_mensual_pico:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+def formato_miles(valor):
+    return f"{valor:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
 
-print(f"\n  ESTACIÓN NORMAL ({MESES_EN_NORMAL} meses = {FRACCION_NORMAL*100:.1f}% del año):")
-print(f"    Demanda total:          ${demanda_total_normal:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-print(f"    Demanda mensual prom:   ${demanda_mensual_normal:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
 
-print(f"\n  TOTAL ANUAL:              ${demanda_total_anual:>15,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+for nombre, meses_est in ESTACIONES_FIJAS.items():
+    en_estacion = df_pronostico['Mes'].isin(meses_est)
+    clasicos = df_pronostico.loc[en_estacion, 'Autos_Clasicos'].sum()
+    vintage = df_pronostico.loc[en_estacion, 'Autos_Vintage'].sum()
+    total = clasicos + vintage
+    print(f"\n  ESTACIÓN {nombre} (meses {meses_est} = {len(meses_est) / 12 * 100:.1f}% del año):")
+    print(f"    Demanda total:          ${formato_miles(total)}")
+    print(f"    Demanda mensual prom:   ${formato_miles(total / len(meses_est))}")
+    print(f"    Unidades estimadas:     {total:>10,.0f} (Clásicos: {clasicos:.0f}, Vintage: {vintage:.0f})")
 
+total_anual = df_pronostico['Autos_Clasicos'].sum() + df_pronostico['Autos_Vintage'].sum()
+print(f"\n  TOTAL ANUAL:              ${formato_miles(total_anual)}")
 
-
-print(f"\n  Unidades estimadas PICO:    {demanda_total_pico:>10,.0f} (Clásicos: {demanda_pico_clasicos:.0f}, Vintage: {demanda_pico_vintage:.0f})")
-print(f"  Unidades estimadas NORMAL:  {demanda_total_normal:>10,.0f} (Clásicos: {demanda_normal_clasicos:.0f}, Vintage: {demanda_normal_vintage:.0f})")
-
-# === 6. FUNCIONES EOQ ===
-def calcular_eoq(D, S, H):
-    # EOQ = sqrt(2DS/H)
-    return np.sqrt((2 * D * S) / H)
-
-def calcular_costo_total(D, Q, S, H, SS=0):
-    """CTE = (D/Q)*S + (Q/2 + SS)*H"""
-    costo_ordenar = (D / Q) * S
-    costo_mantener = ((Q / 2) + SS) * H
-    return costo_ordenar + costo_mantener
-
-# === 7. CALCULAR EOQ POR ESTACIÓN ===
-print("\n" + "="*70)
-print("EOQ POR ESTACIÓN - POLÍTICA A (Óptima por Costos)")
-print("="*70)
-
-SEMANAS_POR_MES = 4.33
-
-def calcular_demanda_componente_estacion(row, demanda_clasicos, demanda_vintage):
-    """Calcula demanda de componente para una estación según tipo de auto"""
-    if row['Auto_Foco'] == 'Clásico':
-        return demanda_clasicos * row['Uso_por_Auto']
-    elif row['Auto_Foco'] == 'Vintage':
-        return demanda_vintage * row['Uso_por_Auto']
-    elif row['Auto_Foco'] == 'Ambos':
-        # Para componentes 'Ambos', la demanda es la suma de Autos_Clasicos y Autos_Vintage multiplicada por Uso_por_Auto
-        return (demanda_clasicos + demanda_vintage) * row['Uso_por_Auto']
-    else:
-        # Si hay un valor inesperado, lanzar advertencia y devolver 0
-        print(f"[ADVERTENCIA] Auto_Foco inesperado: {row['Auto_Foco']} para componente {row['Componente']}")
-        return 0
-
-# Calcular demanda por componente para cada estación
-resultados_pico = []
-resultados_normal = []
-
-for idx, row in componentes.iterrows():
-    C = row['Costo_Unitario']
-    H = C * TASA_MANTENIMIENTO  # Anual
-    L = row['Lead_Time_Semanas']
-    
-    if modo == 'servicio':
-        # --- EOQ anual único ---
-        # Demanda mensual de cada componente (12 meses)
-        mask_clasico = (row['Auto_Foco'] == 'Clásico')
-        mask_vintage = (row['Auto_Foco'] == 'Vintage')
-        mask_ambos = (row['Auto_Foco'] == 'Ambos')
-        if mask_clasico:
-            demanda_mensual = df_pronostico['Autos_Clasicos'] * row['Uso_por_Auto']
-        elif mask_vintage:
-            demanda_mensual = df_pronostico['Autos_Vintage'] * row['Uso_por_Auto']
-        elif mask_ambos:
-            demanda_mensual = (df_pronostico['Autos_Clasicos'] + df_pronostico['Autos_Vintage']) * row['Uso_por_Auto']
-        else:
-            demanda_mensual = pd.Series([0]*12)
-        D_anual = demanda_mensual.sum()
-        sigma_mensual = demanda_mensual.std(ddof=0)
-        Q = calcular_eoq(D_anual, COSTO_ORDENAR, H)
-        N = D_anual / Q if Q > 0 else 0
-        # Para cada estación, calcular demanda y SS usando sigma_mensual de la estación
-        for estacion, meses_estacion, fraccion, nombre_estacion in [
-            ('PICO', MESES_PICO, FRACCION_PICO, 'PICO'),
-            ('NORMAL', MESES_NORMAL, FRACCION_NORMAL, 'NORMAL')]:
-            D_est = demanda_mensual[df_pronostico['Mes'].isin(meses_estacion)].sum()
-            semanas_est = len(meses_estacion) * SEMANAS_POR_MES
-            demanda_semanal_est = D_est / semanas_est if semanas_est > 0 else 0
-            # Lead time en meses
-            L_meses = L / SEMANAS_POR_MES
-            # Calcular sigma_mensual solo con los meses de la estación
-            demanda_mensual_est = demanda_mensual[df_pronostico['Mes'].isin(meses_estacion)]
-            if len(demanda_mensual_est) < 2:
-                print(f"[ADVERTENCIA] Solo hay {len(demanda_mensual_est)} mes(es) en la estación {nombre_estacion} para el componente {row['Componente']}. No se puede calcular sigma_mensual correctamente.")
-                sigma_mensual_est = float('nan')
-            else:
-                sigma_mensual_est = demanda_mensual_est.std(ddof=0)
-            # Stock de seguridad específico por estación
-            sigma_L = sigma_mensual_est * np.sqrt(L_meses)
-            SS = Z_ALPHA * sigma_L
-            # ROP
-            ROP = demanda_semanal_est * L + SS
-            # Tiempo entre pedidos
-            tiempo_entre_pedidos = semanas_est / N if N > 0 else np.nan
-            # Costo total: el costo de mantener el SS debe ser anual (H), no fraccionado
-            CTE = (D_est / Q) * COSTO_ORDENAR + (Q / 2) * H * fraccion + SS * H + 0  # +0 para mantener formato
-            resultados = resultados_pico if estacion == 'PICO' else resultados_normal
-            resultados.append({
-                'Componente': row['Componente'],
-                'Estacion': nombre_estacion,
-                'Demanda_Estacion': D_est,
-                'EOQ': Q,
-                'Num_Pedidos': N,
-                'Tiempo_Entre_Pedidos_Semanas': tiempo_entre_pedidos,
-                'Tiempo_Entre_Pedidos_Dias': tiempo_entre_pedidos * 7 if not np.isnan(tiempo_entre_pedidos) else np.nan,
-                'ROP': ROP,
-                'CTE': CTE,
-                'Costo_Unitario': C,
-                'Stock_Seguridad': SS,
-                'sigma_mensual': sigma_mensual_est
-            })
-    else:
-        # --- ESTACIÓN PICO ---
-        D_pico = calcular_demanda_componente_estacion(row, demanda_pico_clasicos, demanda_pico_vintage)
-        Q_pico = calcular_eoq(D_pico, COSTO_ORDENAR, H)
-        N_pico = D_pico / Q_pico if Q_pico > 0 else 0
-        CTE_pico = calcular_costo_total(D_pico, Q_pico, COSTO_ORDENAR, H * FRACCION_PICO)
-        semanas_pico = MESES_EN_PICO * SEMANAS_POR_MES
-        demanda_semanal_pico = D_pico / semanas_pico if semanas_pico > 0 else 0
-        ROP_pico = demanda_semanal_pico * L
-        tiempo_entre_pedidos_pico = semanas_pico / N_pico if N_pico > 0 else np.nan
-        resultados_pico.append({
-            'Componente': row['Componente'],
-            'Estacion': 'PICO',
-            'Demanda_Estacion': D_pico,
-            'EOQ': Q_pico,
-            'Num_Pedidos': N_pico,
-            'Tiempo_Entre_Pedidos_Semanas': tiempo_entre_pedidos_pico,
-            'Tiempo_Entre_Pedidos_Dias': tiempo_entre_pedidos_pico * 7 if not np.isnan(tiempo_entre_pedidos_pico) else np.nan,
-            'ROP': ROP_pico,
-            'CTE': CTE_pico,
-            'Costo_Unitario': C
-        })
-        # --- ESTACIÓN NORMAL ---
-        D_normal = calcular_demanda_componente_estacion(row, demanda_normal_clasicos, demanda_normal_vintage)
-        Q_normal = calcular_eoq(D_normal, COSTO_ORDENAR, H)
-        N_normal = D_normal / Q_normal if Q_normal > 0 else 0
-        CTE_normal = calcular_costo_total(D_normal, Q_normal, COSTO_ORDENAR, H * FRACCION_NORMAL)
-        semanas_normal = MESES_EN_NORMAL * SEMANAS_POR_MES
-        demanda_semanal_normal = D_normal / semanas_normal if semanas_normal > 0 else 0
-        ROP_normal = demanda_semanal_normal * L
-        tiempo_entre_pedidos_normal = semanas_normal / N_normal if N_normal > 0 else np.nan
-        resultados_normal.append({
-            'Componente': row['Componente'],
-            'Estacion': 'NORMAL',
-            'Demanda_Estacion': D_normal,
-            'EOQ': Q_normal,
-            'Num_Pedidos': N_normal,
-            'Tiempo_Entre_Pedidos_Semanas': tiempo_entre_pedidos_normal,
-            'Tiempo_Entre_Pedidos_Dias': tiempo_entre_pedidos_normal * 7 if not np.isnan(tiempo_entre_pedidos_normal) else np.nan,
-            'ROP': ROP_normal,
-            'CTE': CTE_normal,
-            'Costo_Unitario': C
-        })
-
-
-# === NUEVA SECCIÓN: CÁLCULO DE COSTO TOTAL ÓPTIMO POR COSTOS (FÓRMULA COMPLETA) ===
+# === 6. EOQ POR ESTACIÓN (motor vectorizado, ambos modos en una llamada) ===
 print("\n" + "="*70)
-print("COSTO TOTAL ÓPTIMO POR COSTOS (FÓRMULA COMPLETA)")
+print(f"EOQ POR ESTACIÓN - {'POLÍTICA A (Óptima por Costos)' if modo == 'costo' else 'POLÍTICA B (Nivel de Servicio)'}")
 print("="*70)
 
-def calcular_ct_optimo(K, D, Q, h, c):
-    # TC(Q) = (K*D)/Q + (h*Q)/2 + c*D
-    # K: costo de ordenar por pedido
-    # D: demanda de la estación
-    # Q: cantidad de pedido (EOQ)
-    # h: costo de mantener una unidad durante la estación (c * tasa_mant * fraccion_estacion)
-    # c: costo unitario de compra
-    return (K * D) / Q + (h * Q) / 2 + c * D if Q > 0 else np.nan
-
-# Agregar columna CT_Optimo a los resultados de cada estación
-for res in resultados_pico:
-    # h para estación pico: c * tasa_mant * fracción_pico
-    h_pico = res['Costo_Unitario'] * TASA_MANTENIMIENTO * FRACCION_PICO
-    res['CT_Optimo'] = calcular_ct_optimo(COSTO_ORDENAR, res['Demanda_Estacion'], res['EOQ'], h_pico, res['Costo_Unitario'])
-for res in resultados_normal:
-    # h para estación normal: c * tasa_mant * fracción_normal
-    h_normal = res['Costo_Unitario'] * TASA_MANTENIMIENTO * FRACCION_NORMAL
-    res['CT_Optimo'] = calcular_ct_optimo(COSTO_ORDENAR, res['Demanda_Estacion'], res['EOQ'], h_normal, res['Costo_Unitario'])
-
-# Exportar resultados únicos por modo
-df_pico = pd.DataFrame(resultados_pico)
-df_normal = pd.DataFrame(resultados_normal)
-df_pico.to_csv(os.path.join(output_dir, f'eoq_estacional_pico_{modo}.csv'), index=False)
-df_normal.to_csv(os.path.join(output_dir, f'eoq_estacional_normal_{modo}.csv'), index=False)
+traza.etapa('politica')
+traza.filas(len(componentes))
+# Estación de cada mes del pronóstico: común (0 = PICO, 1 = NORMAL) o propia de cada ítem
+if esquema == 'auto':
+    estacion_mes = estaciones_automaticas(demanda, max_estaciones=max_estaciones)
+else:
+    estacion_mes = etiquetas_fijas(df_pronostico['Mes'])
+politicas = calcular_politicas(
+    demanda, estacion_mes, componentes['Costo_Unitario'], componentes['Lead_Time_Semanas'],
+    tasa_mantenimiento=TASA_MANTENIMIENTO, costo_ordenar=COSTO_ORDENAR,
+    z=Z_ALPHA, semanas_por_mes=SEMANAS_POR_MES,
+    lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])
+
+if esquema == 'auto':
+    # Estaciones propias de cada ítem: una tabla larga (ítem x estación) con los meses
+    # de cada estación. No reemplaza los CSV del esquema fijo ni escribe en la base.
+    traza.etapa('exportacion')
+    meses_cal = df_pronostico['Mes'].to_numpy()
+    tablas_auto = []
+    for k in range(estacion_mes.max() + 1):
+        # E1 es la estación de mayor demanda de cada ítem
+        df_k = tabla_estacion(politicas, modo, k, f'E{k + 1}', componentes)
+        df_k.insert(2, 'Meses', ['-'.join(str(m) for m in sorted(meses_cal[fila == k])) for fila in estacion_mes])
+        tablas_auto.append(df_k[df_k['Meses'] != ''])
+    df_auto = pd.concat(tablas_auto).sort_index(kind='stable').reset_index(drop=True)
+    auto_path = os.path.join(output_dir, f'eoq_estacional_auto_{modo}.csv')
+    df_auto.to_csv(auto_path, index=False)
+    print(df_auto[['Componente', 'Estacion', 'Meses', 'Demanda_Estacion', 'EOQ', 'ROP', 'CTE']].to_string(index=False))
+    print(f"\n[OK] Estaciones automáticas (máximo {max_estaciones}) exportadas a: {auto_path}")
+    traza.fin()
+    sys.exit(0)
+
+traza.etapa('exportacion')
+# Exportar resultados únicos por modo, un CSV por estación
+nombres = list(ESTACIONES_FIJAS)
+tablas = {nombre: tabla_estacion(politicas, modo, k, nombre, componentes) for k, nombre in enumerate(nombres)}
+for nombre, df_est in tablas.items():
+    df_est.to_csv(os.path.join(output_dir, f'eoq_estacional_{nombre.lower()}_{modo}.csv'), index=False)
 
 # Exportar resumen por modo
-df_resumen = df_pico[['Componente','CTE','CT_Optimo']].copy()
-df_resumen = df_resumen.rename(columns={'CTE':'CTE_PICO','CT_Optimo':'CT_Optimo_PICO'})
-df_resumen = df_resumen.merge(
-    df_normal[['Componente','CTE','CT_Optimo']].rename(columns={'CTE':'CTE_NORMAL','CT_Optimo':'CT_Optimo_NORMAL'}),
-    on='Componente', how='outer')
-df_resumen['CTE_TOTAL'] = df_resumen['CTE_PICO'].fillna(0) + df_resumen['CTE_NORMAL'].fillna(0)
-df_resumen['CT_Optimo_TOTAL'] = df_resumen['CT_Optimo_PICO'].fillna(0) + df_resumen['CT_Optimo_NORMAL'].fillna(0)
+df_resumen = None
+for nombre, df_est in tablas.items():
+    df_nombre = df_est[['Componente', 'CTE', 'CT_Optimo']].rename(
+        columns={'CTE': f'CTE_{nombre}', 'CT_Optimo': f'CT_Optimo_{nombre}'})
+    df_resumen = df_nombre if df_resumen is None else df_resumen.merge(df_nombre, on='Componente', how='outer')
+df_resumen['CTE_TOTAL'] = sum(df_resumen[f'CTE_{nombre}'].fillna(0) for nombre in nombres)
+df_resumen['CT_Optimo_TOTAL'] = sum(df_resumen[f'CT_Optimo_{nombre}'].fillna(0) for nombre in nombres)
+columnas_costo = [col for col in df_resumen.columns if col != 'Componente']
 total_row = {col: '' for col in df_resumen.columns}
-for col in ['CTE_PICO','CT_Optimo_PICO','CTE_NORMAL','CT_Optimo_NORMAL','CTE_TOTAL','CT_Optimo_TOTAL']:
+for col in columnas_costo:
     total_row[col] = df_resumen[col].sum()
 total_row['Componente'] = 'TOTAL'
 df_resumen = pd.concat([df_resumen, pd.DataFrame([total_row])], ignore_index=True)
-for col in ['CTE_PICO','CT_Optimo_PICO','CTE_NORMAL','CT_Optimo_NORMAL','CTE_TOTAL','CT_Optimo_TOTAL']:
+for col in columnas_costo:
     df_resumen[col] = pd.to_numeric(df_resumen[col], errors='coerce').round(4)
 df_resumen.to_csv(os.path.join(output_dir, f'eoq_estacional_resumen_{modo}.csv'), index=False)
 
 # Calcular totales para gráficos
-cte_pico_total = df_pico['CTE'].sum()
-cte_normal_total = df_normal['CTE'].sum()
-cte_anual_estacional = cte_pico_total + cte_normal_total
+cte_por_estacion = [df_est['CTE'].sum() for df_est in tablas.values()]
+cte_anual_estacional = sum(cte_por_estacion)
 
 
 # === 11. TABLA DE VALORES CLAVE POR COMPONENTE Y ESTACIÓN ===
-import tabulate
 print("\n" + "="*70)
 print("TABLA DE VALORES CLAVE POR COMPONENTE Y ESTACIÓN")
 print("="*70)
 
-tabla = []
 columnas = [
     "Componente", "Estacion", "Demanda_Estacion", "EOQ", "Num_Pedidos", "Lead_Time_Semanas",
     "ROP", "Stock_Seguridad", "sigma_mensual", "fraccion", "CTE", "CT_Optimo"
 ]
 
-
-# Usar el sigma_mensual y fraccion almacenados en cada resultado por estación
-for df in [df_pico, df_normal]:
-    for idx, row in df.iterrows():
-        comp = row['Componente']
-        lead_time = componentes[componentes['Componente'] == comp]['Lead_Time_Semanas'].values[0]
-        ss = row['Stock_Seguridad'] if 'Stock_Seguridad' in row else 0
-        fraccion = row['fraccion'] if 'fraccion' in row else (FRACCION_PICO if row['Estacion'] == 'PICO' else FRACCION_NORMAL)
-        sigma_mensual = row['sigma_mensual'] if 'sigma_mensual' in row else np.nan
-        tabla.append([
-            comp,
-            row['Estacion'],
-            row['Demanda_Estacion'],
-            row['EOQ'],
-            row['Num_Pedidos'],
-            lead_time,
-            row['ROP'],
-            ss,
-            sigma_mensual,
-            fraccion,
-            row['CTE'],
-            row['CT_Optimo']
-        ])
+# Política A no lleva stock de seguridad (0) ni sigma (NaN)
+lead_times = componentes.set_index('Componente')['Lead_Time_Semanas']
+bloques = []
+for k, df_est in enumerate(tablas.values()):
+    bloque = df_est.copy()
+    bloque['Lead_Time_Semanas'] = bloque['Componente'].map(lead_times)
+    if 'Stock_Seguridad' not in bloque:
+        bloque['Stock_Seguridad'] = 0
+        bloque['sigma_mensual'] = np.nan
+    bloque['fraccion'] = politicas['estaciones']['fraccion'][k]
+    bloques.append(bloque[columnas])
+tabla_df = pd.concat(bloques, ignore_index=True)
+tabla = tabla_df.values.tolist()
 
 try:
     from tabulate import tabulate as tabulate_func
@@ -399,21 +196,32 @@ except ImportError:
 
 
 # Exportar la tabla de valores clave a un CSV
-tabla_df = pd.DataFrame(tabla, columns=columnas)
+# El modo servicio conserva los nombres históricos (los consume capacidad_minima_almacen.py);
+# el modo costo usa sufijo para que ambos modos puedan ejecutarse en paralelo.
+sufijo_salida = '' if modo == 'servicio' else f'_{modo}'
+
+# La base guarda los valores sin redondear, con el costo unitario (lo usa la sensibilidad)
+with closing(conectar()) as con, con:
+    corrida = registrar_corrida(con, 'eoq_estacional', {'modo': modo, 'tasa_mantenimiento': TASA_MANTENIMIENTO,
+                                                        'costo_ordenar': COSTO_ORDENAR})
+    guardar_politicas(con, corrida, modo, tabla_df.merge(componentes[['Componente', 'Costo_Unitario']],
+                                                         on='Componente', how='left'))
+
 # Redondear todas las columnas numéricas a 4 decimales
 for col in tabla_df.columns:
     if pd.api.types.is_numeric_dtype(tabla_df[col]):
         tabla_df[col] = tabla_df[col].round(4)
-tabla_csv_path = os.path.join(output_dir, 'tabla_valores_clave.csv')
+tabla_csv_path = os.path.join(output_dir, f'tabla_valores_clave{sufijo_salida}.csv')
 tabla_df.to_csv(tabla_csv_path, index=False)
 print(f"\n[OK] Tabla de valores clave exportada a: {tabla_csv_path}\n")
 print(tabulate_func(tabla, columnas, floatfmt=".4f"))
 
 print(f"\nResultados EOQ estacional ({modo}) exportados a: {output_dir}\n")
-print(df_pico.head())
-print(df_normal.head())
+for df_est in tablas.values():
+    print(df_est.head())
 print(df_resumen.head())
 
+traza.etapa('grafico')
 # === 12. VISUALIZACIÓN ===
 print("\n--- Generando gráficos ---")
 
@@ -421,41 +229,35 @@ fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 fig.suptitle('EOQ Estacional - Análisis por Temporadas\n(CV validado según Winston)', 
              fontsize=14, fontweight='bold')
 
-# Gráfico 1: Demanda por estación
-ax1 = axes[0, 0]
+colores = ['coral', 'steelblue', 'goldenrod', 'seagreen', 'orchid', 'slategray']
 x = np.arange(len(componentes))
-width = 0.35
-bars1 = ax1.bar(x - width/2, df_pico['Demanda_Estacion'], width, label='PICO (Oct-Nov)', color='coral')
-bars2 = ax1.bar(x + width/2, df_normal['Demanda_Estacion'], width, label='NORMAL (resto)', color='steelblue')
-ax1.set_ylabel('Demanda (unidades)')
-ax1.set_title('Demanda por Componente y Estación')
-ax1.set_xticks(x)
-ax1.set_xticklabels([c[:12]+'...' if len(c)>12 else c for c in componentes['Componente']], rotation=45, ha='right')
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# Gráfico 2: EOQ por estación
-ax2 = axes[0, 1]
-bars1 = ax2.bar(x - width/2, df_pico['EOQ'], width, label='EOQ PICO', color='coral')
-bars2 = ax2.bar(x + width/2, df_normal['EOQ'], width, label='EOQ NORMAL', color='steelblue')
-ax2.set_ylabel('Cantidad de pedido (EOQ)')
-ax2.set_title('EOQ Óptimo por Estación')
-ax2.set_xticks(x)
-ax2.set_xticklabels([c[:12]+'...' if len(c)>12 else c for c in componentes['Componente']], rotation=45, ha='right')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
+width = 0.7 / len(tablas)
+desplazamientos = (np.arange(len(tablas)) - (len(tablas) - 1) / 2) * width
+etiquetas_x = [c[:12]+'...' if len(c)>12 else c for c in componentes['Componente']]
+
+# Gráficos 1 y 2: demanda y EOQ por componente y estación
+for ax, campo, titulo, eje in [
+        (axes[0, 0], 'Demanda_Estacion', 'Demanda por Componente y Estación', 'Demanda (unidades)'),
+        (axes[0, 1], 'EOQ', 'EOQ Óptimo por Estación', 'Cantidad de pedido (EOQ)')]:
+    for k, (nombre, df_est) in enumerate(tablas.items()):
+        ax.bar(x + desplazamientos[k], df_est[campo], width, color=colores[k % len(colores)],
+               label=f'{nombre} (meses {ESTACIONES_FIJAS[nombre]})' if campo == 'Demanda_Estacion' else f'EOQ {nombre}')
+    ax.set_ylabel(eje)
+    ax.set_title(titulo)
+    ax.set_xticks(x)
+    ax.set_xticklabels(etiquetas_x, rotation=45, ha='right')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
 
 
 # Gráfico 3: CTE Política A por estación
 ax3 = axes[1, 0]
-categorias = ['PICO\nPol.A', 'NORMAL\nPol.A']
-valores_a = [cte_pico_total, cte_normal_total]
-colores = ['coral', 'steelblue']
-bars = ax3.bar(categorias, valores_a, color=colores)
+categorias = [f'{nombre}\nPol.A' for nombre in tablas]
+bars = ax3.bar(categorias, cte_por_estacion, color=colores[:len(tablas)])
 ax3.set_ylabel('CTE ($)')
 ax3.set_title('Costo Total por Estación (Política A)')
 ax3.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
-for bar, val in zip(bars, valores_a):
+for bar, val in zip(bars, cte_por_estacion):
     ax3.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 200, 
              f'${val/1000:.1f}K', ha='center', fontsize=9)
 ax3.grid(True, alpha=0.3, axis='y')
@@ -475,11 +277,13 @@ for bar, val in zip(bars, valores_total_a):
 ax4.grid(True, alpha=0.3, axis='y')
 
 plt.tight_layout()
-output_path = os.path.join(output_dir, 'eoq_estacional_comparacion.png')
+output_path = os.path.join(output_dir, f'eoq_estacional_comparacion{sufijo_salida}.png')
 plt.savefig(output_path, dpi=150, bbox_inches='tight')
 print(f"[OK] Gráfico guardado: {output_path}")
 plt.close()
 
+traza.fin()
+
 print("\n" + "="*70)
 print("Fin del análisis EOQ Estacional")
 print("="*70)
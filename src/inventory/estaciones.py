@@ -0,0 +1,134 @@
+# ESTACIONES DE DEMANDA
+# ---------------------
+# Definición de estaciones como arreglo mes -> etiqueta de estación.
+#   - Esquema fijo del caso: PICO = Oct-Nov, NORMAL = resto del año.
+#   - Esquema automático: por ítem, agrupa los índices estacionales del pronóstico
+#     (demanda del mes / demanda media) en k-means 1-D exacto. Se usa el menor
+#     número de estaciones en que todas cumplen CV < 0.20 (criterio de Winston),
+#     hasta un máximo dado. Todo vectorizado sobre los ítems.
+# La etiqueta 0 es siempre la estación de mayor demanda (la "pico").
+
+import numpy as np
+
+MESES_PICO = [10, 11]
+MESES_NORMAL = [1, 2, 3, 4, 5, 6, 7, 8, 9, 12]
+ESTACIONES_FIJAS = {'PICO': MESES_PICO, 'NORMAL': MESES_NORMAL}
+
+CV_MAXIMO = 0.20
+
+
+def etiquetas_fijas(meses, estaciones: dict = ESTACIONES_FIJAS) -> np.ndarray:
+    """Etiqueta (posición en 'estaciones') de cada mes calendario de 'meses'."""
+    meses = np.asarray(meses)
+    etiquetas = np.full(meses.shape, -1)
+    for k, meses_est in enumerate(estaciones.values()):
+        etiquetas[np.isin(meses, meses_est)] = k
+    if (etiquetas < 0).any():
+        faltantes = sorted(set(meses[etiquetas < 0].tolist()))
+        raise ValueError(f"Meses sin estación asignada: {faltantes}")
+    return etiquetas
+
+
+def indices_estacionales(demanda) -> np.ndarray:
+    """Demanda de cada mes sobre la demanda media del ítem (ítems x meses)."""
+    demanda = np.atleast_2d(np.asarray(demanda, dtype=float))
+    media = demanda.mean(axis=1, keepdims=True)
+    return np.divide(demanda, media, out=np.ones_like(demanda), where=media > 0)
+
+
+def _particiones_optimas(x_ordenado: np.ndarray, max_estaciones: int, min_meses: int):
+    """k-means 1-D exacto sobre filas ordenadas: los grupos son tramos contiguos.
+
+    Programación dinámica sobre la suma de cuadrados intra-grupo (costo de un tramo
+    por sumas prefijas). Devuelve, para cada k = 1..max_estaciones, los cortes
+    (ítems, k+1) de la partición óptima; cortes en -1 = infactible.
+    Los bucles son sobre meses (a lo sumo 12); cada paso opera sobre todos los ítems.
+    """
+    n, m = x_ordenado.shape
+    x = x_ordenado.T
+    s1 = np.concatenate([np.zeros((1, n)), np.cumsum(x, axis=0)])
+    s2 = np.concatenate([np.zeros((1, n)), np.cumsum(x ** 2, axis=0)])
+
+    def costo(i, j):
+        return np.maximum((s2[j] - s2[i]) - (s1[j] - s1[i]) ** 2 / (j - i), 0)
+
+    # dp[j]: mejor costo de partir [0, j) en k grupos
+    dp = np.full((m + 1, n), np.inf)
+    for j in range(min_meses, m + 1):
+        dp[j] = costo(0, j)
+    desde = [None]
+    cortes = {1: np.tile([0, m], (n, 1))}
+    items = np.arange(n)
+    for k in range(2, max_estaciones + 1):
+        nuevo = np.full((m + 1, n), np.inf)
+        origen = np.zeros((m + 1, n), dtype=int)
+        for j in range(k * min_meses, m + 1):
+            for i in range((k - 1) * min_meses, j - min_meses + 1):
+                candidato = dp[i] + costo(i, j)
+                mejor = candidato < nuevo[j]
+                nuevo[j] = np.where(mejor, candidato, nuevo[j])
+                origen[j] = np.where(mejor, i, origen[j])
+        dp = nuevo
+        desde.append(origen)
+        fin = np.full((n, k + 1), m)
+        fin[:, 0] = 0
+        actual = np.full(n, m)
+        for g in range(k - 1, 0, -1):
+            actual = desde[g][actual, items]
+            fin[:, g] = actual
+        fin[~np.isfinite(dp[m])] = -1
+        cortes[k] = fin
+    return cortes
+
+
+def _cv_grupos(demanda_ordenada: np.ndarray, fin: np.ndarray) -> np.ndarray:
+    """Máximo CV (ddof=0) de la demanda dentro de los tramos definidos por 'fin'."""
+    n, m = demanda_ordenada.shape
+    posicion = np.arange(m)[None, :]
+    peor = np.zeros(n)
+    for g in range(fin.shape[1] - 1):
+        en_grupo = (posicion >= fin[:, g:g + 1]) & (posicion < fin[:, g + 1:g + 2])
+        cuenta = en_grupo.sum(axis=1)
+        media = np.where(en_grupo, demanda_ordenada, 0).sum(axis=1) / np.maximum(cuenta, 1)
+        var = np.where(en_grupo, (demanda_ordenada - media[:, None]) ** 2, 0).sum(axis=1) / np.maximum(cuenta, 1)
+        cv = np.divide(np.sqrt(var), media, out=np.zeros(n), where=media > 0)
+        peor = np.maximum(peor, cv)
+    return peor
+
+
+def estaciones_automaticas(demanda, max_estaciones: int = 3, min_meses: int = 2,
+                           cv_maximo: float = CV_MAXIMO) -> np.ndarray:
+    """Etiquetas mes -> estación por ítem (ítems x meses) a partir de la demanda.
+
+    Para cada ítem se toma el menor k <= max_estaciones cuya partición óptima deja
+    todas las estaciones con CV < cv_maximo; si ninguna lo logra, se usa
+    max_estaciones. Cada estación tiene al menos min_meses meses (con uno solo no
+    hay sigma para el stock de seguridad).
+    """
+    demanda = np.atleast_2d(np.asarray(demanda, dtype=float))
+    n, m = demanda.shape
+    max_estaciones = max(1, min(max_estaciones, m // max(min_meses, 1)))
+    indices = indices_estacionales(demanda)
+    orden = np.argsort(-indices, axis=1, kind='stable')  # mayor índice primero
+    filas = np.arange(n)[:, None]
+    cortes = _particiones_optimas(indices[filas, orden], max_estaciones, min_meses)
+
+    elegido = np.tile([0, m] + [m] * (max_estaciones - 1), (n, 1))
+    pendiente = np.ones(n, dtype=bool)
+    for k in range(1, max_estaciones + 1):
+        fin = cortes[k]
+        factible = fin[:, 0] >= 0
+        cumple = factible & (_cv_grupos(demanda[filas, orden], np.where(fin < 0, 0, fin)) < cv_maximo)
+        if k == max_estaciones:
+            cumple = factible
+        usar = pendiente & cumple
+        elegido[usar, :k + 1] = fin[usar]
+        elegido[usar, k + 1:] = m
+        pendiente &= ~usar
+
+    # Etiqueta de cada posición ordenada = número de cortes internos a su izquierda
+    posicion = np.arange(m)[None, :]
+    etiqueta_ordenada = (posicion[:, :, None] >= elegido[:, None, 1:-1]).sum(axis=2)
+    etiquetas = np.empty((n, m), dtype=int)
+    etiquetas[filas, orden] = etiqueta_ordenada
+    return etiquetas
@@ -0,0 +1,225 @@
+# DEMANDA DURANTE UN LEAD TIME ESTOCÁSTICO
+# ----------------------------------------
+# motor_politicas.py calcula el SS con la aproximación normal de dos momentos:
+#   sigma_DL = sqrt(L sigma_sem^2 + d_sem^2 sigma_LT^2)
+# que con Lead_Time_Desvio_Semanas = 0 vuelve a sigma_mensual * sqrt(L / 4.33).
+# Acá se calcula la distribución completa de la demanda durante el lead time
+# (DDLT) cuando el lead time es una distribución discreta en semanas, sea una
+# normal discretizada (media y desvío de componentes.py) o una empírica
+# (--lead-times con Componente,Semanas,Probabilidad):
+#   P(DDLT) = sum_l P(L = l) * f^{*l},  f = demanda semanal discretizada
+# Con la transformada de Fourier la l-ésima convolución es una potencia, así que
+#   FFT(DDLT) = sum_l P(L = l) * FFT(f)^l
+# se evalúa por Horner para todos los ítems y estaciones a la vez (un arreglo
+# (ítems x estaciones, frecuencias)), en bloques para acotar la memoria. La
+# demanda semanal se discretiza en baldes de ancho propio por ítem (a lo sumo
+# --puntos baldes hasta media + 8 desvíos). ROP = cuantil del nivel de servicio
+# de Z_ALPHA y SS = ROP - media de la DDLT. La demanda semanal no puede ser
+# negativa (la masa bajo cero va al 0), por eso con lead time fijo SS_FFT queda
+# un poco por debajo del SS normal cuando el sigma semanal es grande.
+#
+# Entrada: pronóstico Prophet y, opcional, CSV Componente,Semanas,Probabilidad
+# Salida:  outputs/inventory/lead_time/lead_time_estocastico.csv (ítem x estación)
+#
+# Uso: python src/inventory/lead_time_estocastico.py --cv-lead-time 0.25
+#      python src/inventory/lead_time_estocastico.py --lead-times lead_times.csv
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, Z_ALPHA, SEMANAS_POR_MES, matriz_demanda
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'lead_time')
+
+
+# Distribuciones discretas -------------------------------------------------------
+
+def pmf_normal_discreta(media, desvio, soporte: int) -> np.ndarray:
+    """Normal redondeada a los enteros 0..soporte-1, por fila (media y desvío por fila).
+
+    La masa por debajo de 0 va al 0 y la de arriba al último punto; sin desvío
+    es una masa puntual en el entero más cercano a la media.
+    """
+    media = np.asarray(media, dtype=float)[:, None]
+    desvio = np.asarray(desvio, dtype=float)[:, None]
+    bordes = np.arange(soporte + 1) - 0.5
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(desvio > 0, (bordes - media) / desvio, np.sign(bordes - media) * np.inf)
+    acumulada = ndtr(z)
+    acumulada[:, 0], acumulada[:, -1] = 0.0, 1.0
+    return np.diff(acumulada, axis=1)
+
+
+def pmf_lead_time_empirica(tabla: pd.DataFrame, componentes) -> np.ndarray:
+    """Lead times empíricos (Componente, Semanas, Probabilidad) a (ítems, semanas) normalizada.
+
+    Los componentes que no figuran en la tabla quedan sin fila válida (NaN).
+    """
+    fila = pd.Index(componentes).get_indexer(tabla['Componente'])
+    semanas = tabla['Semanas'].to_numpy(dtype=int)
+    pmf = np.zeros((len(componentes), semanas.max() + 1))
+    validas = fila >= 0
+    np.add.at(pmf, (fila[validas], semanas[validas]), tabla['Probabilidad'].to_numpy(dtype=float)[validas])
+    total = pmf.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, pmf / total, np.nan)
+
+
+def momentos(pmf, valores=None) -> tuple:
+    """Media y desvío de cada fila de una pmf (valores por defecto 0, 1, 2, ...)."""
+    valores = np.arange(pmf.shape[-1]) if valores is None else valores
+    media = (pmf * valores).sum(axis=-1)
+    return media, np.sqrt(np.clip((pmf * valores ** 2).sum(axis=-1) - media ** 2, 0, None))
+
+
+def cuantil(pmf, prob) -> np.ndarray:
+    """Primer índice con probabilidad acumulada >= prob, por fila."""
+    return np.argmax(np.cumsum(pmf, axis=-1) >= np.asarray(prob)[..., None] - 1e-12, axis=-1)
+
+
+# Convolución --------------------------------------------------------------------
+
+def convolucion_lead_time(pmf_demanda, pmf_lt, bloque: int = 256) -> np.ndarray:
+    """pmf de la demanda en el lead time, fila por fila: sum_l P(L = l) f^{*l}.
+
+    pmf_demanda: (filas, baldes) de la demanda de un período; pmf_lt: (filas,
+    períodos) del lead time. El largo de la FFT cubre el soporte completo
+    (baldes - 1) * L_max + 1, así la convolución circular no se superpone.
+    """
+    filas, baldes = pmf_demanda.shape
+    L_max = pmf_lt.shape[1] - 1
+    largo = (baldes - 1) * L_max + 1
+    n_fft = 1 << int(np.ceil(np.log2(max(largo, 2))))
+    salida = np.empty((filas, largo))
+    for inicio in range(0, filas, bloque):
+        parte = slice(inicio, inicio + bloque)
+        F = np.fft.rfft(pmf_demanda[parte], n_fft, axis=1)
+        # Horner: (((p_Lmax F + p_{Lmax-1}) F + ...) F + p_0)
+        G = np.broadcast_to(pmf_lt[parte, L_max, None], F.shape).astype(complex)
+        for l in range(L_max - 1, -1, -1):
+            G = G * F + pmf_lt[parte, l, None]
+        salida[parte] = np.fft.irfft(G, n_fft, axis=1)[:, :largo]
+    return np.clip(salida, 0, None)
+
+
+def ddlt(media_semanal, desvio_semanal, pmf_lt, puntos: int = 128, bloque: int = 256) -> dict:
+    """DDLT por fila con demanda semanal normal discretizada en baldes de ancho propio.
+
+    Devuelve la pmf (en baldes), el ancho del balde y la media y el desvío en unidades.
+    """
+    media_semanal = np.asarray(media_semanal, dtype=float)
+    desvio_semanal = np.nan_to_num(np.asarray(desvio_semanal, dtype=float))
+    ancho = np.maximum((media_semanal + 8 * desvio_semanal) / (puntos - 1), 1e-12)
+    pmf_d = pmf_normal_discreta(media_semanal / ancho, desvio_semanal / ancho, puntos)
+    pmf = convolucion_lead_time(pmf_d, pmf_lt, bloque)
+    media, desvio = momentos(pmf)
+    return {'pmf': pmf, 'ancho': ancho, 'media': media * ancho, 'desvio': desvio * ancho}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SS y ROP con lead time estocástico (convolución por FFT)')
+    parser.add_argument('--lead-times', help='CSV empírico con columnas Componente,Semanas,Probabilidad')
+    parser.add_argument('--cv-lead-time', type=float,
+                        help='Desvío del lead time como fracción de la media para todos los componentes '
+                             '(reemplaza Lead_Time_Desvio_Semanas)')
+    parser.add_argument('--puntos', type=int, default=128, help='Baldes de la demanda semanal discretizada')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES.copy()
+    if args.cv_lead_time is not None:
+        componentes['Lead_Time_Desvio_Semanas'] = args.cv_lead_time * componentes['Lead_Time_Semanas']
+    if args.lead_times:
+        pmf_lt = pmf_lead_time_empirica(pd.read_csv(args.lead_times), componentes['Componente'])
+        sin_tabla = np.isnan(pmf_lt).any(axis=1)
+        if sin_tabla.any():
+            print(f"[ADVERTENCIA] Sin lead time empírico (se usa el de componentes.py): "
+                  f"{', '.join(componentes['Componente'][sin_tabla])}")
+        L_medio, L_desvio = momentos(np.nan_to_num(pmf_lt))
+        componentes['Lead_Time_Semanas'] = np.where(sin_tabla, componentes['Lead_Time_Semanas'], L_medio)
+        componentes['Lead_Time_Desvio_Semanas'] = np.where(sin_tabla, componentes['Lead_Time_Desvio_Semanas'],
+                                                           L_desvio)
+    L = componentes['Lead_Time_Semanas'].to_numpy(dtype=float)
+    L_desvio = componentes['Lead_Time_Desvio_Semanas'].to_numpy(dtype=float)
+    soporte = int(np.ceil((L + 6 * L_desvio).max())) + 1
+    normal = pmf_normal_discreta(L, L_desvio, soporte)
+    if args.lead_times:
+        empirica = np.zeros((len(L), max(soporte, pmf_lt.shape[1])))
+        empirica[:, :pmf_lt.shape[1]] = np.nan_to_num(pmf_lt)
+        normal = np.pad(normal, ((0, 0), (0, empirica.shape[1] - soporte)))
+        pmf_lt = np.where(sin_tabla[:, None], normal, empirica)
+    else:
+        pmf_lt = normal
+
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nombres = list(ESTACIONES_FIJAS)
+
+    traza.etapa('convolucion')
+    politicas = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'], L,
+                                   lead_time_desvio_semanas=L_desvio)
+    fijo = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'], L)['servicio']
+    servicio = politicas['servicio']
+    semanas = np.broadcast_to(politicas['estaciones']['semanas'], servicio['Demanda_Estacion'].shape)
+    media_sem = servicio['Demanda_Estacion'] / semanas
+    desvio_sem = servicio['sigma_mensual'] / np.sqrt(SEMANAS_POR_MES)
+    n_items, n_est = media_sem.shape
+    traza.filas(n_items * n_est)
+    res = ddlt(media_sem.ravel(), desvio_sem.ravel(), np.repeat(pmf_lt, n_est, axis=0), args.puntos)
+    nivel = ndtr(Z_ALPHA)
+    rop_fft = (cuantil(res['pmf'], nivel) * res['ancho']).reshape(n_items, n_est)
+    media_fft = res['media'].reshape(n_items, n_est)
+
+    traza.etapa('exportacion')
+    lt_medio, lt_desvio = momentos(pmf_lt)
+    filas = []
+    for k, nombre in enumerate(nombres):
+        filas.append(pd.DataFrame({
+            'Componente': componentes['Componente'].to_numpy(),
+            'Estacion': nombre,
+            'Lead_Time_Medio_Semanas': lt_medio,
+            'Lead_Time_Desvio_Semanas': lt_desvio,
+            'Demanda_Semanal': media_sem[:, k],
+            'sigma_L_Fijo': fijo['sigma_L'][:, k],
+            'sigma_L_Normal': servicio['sigma_L'][:, k],
+            'sigma_L_FFT': res['desvio'].reshape(n_items, n_est)[:, k],
+            'SS_Fijo': fijo['Stock_Seguridad'][:, k],
+            'SS_Normal': servicio['Stock_Seguridad'][:, k],
+            'SS_FFT': rop_fft[:, k] - media_fft[:, k],
+            'ROP_Normal': servicio['ROP'][:, k],
+            'ROP_FFT': rop_fft[:, k],
+        }))
+    tabla = pd.concat(filas, ignore_index=True)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, 'lead_time_estocastico.csv')
+    tabla.to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"DEMANDA EN EL LEAD TIME ESTOCÁSTICO (CSL {nivel:.1%})")
+    print("=" * 70)
+    cols = ['Componente', 'Estacion', 'Lead_Time_Desvio_Semanas', 'SS_Fijo', 'SS_Normal', 'SS_FFT', 'ROP_FFT']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# LOTE DINÁMICO: WAGNER-WHITIN, SILVER-MEAL Y MENOR COSTO UNITARIO
+# -----------------------------------------------------------------
+# El EOQ estacional resume la demanda en dos estaciones de demanda constante. Acá
+# se planifican los lotes sobre la matriz ítems x períodos del pronóstico (12
+# meses, o 52 semanas con --periodos semanal), con costo de pedir K y costo de
+# mantener h por unidad y período sobre el inventario al final de cada período
+# (los costos informados suman además el consumo dentro del período, d_t / 2):
+#   - Wagner-Whitin (óptimo): F(j) = min_i F(i-1) + K + h * sum_{t=i..j} (t - i) d_t
+#     El costo de cubrir i..j sale de dos sumas prefijas (de d_t y de t*d_t), y
+#     para cada j se evalúan todos los i y todos los ítems en un solo arreglo:
+#     O(T^2) por ítem, vectorizado sobre los ítems.
+#   - Silver-Meal: el lote se extiende mientras baja el costo promedio por período.
+#   - Menor costo unitario (LUC): ídem con el costo por unidad.
+#   Las heurísticas avanzan período a período con todos los ítems a la vez.
+# Se compara con el CTE de la Política A de eoq_estacional.py (mismas K y h). Con
+# buckets mensuales el lote mínimo es un mes de demanda; si el EOQ pide más seguido
+# conviene --periodos semanal.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/inventory/optimizacion/lote_dinamico.csv (costo por ítem y método)
+#          outputs/inventory/optimizacion/lote_dinamico_plan.csv (lotes por período)
+#
+# Uso: python src/inventory/lote_dinamico.py --periodos mensual
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, matriz_demanda
+from estaciones import etiquetas_fijas
+from motor_politicas import calcular_politicas
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+METODOS = ('Wagner_Whitin', 'Silver_Meal', 'Menor_Costo_Unitario')
+
+
+# Utilidades ---------------------------------------------------------------------
+
+def demanda_semanal(demanda, periodos) -> np.ndarray:
+    """Reparte la demanda mensual por día y la agrupa en 52 semanas (los días sobrantes van a la última)."""
+    dias = pd.to_datetime(pd.Series(periodos)).dt.days_in_month.to_numpy()
+    diaria = np.repeat(demanda / dias, dias, axis=1)
+    semana = np.minimum(np.arange(diaria.shape[1]) // 7, 51)
+    salida = np.zeros((demanda.shape[0], 52))
+    np.add.at(salida.T, semana, diaria.T)
+    return salida
+
+
+def costo_plan(lotes, demanda, K, h) -> dict:
+    """Costo de pedir y de mantener de un plan.
+
+    El mantener se cobra sobre el inventario medio de cada período: el que queda al
+    final más la mitad de lo que se consume dentro del período (d_t / 2). Ese término
+    es igual para todos los planes, pero sin él no se compara con el Q/2 del EOQ.
+    """
+    h = np.asarray(h, dtype=float).reshape(-1) if np.ndim(h) else h
+    inventario = np.clip(np.cumsum(lotes - demanda, axis=1), 0, None)
+    pedidos = (lotes > 0).sum(axis=1)
+    return {'Pedidos': pedidos, 'Costo_Pedir': K * pedidos,
+            'Costo_Mantener': h * (inventario + demanda / 2).sum(axis=1)}
+
+
+def _lotes_desde_inicios(inicio, demanda) -> np.ndarray:
+    """Lotes a partir de la marca de inicio de lote (ítems, períodos): cada uno cubre hasta el siguiente."""
+    n, T = demanda.shape
+    origen = np.maximum.accumulate(np.where(inicio, np.arange(T), 0), axis=1)
+    lotes = np.zeros_like(demanda)
+    np.add.at(lotes, (np.repeat(np.arange(n), T), origen.ravel()), demanda.ravel())
+    return lotes
+
+
+# Wagner-Whitin ------------------------------------------------------------------
+
+def wagner_whitin(demanda, K, h) -> np.ndarray:
+    """Plan óptimo de lotes (ítems, períodos), vectorizado sobre los ítems.
+
+    h es escalar o un vector por ítem (costo de mantener por unidad y período).
+    """
+    demanda = np.asarray(demanda, dtype=float)
+    n, T = demanda.shape
+    h = np.broadcast_to(np.asarray(h, dtype=float).reshape(-1, 1) if np.ndim(h) else h, (n, 1))
+    t = np.arange(T)
+    P0 = np.concatenate([np.zeros((n, 1)), np.cumsum(demanda, axis=1)], axis=1)           # sum d hasta t-1
+    P1 = np.concatenate([np.zeros((n, 1)), np.cumsum(demanda * t, axis=1)], axis=1)       # sum t*d hasta t-1
+    F = np.zeros((n, T + 1))
+    desde = np.zeros((n, T), dtype=int)
+    for j in range(T):
+        i = t[:j + 1]                                                    # pedido en i cubre i..j
+        cantidad = P0[:, j + 1, None] - P0[:, i]
+        mantener = h * ((P1[:, j + 1, None] - P1[:, i]) - i * cantidad)
+        total = F[:, i] + K * (cantidad > 0) + mantener
+        desde[:, j] = np.argmin(total, axis=1)
+        F[:, j + 1] = total[np.arange(n), desde[:, j]]
+
+    # Reconstrucción: saltando hacia atrás desde el último período
+    inicio = np.zeros((n, T), dtype=bool)
+    j = np.full(n, T - 1)
+    activo = np.ones(n, dtype=bool)
+    while activo.any():
+        i = desde[np.arange(n), np.maximum(j, 0)]
+        inicio[np.arange(n)[activo], i[activo]] = True
+        j = np.where(activo, i - 1, j)
+        activo = j >= 0
+    return _lotes_desde_inicios(inicio, demanda)
+
+
+# Heurísticas --------------------------------------------------------------------
+
+def _heuristica(demanda, K, h, por_unidad: bool) -> np.ndarray:
+    """Silver-Meal (costo por período) o LUC (costo por unidad), todos los ítems a la vez."""
+    demanda = np.asarray(demanda, dtype=float)
+    n, T = demanda.shape
+    h = np.broadcast_to(np.asarray(h, dtype=float).reshape(-1) if np.ndim(h) else h, (n,))
+    inicio = np.zeros((n, T), dtype=bool)
+    inicio[:, 0] = True
+    origen = np.zeros(n, dtype=int)
+    mantener = np.zeros(n)
+    cubierta = demanda[:, 0].copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t in range(1, T):
+            nuevo_mantener = mantener + h * (t - origen) * demanda[:, t]
+            if por_unidad:
+                actual = (K + mantener) / cubierta
+                extendido = (K + nuevo_mantener) / (cubierta + demanda[:, t])
+            else:
+                actual = (K + mantener) / (t - origen)
+                extendido = (K + nuevo_mantener) / (t - origen + 1)
+            # Sin demanda cubierta todavía se sigue extendiendo (no hay costo por unidad)
+            corta = (extendido > actual) & (cubierta > 0)
+            inicio[:, t] = corta
+            origen = np.where(corta, t, origen)
+            mantener = np.where(corta, 0.0, nuevo_mantener)
+            cubierta = np.where(corta, demanda[:, t], cubierta + demanda[:, t])
+    return _lotes_desde_inicios(inicio, demanda)
+
+
+def silver_meal(demanda, K, h) -> np.ndarray:
+    return _heuristica(demanda, K, h, por_unidad=False)
+
+
+def menor_costo_unitario(demanda, K, h) -> np.ndarray:
+    return _heuristica(demanda, K, h, por_unidad=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lote dinámico sobre el pronóstico (Wagner-Whitin, Silver-Meal, LUC)')
+    parser.add_argument('--periodos', choices=['mensual', 'semanal'], default='mensual')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    mensual = matriz_demanda(componentes, df_pronostico)
+    if args.periodos == 'semanal':
+        demanda, por_anio = demanda_semanal(mensual, df_pronostico['Periodo']), 52
+        etiquetas = [f'S{k + 1:02d}' for k in range(52)]
+    else:
+        demanda, por_anio = mensual, 12
+        etiquetas = pd.to_datetime(df_pronostico['Periodo']).dt.strftime('%Y-%m').tolist()
+    K = float(COSTO_ORDENAR)
+    h = componentes['Costo_Unitario'].to_numpy(dtype=float) * TASA_MANTENIMIENTO / por_anio
+
+    traza.etapa('optimizacion')
+    traza.filas(demanda.shape[0])
+    planes = {'Wagner_Whitin': wagner_whitin(demanda, K, h),
+              'Silver_Meal': silver_meal(demanda, K, h),
+              'Menor_Costo_Unitario': menor_costo_unitario(demanda, K, h)}
+    # Referencia: CTE de la Política A (EOQ por estación) sumado en el año
+    politicas = calcular_politicas(mensual, etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy()),
+                                   componentes['Costo_Unitario'], componentes['Lead_Time_Semanas'])
+    cte_eoq = np.nansum(politicas['costo']['CTE'], axis=1)
+
+    traza.etapa('exportacion')
+    tabla = pd.DataFrame({'Componente': componentes['Componente'].to_numpy(),
+                          'Demanda_Anual': demanda.sum(axis=1)})
+    for metodo, lotes in planes.items():
+        costo = costo_plan(lotes, demanda, K, h)
+        tabla[f'Pedidos_{metodo}'] = costo['Pedidos']
+        tabla[f'Costo_{metodo}'] = costo['Costo_Pedir'] + costo['Costo_Mantener']
+    tabla['CTE_EOQ_Estacional'] = cte_eoq
+    tabla['Ahorro_WW_vs_EOQ'] = cte_eoq - tabla['Costo_Wagner_Whitin']
+    plan = pd.DataFrame({
+        'Componente': np.repeat(componentes['Componente'].to_numpy(), demanda.shape[1]),
+        'Periodo': np.tile(etiquetas, demanda.shape[0]),
+        'Demanda': demanda.ravel(),
+        **{f'Lote_{m}': lotes.ravel() for m, lotes in planes.items()},
+    })
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.periodos == 'mensual' else '_semanal'
+    salida = os.path.join(OUTPUT_DIR, f'lote_dinamico{sufijo}.csv')
+    tabla.to_csv(salida, index=False)
+    plan.to_csv(os.path.join(OUTPUT_DIR, f'lote_dinamico_plan{sufijo}.csv'), index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"LOTE DINÁMICO ({demanda.shape[1]} períodos, K = {K:,.0f})")
+    print("=" * 70)
+    cols = ['Componente'] + [f'Costo_{m}' for m in METODOS] + ['CTE_EOQ_Estacional']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    totales = tabla[cols[1:]].sum()
+    print("\nTotales: " + ', '.join(f'{c} = {v:,.2f}' for c, v in totales.items()))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
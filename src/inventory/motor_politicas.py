@@ -0,0 +1,189 @@
+# MOTOR VECTORIZADO DE POLÍTICAS EOQ ESTACIONALES
+# -----------------------------------------------
+# Calcula de una sola vez las políticas de los dos modos de eoq_estacional.py
+# para todos los ítems y estaciones, con operaciones sobre arreglos:
+#   - costo    (Política A): EOQ por estación, ROP sin stock de seguridad.
+#   - servicio (Política B): EOQ anual único, SS por estación con sigma mensual
+#                            de la estación (ddof=0) y Z = 1.645. Con lead time
+#                            variable el desvío de la demanda en el lead time es
+#                            sqrt(L sigma_sem^2 + d_sem^2 sigma_LT^2).
+# Entradas: matriz de demanda ítems x meses, estación de cada mes (común o por
+# ítem, con cualquier número de estaciones) y vectores de costo unitario, lead
+# time y (opcional) desvío del lead time (uno por ítem).
+# Las fórmulas y el orden de las operaciones son los mismos del bucle original,
+# de modo que los CSV publicados no cambian.
+
+import numpy as np
+import pandas as pd
+
+from componentes import TASA_MANTENIMIENTO, COSTO_ORDENAR, Z_ALPHA, SEMANAS_POR_MES
+
+COLUMNAS = {
+    'costo': ['Componente', 'Estacion', 'Demanda_Estacion', 'EOQ', 'Num_Pedidos',
+              'Tiempo_Entre_Pedidos_Semanas', 'Tiempo_Entre_Pedidos_Dias', 'ROP', 'CTE',
+              'Costo_Unitario', 'CT_Optimo'],
+    'servicio': ['Componente', 'Estacion', 'Demanda_Estacion', 'EOQ', 'Num_Pedidos',
+                 'Tiempo_Entre_Pedidos_Semanas', 'Tiempo_Entre_Pedidos_Dias', 'ROP', 'CTE',
+                 'Costo_Unitario', 'Stock_Seguridad', 'sigma_mensual', 'CT_Optimo'],
+}
+
+
+def _columna(x, n: int) -> np.ndarray:
+    """Escalar o vector por ítem -> columna (n, 1) para operar contra (n, estaciones)."""
+    return np.broadcast_to(np.asarray(x, dtype=float).reshape(-1, 1), (n, 1))
+
+
+def _agregar_comunes(demanda, estacion_mes, n_estaciones):
+    """Demanda y sigma mensual (ddof=0) por estación, con las mismas estaciones para todos.
+
+    Los meses de cada estación se recorren en el orden del pronóstico, igual que el
+    filtro por 'Mes' del script. El bloque se copia en orden C para que numpy sume
+    cada fila por pares como una serie suelta (en orden Fortran suma en secuencia y
+    cambia el último dígito).
+    """
+    n_items = demanda.shape[0]
+    meses_est = np.bincount(estacion_mes, minlength=n_estaciones)
+    D = np.empty((n_items, n_estaciones))
+    sigma = np.full((n_items, n_estaciones), np.nan)
+    for k in range(n_estaciones):
+        bloque = np.ascontiguousarray(demanda[:, estacion_mes == k])
+        D[:, k] = bloque.sum(axis=1)
+        if meses_est[k] < 2:
+            print(f"[ADVERTENCIA] Solo hay {meses_est[k]} mes(es) en la estación {k}. "
+                  "No se puede calcular sigma_mensual correctamente.")
+            continue
+        media = D[:, k] / meses_est[k]
+        sigma[:, k] = np.sqrt(((media[:, None] - bloque) ** 2).sum(axis=1) / meses_est[k])
+    return meses_est, D, sigma
+
+
+def _agregar_por_item(demanda, estacion_mes, n_estaciones):
+    """Igual que _agregar_comunes, pero con etiquetas propias de cada ítem (ítems x meses)."""
+    en_estacion = estacion_mes[:, :, None] == np.arange(n_estaciones)   # (ítems, meses, K)
+    meses_est = en_estacion.sum(axis=1)
+    D = np.where(en_estacion, demanda[:, :, None], 0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = D / meses_est
+        desvio = np.where(en_estacion, (media[:, None, :] - demanda[:, :, None]) ** 2, 0).sum(axis=1)
+        sigma = np.where(meses_est >= 2, np.sqrt(desvio / meses_est), np.nan)
+    cortas = (meses_est == 1).sum()
+    if cortas:
+        print(f"[ADVERTENCIA] {cortas} estación(es) de un solo mes: sigma_mensual queda en NaN.")
+    return meses_est, D, sigma
+
+
+def sigma_lead_time(sigma_mensual, demanda_semanal, lead_time_semanas, desvio_semanas=0.0,
+                    semanas_por_mes=SEMANAS_POR_MES) -> np.ndarray:
+    """Desvío de la demanda durante el lead time.
+
+    Con lead time fijo es sigma_mensual * sqrt(L / 4.33), la fórmula de siempre (y
+    con el mismo redondeo). Si el lead time tiene desvío sigma_LT (semanas) se suma
+    la varianza que aporta el atraso del proveedor:
+        sqrt(L * sigma_mensual^2 / 4.33 + demanda_semanal^2 * sigma_LT^2)
+    """
+    L = np.asarray(lead_time_semanas, dtype=float)
+    desvio = np.asarray(desvio_semanas, dtype=float)
+    fijo = sigma_mensual * np.sqrt(L / semanas_por_mes)
+    if not np.any(desvio > 0):
+        return fijo
+    variable = np.sqrt(L * sigma_mensual ** 2 / semanas_por_mes + (demanda_semanal * desvio) ** 2)
+    return np.where(desvio > 0, variable, fijo)
+
+
+def calcular_politicas(demanda, estacion_mes, costo_unitario, lead_time_semanas,
+                       tasa_mantenimiento=TASA_MANTENIMIENTO, costo_ordenar=COSTO_ORDENAR,
+                       z=Z_ALPHA, semanas_por_mes=SEMANAS_POR_MES, lead_time_desvio_semanas=0.0) -> dict:
+    """Políticas de ambos modos para cada ítem (filas) y estación (columnas).
+
+    demanda:       matriz (ítems, meses) de demanda mensual.
+    estacion_mes:  índice de estación (0..K-1) de cada columna de la matriz; vector
+                   (meses,) común a todos los ítems o matriz (ítems, meses) por ítem.
+    lead_time_desvio_semanas: desvío del lead time por ítem (0 = determinístico).
+    Devuelve {'estaciones': {...}, 'costo': {campo: (ítems, K)}, 'servicio': {...}}.
+    """
+    demanda = np.ascontiguousarray(np.atleast_2d(np.asarray(demanda, dtype=float)))
+    estacion_mes = np.asarray(estacion_mes, dtype=int)
+    n_items = demanda.shape[0]
+    n_estaciones = int(estacion_mes.max()) + 1
+
+    C = _columna(costo_unitario, n_items)
+    L = _columna(lead_time_semanas, n_items)
+    L_desvio = _columna(lead_time_desvio_semanas, n_items)
+    H = C * tasa_mantenimiento  # anual
+    S = costo_ordenar
+
+    if estacion_mes.ndim == 1:
+        meses_est, D, sigma = _agregar_comunes(demanda, estacion_mes, n_estaciones)
+    else:
+        meses_est, D, sigma = _agregar_por_item(demanda, estacion_mes, n_estaciones)
+
+    fraccion = meses_est / 12
+    semanas = meses_est * semanas_por_mes
+    demanda_semanal = np.divide(D, np.broadcast_to(semanas, D.shape), out=np.zeros_like(D),
+                                where=np.broadcast_to(semanas > 0, D.shape))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # --- Política A: EOQ por estación ---
+        Q_a = np.sqrt((2 * D * S) / H)
+        N_a = np.where(Q_a > 0, D / Q_a, 0)
+        costo = {
+            'Demanda_Estacion': D,
+            'EOQ': Q_a,
+            'Num_Pedidos': N_a,
+            'Tiempo_Entre_Pedidos_Semanas': np.where(N_a > 0, semanas / N_a, np.nan),
+            'ROP': demanda_semanal * L,
+            'CTE': (D / Q_a) * S + ((Q_a / 2) + 0) * (H * fraccion),
+        }
+
+        # --- Política B: EOQ anual único, SS por estación ---
+        D_anual = demanda.sum(axis=1)[:, None]
+        Q_b = np.broadcast_to(np.sqrt((2 * D_anual * S) / H), D.shape)
+        N_b = np.broadcast_to(np.where(Q_b[:, :1] > 0, D_anual / Q_b[:, :1], 0), D.shape)
+        sigma_L = sigma_lead_time(sigma, demanda_semanal, L, L_desvio, semanas_por_mes)
+        SS = z * sigma_L
+        servicio = {
+            'Demanda_Estacion': D,
+            'EOQ': Q_b,
+            'Num_Pedidos': N_b,
+            'Tiempo_Entre_Pedidos_Semanas': np.where(N_b > 0, semanas / N_b, np.nan),
+            'ROP': demanda_semanal * L + SS,
+            # El costo de mantener el SS es anual (H), no fraccionado
+            'CTE': (D / Q_b) * S + (Q_b / 2) * H * fraccion + SS * H + 0,
+            'Stock_Seguridad': SS,
+            'sigma_mensual': sigma,
+            'sigma_L': sigma_L,
+        }
+
+        # TC(Q) = (K*D)/Q + (h*Q)/2 + c*D, con h = c * tasa_mant * fracción de la estación
+        h = H * fraccion
+        for politica in (costo, servicio):
+            Q = politica['EOQ']
+            politica['Tiempo_Entre_Pedidos_Dias'] = politica['Tiempo_Entre_Pedidos_Semanas'] * 7
+            politica['CT_Optimo'] = np.where(Q > 0, (S * D) / Q + (h * Q) / 2 + C * D, np.nan)
+
+    # Estaciones sin meses (ítems con menos estaciones que el máximo) quedan en NaN
+    vacia = np.broadcast_to(meses_est == 0, D.shape)
+    if vacia.any():
+        for politica in (costo, servicio):
+            for campo in politica:
+                politica[campo] = np.where(vacia, np.nan, politica[campo])
+
+    return {
+        'estaciones': {'meses': meses_est, 'fraccion': fraccion, 'semanas': semanas},
+        'costo': costo,
+        'servicio': servicio,
+    }
+
+
+def tabla_estacion(politicas: dict, modo: str, estacion: int, nombre_estacion: str,
+                   componentes: pd.DataFrame) -> pd.DataFrame:
+    """Resultados de un modo y una estación con las columnas de eoq_estacional_*.csv."""
+    campos = politicas[modo]
+    df = pd.DataFrame({
+        'Componente': componentes['Componente'].to_numpy(),
+        'Estacion': nombre_estacion,
+        'Costo_Unitario': componentes['Costo_Unitario'].to_numpy(),
+    })
+    for campo, valores in campos.items():
+        df[campo] = valores[:, estacion]
+    return df[COLUMNAS[modo]]
@@ -0,0 +1,190 @@
+# NEWSVENDOR PARA LA COMPRA ÚNICA DE LA TEMPORADA PICO (OCTUBRE-NOVIEMBRE)
+# ------------------------------------------------------------------------
+# eoq_estacional.py trata el pico como una estación EOQ corta. Para componentes
+# caros y de baja rotación (los Vintage) se hace una sola compra antes de la
+# temporada, y la cantidad sale del fractil crítico:
+#   Cu = c2 (costo por unidad faltante, COSTO_AGOTAMIENTO del Auto_Foco)
+#   Co = Costo_Unitario * (1 - rescate) + Costo_Unitario * TASA * meses_tenencia / 12
+#        (lo que sobra se recupera a la fracción 'rescate' y se mantiene hasta usarse)
+#   Q* = F^-1(Cu / (Cu + Co))
+# F es la demanda de la temporada de cada ítem:
+#   - normal: media = demanda PICO del pronóstico, desvío = sigma_mensual * sqrt(meses)
+#   - gamma:  misma media y desvío, sin demanda negativa
+#   - muestras: trayectorias propias (.npy, muestras x ítems), cuantil empírico
+# Los cuantiles, faltantes y sobrantes esperados se calculan para todos los
+# ítems a la vez, y se comparan con comprar la demanda media.
+#
+# Entrada: pronóstico Prophet y, opcional, muestras de demanda de la temporada (--muestras)
+# Salida:  outputs/inventory/optimizacion/newsvendor_pico.csv (con --foco y otra
+#          distribución se agregan sufijos: newsvendor_pico_gamma_vintage.csv)
+#
+# Uso: python src/inventory/newsvendor_pico.py --distribucion normal --foco Vintage
+#      python src/inventory/newsvendor_pico.py --distribucion muestras --muestras pico.npy
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaincc, gammaincinv, ndtri
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, costo_agotamiento, matriz_demanda, normalizar_foco
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+from perdida_normal import perdida
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+ESTACION = 'PICO'
+
+
+# Distribuciones -----------------------------------------------------------------
+
+def cuantil(fractil, distribucion: str, media=None, desvio=None, muestras=None) -> np.ndarray:
+    """F^-1(fractil) por ítem.
+
+    normal y gamma usan media y desvío (gamma con forma (media / desvío)^2; sin
+    desvío la demanda es la media). Con muestras (muestras x ítems) es la menor
+    muestra con F >= fractil, tomada con un solo ordenamiento por columna.
+    """
+    if distribucion == 'normal':
+        return media + ndtri(fractil) * desvio
+    if distribucion == 'gamma':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Q = gammaincinv((media / desvio) ** 2, fractil) * desvio ** 2 / media
+        return np.where(desvio > 0, Q, media)
+    if distribucion == 'muestras':
+        n = muestras.shape[0]
+        idx = np.clip(np.ceil(np.asarray(fractil) * n).astype(int) - 1, 0, n - 1)
+        ordenadas = np.sort(muestras, axis=0)
+        return np.take_along_axis(ordenadas, np.broadcast_to(idx, (1, muestras.shape[1])), axis=0)[0]
+    raise ValueError(f"distribución desconocida: {distribucion!r}")
+
+
+def faltante_esperado(Q, distribucion: str, media=None, desvio=None, muestras=None) -> np.ndarray:
+    """E[(D - Q)+] por ítem; en gamma, media * G_{k+1}(Q / escala) - Q * G_k(Q / escala) (G = cola)."""
+    if distribucion == 'normal':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(desvio > 0, desvio * perdida((Q - media) / desvio), np.clip(media - Q, 0, None))
+    if distribucion == 'gamma':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            forma, escala = (media / desvio) ** 2, desvio ** 2 / media
+            x = Q / escala
+            faltante = media * gammaincc(forma + 1, x) - Q * gammaincc(forma, x)
+        return np.where(desvio > 0, faltante, np.clip(media - Q, 0, None))
+    if distribucion == 'muestras':
+        return np.clip(muestras - Q, 0, None).mean(axis=0)
+    raise ValueError(f"distribución desconocida: {distribucion!r}")
+
+
+def newsvendor(costo_faltante, costo_sobrante, distribucion: str = 'normal', media=None, desvio=None,
+               muestras=None, Q=None) -> dict:
+    """Fractil crítico, Q*, faltante y sobrante esperados y costo esperado por ítem.
+
+    Con Q dado se evalúa esa cantidad en lugar de la del fractil crítico.
+    """
+    Cu = np.asarray(costo_faltante, dtype=float)
+    Co = np.asarray(costo_sobrante, dtype=float)
+    if muestras is not None:
+        muestras = np.asarray(muestras, dtype=float)
+        media = muestras.mean(axis=0)
+    fractil = Cu / (Cu + Co)
+    if Q is None:
+        Q = cuantil(fractil, distribucion, media, desvio, muestras)
+    faltante = faltante_esperado(Q, distribucion, media, desvio, muestras)
+    sobrante = Q - media + faltante
+    return {'fractil': fractil, 'Q': Q, 'faltante': faltante, 'sobrante': sobrante,
+            'costo': Cu * faltante + Co * sobrante}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Newsvendor para la compra única de la temporada PICO')
+    parser.add_argument('--distribucion', choices=['normal', 'gamma', 'muestras'], default='normal')
+    parser.add_argument('--muestras', help='.npy con demanda de la temporada (muestras x componentes)')
+    parser.add_argument('--rescate', type=float, default=1.0,
+                        help='Fracción del costo unitario que se recupera de lo que sobra (default 1: se usa después)')
+    parser.add_argument('--meses-tenencia', type=float, default=2.0,
+                        help='Meses que se mantiene lo que sobra hasta usarse (default 2)')
+    parser.add_argument('--foco', help='Solo componentes de este Auto_Foco (p. ej. Vintage)')
+    args = parser.parse_args()
+    if args.distribucion == 'muestras' and not args.muestras:
+        parser.error('--distribucion muestras requiere --muestras')
+    focos = sorted(set(COMPONENTES['Auto_Foco'].map(normalizar_foco)))
+    if args.foco and normalizar_foco(args.foco) not in focos:
+        parser.error(f"--foco {args.foco} no coincide con ningún componente. Disponibles: {', '.join(focos)}")
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    k = list(ESTACIONES_FIJAS).index(ESTACION)
+    politicas = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                   componentes['Lead_Time_Semanas'],
+                                   lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])
+    meses = politicas['estaciones']['meses'][k]
+    media = politicas['servicio']['Demanda_Estacion'][:, k]
+    desvio = np.nan_to_num(politicas['servicio']['sigma_mensual'][:, k]) * np.sqrt(meses)
+    muestras = np.load(args.muestras) if args.distribucion == 'muestras' else None
+    if muestras is not None and muestras.shape[1] != len(componentes):
+        parser.error(f'--muestras debe tener {len(componentes)} columnas (una por componente)')
+
+    traza.etapa('optimizacion')
+    CU = componentes['Costo_Unitario'].to_numpy(dtype=float)
+    Cu = costo_agotamiento(componentes)
+    Co = CU * (1 - args.rescate) + CU * TASA_MANTENIMIENTO * args.meses_tenencia / 12
+    traza.filas(len(componentes))
+    res = newsvendor(Cu, Co, args.distribucion, media, desvio, muestras)
+    if muestras is not None:
+        media, desvio = muestras.mean(axis=0), muestras.std(axis=0)
+    # Referencia: comprar exactamente la demanda media de la temporada
+    ref = newsvendor(Cu, Co, args.distribucion, media, desvio, muestras, Q=media)
+
+    traza.etapa('exportacion')
+    tabla = pd.DataFrame({
+        'Componente': componentes['Componente'].to_numpy(),
+        'Auto_Foco': componentes['Auto_Foco'].to_numpy(),
+        'Demanda_Media': media,
+        'Desvio_Temporada': desvio,
+        'Costo_Faltante_Cu': Cu,
+        'Costo_Sobrante_Co': Co,
+        'Fractil_Critico': res['fractil'],
+        'Q_Newsvendor': res['Q'],
+        'Faltante_Esperado': res['faltante'],
+        'Sobrante_Esperado': res['sobrante'],
+        'Fill_Rate_Esperado': 1 - res['faltante'] / media,
+        'Costo_Esperado': res['costo'],
+        'Costo_Comprar_Media': ref['costo'],
+        'EOQ_Mas_ROP_Pico': politicas['servicio']['EOQ'][:, k] + politicas['servicio']['ROP'][:, k],
+    })
+    if args.foco:
+        tabla = tabla[tabla['Auto_Foco'].map(normalizar_foco) == normalizar_foco(args.foco)]
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.distribucion == 'normal' else f'_{args.distribucion}'
+    if args.foco:
+        sufijo += '_' + normalizar_foco(args.foco).lower().replace(' ', '_')
+    salida = os.path.join(OUTPUT_DIR, f'newsvendor_pico{sufijo}.csv')
+    tabla.to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"NEWSVENDOR TEMPORADA {ESTACION} ({args.distribucion}, {meses} meses)")
+    print("=" * 70)
+    cols = ['Componente', 'Fractil_Critico', 'Demanda_Media', 'Q_Newsvendor', 'Fill_Rate_Esperado',
+            'Costo_Esperado', 'Costo_Comprar_Media']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.3f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
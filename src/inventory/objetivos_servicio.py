@@ -0,0 +1,131 @@
+# STOCK DE SEGURIDAD POR OBJETIVO DE FILL RATE
+# --------------------------------------------
+# En lugar de un Z único (1.645, 95% de ciclos sin quiebre), cada componente tiene
+# un fill rate objetivo (servicio beta: fracción de la demanda servida del stock)
+# según su clase ABC. Por ciclo de pedido:
+#   faltante esperado = sigma_L * L(k) = (1 - beta) * Q   =>   k = L^-1((1 - beta) * Q / sigma_L)
+#   SS = k * sigma_L,  ROP = mu_L + SS
+# L^-1 se evalúa para todos los ítems y estaciones a la vez (perdida_normal.k_por_perdida).
+# Q es el EOQ anual de la Política B; mu_L y sigma_L, los de eoq_estacional.py.
+# Clases ABC de los componentes por valor anual pronosticado (demanda x costo
+# unitario), con los mismos cortes 80/95 de ABC_analysis.py.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salida:  outputs/inventory/optimizacion/objetivos_servicio.csv
+#
+# Uso: python src/inventory/objetivos_servicio.py --objetivos A=0.99 B=0.97 C=0.95
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, Z_ALPHA, matriz_demanda
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+from perdida_normal import fda, k_por_perdida
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+OBJETIVOS_POR_DEFECTO = {'A': 0.99, 'B': 0.97, 'C': 0.95}
+
+
+def clases_abc(valor_anual) -> np.ndarray:
+    """Clase ABC por valor acumulado (A hasta 80%, B hasta 95%, C el resto)."""
+    valor_anual = np.asarray(valor_anual, dtype=float)
+    orden = np.argsort(-valor_anual, kind='stable')
+    acumulado = 100 * np.cumsum(valor_anual[orden]) / valor_anual.sum()
+    clases = np.empty(len(valor_anual), dtype=object)
+    clases[orden] = np.where(acumulado <= 80, 'A', np.where(acumulado <= 95, 'B', 'C'))
+    return clases
+
+
+def ss_por_fill_rate(fill_rate, Q, mu_L, sigma_L) -> dict:
+    """k, SS y ROP que dan el fill rate objetivo, para arreglos de cualquier forma.
+
+    Sin variabilidad (sigma_L = 0) el SS es cero.
+    """
+    fill_rate, Q, mu_L, sigma_L = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (fill_rate, Q, mu_L, sigma_L)])
+    hay_sigma = sigma_L > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        objetivo = np.where(hay_sigma, (1 - fill_rate) * Q / sigma_L, 1.0)
+    k = np.where(hay_sigma, k_por_perdida(objetivo), 0.0)
+    SS = k * np.where(hay_sigma, sigma_L, 0.0)
+    return {'k': k, 'SS': SS, 'ROP': mu_L + SS, 'CSL': fda(k)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SS y ROP por fill rate objetivo según clase ABC')
+    parser.add_argument('--objetivos', nargs='+', default=[f'{c}={b}' for c, b in OBJETIVOS_POR_DEFECTO.items()],
+                        help='Fill rate objetivo por clase, p. ej. A=0.99 B=0.97 C=0.95')
+    args = parser.parse_args()
+    objetivos = {c.strip().upper(): float(b) for c, b in (o.split('=') for o in args.objetivos)}
+    faltan = set('ABC') - set(objetivos)
+    if faltan:
+        parser.error(f"Falta el objetivo de las clases: {', '.join(sorted(faltan))}")
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nombres = list(ESTACIONES_FIJAS)
+
+    traza.etapa('calculo')
+    traza.filas(len(componentes))
+    politicas = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                   componentes['Lead_Time_Semanas'],
+                                   lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])
+    servicio = politicas['servicio']
+    clases = clases_abc(demanda.sum(axis=1) * componentes['Costo_Unitario'].to_numpy(dtype=float))
+    beta = np.array([objetivos[c] for c in clases])[:, None]
+    sigma_L = servicio['sigma_L']
+    mu_L = politicas['costo']['ROP']                      # demanda semanal x L, sin SS
+    res = ss_por_fill_rate(beta, servicio['EOQ'], mu_L, sigma_L)
+
+    traza.etapa('exportacion')
+    filas = []
+    for k, nombre in enumerate(nombres):
+        filas.append(pd.DataFrame({
+            'Componente': componentes['Componente'].to_numpy(),
+            'Estacion': nombre,
+            'Clase_ABC': clases,
+            'Fill_Rate_Objetivo': beta[:, 0],
+            'EOQ': servicio['EOQ'][:, k],
+            'mu_L': mu_L[:, k],
+            'sigma_L': sigma_L[:, k],
+            'k': res['k'][:, k],
+            'CSL_Implicito': res['CSL'][:, k],
+            'Stock_Seguridad': res['SS'][:, k],
+            'ROP': res['ROP'][:, k],
+            f'Stock_Seguridad_Z{Z_ALPHA}': servicio['Stock_Seguridad'][:, k],
+            f'ROP_Z{Z_ALPHA}': servicio['ROP'][:, k],
+        }))
+    tabla = pd.concat(filas, ignore_index=True)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, 'objetivos_servicio.csv')
+    tabla.to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print("SS Y ROP POR FILL RATE OBJETIVO (" + ', '.join(f'{c}={b:.2%}' for c, b in sorted(objetivos.items())) + ")")
+    print("=" * 70)
+    cols = ['Componente', 'Estacion', 'Clase_ABC', 'Fill_Rate_Objetivo', 'k', 'Stock_Seguridad', 'ROP',
+            f'ROP_Z{Z_ALPHA}']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.3f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
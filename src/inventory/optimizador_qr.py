@@ -0,0 +1,202 @@
+# OPTIMIZADOR (Q, R) HADLEY-WHITIN
+# --------------------------------
+# Optimiza Q y R en conjunto (modelo con faltantes pendientes, Winston cap. 16)
+# para todos los componentes y estaciones a la vez:
+#   R:  1 - Phi(k) = h * Q / (c2 * D),          R = mu_L + k * sigma_L
+#   Q:  Q = sqrt(2 * D * (K + c2 * n(R)) / h),   n(R) = sigma_L * L(k)
+# La iteración clásica alterna Q <-> R desde el EOQ, pero converge lento (y
+# oscila) cuando h*Q/(c2*D) se acerca a 1. El mismo punto fijo se resuelve como
+# una ecuación en k, con Q(k) de la segunda fórmula:
+#   g(k) = 1 - Phi(k) - h * Q(k) / (c2 * D) = 0
+# con pasos de Newton vectorizados, acotados por bisección dentro del intervalo
+# de la raíz de mayor k (la de mínimo costo). Si g no cambia de signo no hay
+# óptimo interior: c2 es demasiado bajo frente a h y k queda en K_MIN.
+#   CTE = K*D/Q + h*(Q/2 + R - mu_L) + c2*D*n(R)/Q      (anual, por tasa de la estación)
+# D es la demanda de la estación anualizada; mu_L y sigma_L son la media y el
+# desvío de la demanda en el lead time con el sigma mensual de la estación (los
+# mismos supuestos que el SS de eoq_estacional.py). El CTE de la estación es el
+# anual por la fracción del año que dura.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salida:  outputs/inventory/optimizacion/qr_optimo.csv
+#
+# Uso: python src/inventory/optimizador_qr.py [--estaciones fijas|auto]
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR,
+                         costo_agotamiento, matriz_demanda)
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas, estaciones_automaticas
+from motor_politicas import calcular_politicas
+from scipy.special import ndtr
+
+from perdida_normal import K_MIN, K_MAX, fdp, perdida
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+
+
+def _q_de_k(k, D, h, c2, sigma_L, K):
+    """Q de la segunda ecuación para un k dado."""
+    return np.sqrt(2 * D * (K + c2 * sigma_L * perdida(k)) / h)
+
+
+def optimizar_qr(D, h, c2, mu_L, sigma_L, costo_ordenar=COSTO_ORDENAR,
+                 tol: float = 1e-10, max_iter: int = 50, puntos_grilla: int = 49) -> dict:
+    """(Q, R) de mínimo costo, vectorizado sobre arreglos de cualquier forma.
+
+    D: demanda anual; h: costo de mantener anual por unidad; c2: costo por unidad
+    faltante; mu_L, sigma_L: demanda en el lead time. Sin sigma_L (o sin demanda)
+    queda el EOQ con R = mu_L. Devuelve arreglos con Q, R, k, n(R), costos, si hubo
+    óptimo interior y la cantidad de pasadas de Newton.
+    """
+    D, h, c2, mu_L, sigma_L = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (D, h, c2, mu_L, sigma_L)])
+    K = float(costo_ordenar)
+    activo = (D > 0) & (sigma_L > 0) & np.isfinite(sigma_L)
+    D_seg = np.where(D > 0, D, 1.0)
+    sigma_seg = np.where(activo, sigma_L, 0.0)
+    b = h / (c2 * D_seg)
+
+    def g(k):
+        return ndtr(-k) - b * _q_de_k(k, D, h, c2, sigma_seg, K)
+
+    # Intervalo de la raíz de mayor k: último cambio de signo + -> - en una grilla
+    grilla = np.linspace(K_MIN, K_MAX, puntos_grilla).reshape((-1,) + (1,) * D.ndim)
+    valores = g(grilla)                                           # (grilla, ...)
+    cruce = (valores[:-1] > 0) & (valores[1:] <= 0)
+    interior = activo & cruce.any(axis=0)
+    ultimo = puntos_grilla - 2 - np.argmax(cruce[::-1], axis=0)
+    lo = np.where(interior, K_MIN + ultimo * (K_MAX - K_MIN) / (puntos_grilla - 1), K_MIN)
+    hi = np.where(interior, lo + (K_MAX - K_MIN) / (puntos_grilla - 1), K_MIN)
+
+    # Newton con salvaguarda: g'(k) = -phi(k) + sigma_L * (1 - Phi(k)) / Q(k)
+    k = (lo + hi) / 2
+    pasadas = 0
+    for pasadas in range(1, max_iter + 1):
+        Q = _q_de_k(k, D, h, c2, sigma_seg, K)
+        valor = ndtr(-k) - b * Q
+        derivada = -fdp(k) + sigma_seg * ndtr(-k) / Q
+        lo = np.where(valor > 0, k, lo)
+        hi = np.where(valor > 0, hi, k)
+        nuevo = k - valor / np.where(derivada != 0, derivada, -1e-300)
+        fuera = ~((nuevo >= lo) & (nuevo <= hi))
+        nuevo = np.where(fuera, (lo + hi) / 2, nuevo)
+        cambio = np.abs(nuevo - k)
+        k = np.where(interior, nuevo, k)
+        if np.all(cambio[interior] <= tol):
+            break
+
+    k = np.where(activo, k, 0.0)
+    Q = _q_de_k(k, D, h, c2, sigma_seg, K)
+    n_R = sigma_seg * perdida(k)
+    R = mu_L + k * sigma_seg
+    with np.errstate(divide='ignore', invalid='ignore'):
+        costo_pedidos = np.where(Q > 0, K * D / Q, 0.0)
+        faltante_anual = np.where(Q > 0, D * n_R / Q, 0.0)
+    costo_mantener = h * (Q / 2 + R - mu_L)
+    costo_faltante = c2 * faltante_anual
+    return {
+        'Q': Q, 'R': R, 'k': k, 'Faltante_Ciclo': n_R, 'Faltante_Anual': faltante_anual,
+        'Prob_Quiebre': np.where(activo, ndtr(-k), 0.0),
+        'Costo_Pedidos': costo_pedidos, 'Costo_Mantener': costo_mantener, 'Costo_Faltante': costo_faltante,
+        'CTE': costo_pedidos + costo_mantener + costo_faltante,
+        'Optimo_Interior': interior | ~activo,
+        'pasadas': pasadas,
+    }
+
+
+def politicas_optimas(demanda, estacion_mes, componentes: pd.DataFrame) -> dict:
+    """(Q, R) óptimos por ítem y estación, con el CTE de la Política A como referencia."""
+    politicas = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                   componentes['Lead_Time_Semanas'],
+                                   lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])
+    D_est = politicas['costo']['Demanda_Estacion']
+    fraccion = np.broadcast_to(politicas['estaciones']['fraccion'], D_est.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        D_anual = np.where(fraccion > 0, D_est / fraccion, np.nan)
+    h = componentes['Costo_Unitario'].to_numpy(dtype=float)[:, None] * TASA_MANTENIMIENTO
+    c2 = costo_agotamiento(componentes)[:, None]
+    mu_L = politicas['costo']['ROP']                      # demanda semanal x L, sin SS
+    sigma_L = politicas['servicio']['sigma_L']
+    resultado = optimizar_qr(np.nan_to_num(D_anual), h, c2, mu_L, sigma_L)
+    resultado['fraccion'] = fraccion
+    resultado['mu_L'] = mu_L
+    resultado['sigma_L'] = sigma_L
+    resultado['EOQ_A'] = politicas['costo']['EOQ']
+    resultado['ROP_A'] = politicas['costo']['ROP']
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Optimización conjunta de (Q, R) con faltantes (Hadley-Whitin)')
+    parser.add_argument('--estaciones', choices=['fijas', 'auto'], default='fijas')
+    parser.add_argument('--max-estaciones', type=int, default=3)
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+
+    traza.etapa('optimizacion')
+    traza.filas(demanda.shape[0])
+    if args.estaciones == 'auto':
+        estacion_mes = estaciones_automaticas(demanda, args.max_estaciones)
+        nombres = [f'E{k + 1}' for k in range(int(estacion_mes.max()) + 1)]
+    else:
+        estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+        nombres = list(ESTACIONES_FIJAS)
+    res = politicas_optimas(demanda, estacion_mes, componentes)
+
+    traza.etapa('exportacion')
+    filas = []
+    for k, nombre in enumerate(nombres):
+        frac = res['fraccion'][:, k]
+        df = pd.DataFrame({
+            'Componente': componentes['Componente'].to_numpy(),
+            'Estacion': nombre,
+            'mu_L': res['mu_L'][:, k],
+            'sigma_L': res['sigma_L'][:, k],
+            'Q_Optimo': res['Q'][:, k],
+            'R_Optimo': res['R'][:, k],
+            'k': res['k'][:, k],
+            'Prob_Quiebre_Ciclo': res['Prob_Quiebre'][:, k],
+            'Faltante_Ciclo': res['Faltante_Ciclo'][:, k],
+            'Faltante_Estacion': res['Faltante_Anual'][:, k] * frac,
+            'CTE_Estacion': res['CTE'][:, k] * frac,
+            'Optimo_Interior': res['Optimo_Interior'][:, k],
+            'EOQ_Politica_A': res['EOQ_A'][:, k],
+            'ROP_Politica_A': res['ROP_A'][:, k],
+        })
+        filas.append(df[frac > 0])
+    tabla = pd.concat(filas, ignore_index=True)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.estaciones == 'fijas' else '_auto'
+    salida = os.path.join(OUTPUT_DIR, f'qr_optimo{sufijo}.csv')
+    tabla.to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"(Q, R) ÓPTIMOS HADLEY-WHITIN ({res['pasadas']} pasadas de Newton)")
+    print("=" * 70)
+    cols = ['Componente', 'Estacion', 'Q_Optimo', 'R_Optimo', 'k', 'Faltante_Estacion', 'CTE_Estacion']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
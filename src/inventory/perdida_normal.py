@@ -0,0 +1,77 @@
+# FUNCIÓN DE PÉRDIDA NORMAL
+# -------------------------
+# Versiones vectorizadas de phi, Phi y la pérdida estándar
+#   L(k) = phi(k) - k * (1 - Phi(k))
+# (faltante esperado por ciclo = sigma_L * L(k)), más la resolución por Newton de
+# 1 - Phi(k) = a, la condición de R óptimo del modelo Hadley-Whitin, y la inversa
+# de L(k) para objetivos de fill rate (tabla interpolada + Newton).
+# Todas aceptan escalares o arreglos de cualquier forma.
+
+import numpy as np
+from scipy.special import ndtr
+
+# Rango de k considerado: fuera de él L(k) y 1 - Phi(k) son despreciables o lineales
+K_MIN = -4.0
+K_MAX = 8.0
+_RAIZ_2PI = np.sqrt(2 * np.pi)
+
+
+def fdp(k):
+    """Densidad normal estándar phi(k)."""
+    k = np.asarray(k, dtype=float)
+    return np.exp(-0.5 * k * k) / _RAIZ_2PI
+
+
+def fda(k):
+    """Distribución normal estándar Phi(k)."""
+    return ndtr(k)
+
+
+def perdida(k):
+    """Pérdida estándar L(k) = phi(k) - k * (1 - Phi(k))."""
+    k = np.asarray(k, dtype=float)
+    return fdp(k) - k * ndtr(-k)
+
+
+def k_por_probabilidad(a, k0=None, tol: float = 1e-10, max_iter: int = 50):
+    """k con 1 - Phi(k) = a, por Newton vectorizado desde k0.
+
+    Las probabilidades fuera de (0, 1) quedan en los extremos K_MAX / K_MIN.
+    Devuelve (k, iteraciones).
+    """
+    a = np.asarray(a, dtype=float)
+    k = np.zeros_like(a) if k0 is None else np.clip(np.broadcast_to(np.asarray(k0, dtype=float), a.shape), K_MIN, K_MAX)
+    a_int = np.clip(a, ndtr(-K_MAX), ndtr(-K_MIN))
+    iteraciones = 0
+    for iteraciones in range(1, max_iter + 1):
+        # g(k) = 1 - Phi(k) - a,  g'(k) = -phi(k)
+        paso = (ndtr(-k) - a_int) / np.maximum(fdp(k), 1e-300)
+        k = np.clip(k + paso, K_MIN, K_MAX)
+        if np.all(np.abs(paso) < tol):
+            break
+    k = np.where(a >= 1, K_MIN, np.where(a <= 0, K_MAX, k))
+    return k, iteraciones
+
+
+# Inversa de la pérdida: tabla + Newton -----------------------------------------
+
+# log L(k) es suave y monótono en todo el rango: la interpolación lineal en la
+# tabla deja un error relativo ~1e-6 en L y un paso de Newton ya llega a ~1e-12.
+_K_TABLA = np.linspace(K_MIN, K_MAX, 2049)
+_LOG_L_TABLA = np.log(perdida(_K_TABLA))
+
+
+def k_por_perdida(objetivo, pasos_newton: int = 2):
+    """k con L(k) = objetivo (p. ej. (1 - beta) * Q / sigma_L), vectorizado.
+
+    Objetivos por encima de L(K_MIN) o por debajo de L(K_MAX) quedan en los
+    extremos del rango.
+    """
+    objetivo = np.asarray(objetivo, dtype=float)
+    log_obj = np.log(np.clip(objetivo, np.exp(_LOG_L_TABLA[-1]), np.exp(_LOG_L_TABLA[0])))
+    k = np.interp(log_obj, _LOG_L_TABLA[::-1], _K_TABLA[::-1])
+    for _ in range(pasos_newton):
+        # L'(k) = -(1 - Phi(k)); Newton sobre log L, que es casi lineal en k
+        L = perdida(k)
+        k = k + (np.log(L) - log_obj) * L / ndtr(-k)
+    return np.clip(k, K_MIN, K_MAX)
@@ -0,0 +1,277 @@
+# REPLAY HISTÓRICO DE PEDIDOS CONTRA POLÍTICAS DE INVENTARIO
+# ----------------------------------------------------------
+# Backtest de políticas con los pedidos reales: cada línea de
+# sales_data_sample_clean.csv se explota por el catálogo de componentes
+# (Classic Cars -> componentes 'Clásico' y 'Ambos', Vintage Cars -> 'Vintage' y
+# 'Ambos') y los eventos se reproducen en orden de fecha contra una política
+# candidata, día a día:
+#   - qr: (Q, R) con revisión continua, se piden n lotes Q hasta superar R.
+#   - ss: (s, S) con s = ROP y S = ROP + EOQ, se pide hasta S.
+# Los parámetros salen de la tabla de políticas (ROP y EOQ por componente y
+# estación, según el mes calendario del evento). Los faltantes quedan pendientes
+# (backorder). Las llegadas de pedidos son eventos futuros en una cola de
+# prioridad (heap); el estado por componente vive en arreglos compactos.
+# Por defecto cada línea de pedido es un auto, igual que en ventaspormes.csv y el
+# pronóstico; con --unidades cantidad se usa QUANTITYORDERED.
+#
+# Entradas: data/sales_data_sample_clean.csv (o --datos, p. ej. datos sintéticos)
+#           outputs/inventory/eoq_estacional/tabla_valores_clave.csv (o --tabla, varias)
+# Salidas:  outputs/inventory/replay/replay_resumen.csv
+#           outputs/inventory/replay/replay_trayectoria_<politica>.csv
+#
+# Uso: python src/inventory/replay_pedidos.py --tipos qr ss
+
+import os
+import sys
+import time
+import heapq
+import argparse
+from array import array
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, LINEAS_POR_FOCO,
+                         costo_agotamiento, normalizar_foco)
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+
+DATOS_POR_DEFECTO = os.path.join(project_root, 'data', 'sales_data_sample_clean.csv')
+TABLA_POR_DEFECTO = os.path.join(project_root, 'outputs', 'inventory', 'eoq_estacional', 'tabla_valores_clave.csv')
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'replay')
+TIPOS = ('qr', 'ss')
+
+
+# Eventos de demanda -----------------------------------------------------------
+
+def leer_pedidos(path: str, unidades: str = 'lineas', chunksize: int = 1_000_000) -> pd.DataFrame:
+    """Líneas de pedido despachadas (fecha, pedido, línea de producto, cantidad), leídas por bloques."""
+    columnas = ['ORDERNUMBER', 'ORDERLINENUMBER', 'ORDERDATE', 'PRODUCTLINE', 'QUANTITYORDERED', 'STATUS']
+    lineas = sorted({l for ls in LINEAS_POR_FOCO.values() for l in ls})
+    partes = []
+    for bloque in pd.read_csv(path, usecols=lambda c: c in columnas, chunksize=chunksize,
+                              encoding='utf-8', low_memory=False):
+        if 'STATUS' in bloque:
+            bloque = bloque[bloque['STATUS'] == 'Shipped']
+        bloque = bloque[bloque['PRODUCTLINE'].isin(lineas)]
+        partes.append(pd.DataFrame({
+            'Fecha': pd.to_datetime(bloque['ORDERDATE'], errors='coerce').dt.normalize(),
+            'Pedido': bloque['ORDERNUMBER'].to_numpy(),
+            'Linea_Pedido': bloque['ORDERLINENUMBER'].to_numpy(),
+            'PRODUCTLINE': bloque['PRODUCTLINE'].to_numpy(),
+            'Cantidad': 1.0 if unidades == 'lineas' else bloque['QUANTITYORDERED'].to_numpy(dtype=float),
+        }))
+    return pd.concat(partes, ignore_index=True).dropna(subset=['Fecha'])
+
+
+def explotar_eventos(pedidos: pd.DataFrame, componentes: pd.DataFrame) -> dict:
+    """Eventos de demanda por componente, ordenados por (día, pedido, línea, componente).
+
+    Devuelve arreglos planos dia (desde la primera fecha), item y cantidad, más el
+    calendario de días.
+    """
+    inicio = pedidos['Fecha'].min()
+    dia_linea = (pedidos['Fecha'] - inicio).dt.days.to_numpy()
+    dias, items, cantidades, pedido, linea = [], [], [], [], []
+    for i, foco in enumerate(componentes['Auto_Foco']):
+        filas = pedidos['PRODUCTLINE'].isin(LINEAS_POR_FOCO[normalizar_foco(foco)]).to_numpy()
+        uso = float(componentes['Uso_por_Auto'].iloc[i])
+        dias.append(dia_linea[filas])
+        items.append(np.full(filas.sum(), i))
+        cantidades.append(pedidos['Cantidad'].to_numpy()[filas] * uso)
+        pedido.append(pedidos['Pedido'].to_numpy()[filas])
+        linea.append(pedidos['Linea_Pedido'].to_numpy()[filas])
+    dias, items, cantidades = np.concatenate(dias), np.concatenate(items), np.concatenate(cantidades)
+    orden = np.lexsort((items, np.concatenate(linea), np.concatenate(pedido), dias))
+    n_dias = int(dias.max()) + 1
+    return {
+        'dia': dias[orden].astype(np.int64),
+        'item': items[orden].astype(np.int64),
+        'cantidad': cantidades[orden],
+        'calendario': pd.date_range(inicio, periods=n_dias, freq='D'),
+    }
+
+
+# Políticas --------------------------------------------------------------------
+
+def parametros_politica(tabla: pd.DataFrame, componentes: pd.DataFrame, calendario: pd.DatetimeIndex,
+                        tipo: str) -> dict:
+    """Punto de pedido y tamaño/nivel de pedido por (día, ítem) según la estación del día."""
+    politica = tabla.set_index(['Componente', 'Estacion'])
+    nombres = list(ESTACIONES_FIJAS)
+    rop = np.empty((len(nombres), len(componentes)))
+    eoq = np.empty_like(rop)
+    for i, comp in enumerate(componentes['Componente']):
+        for k, nombre in enumerate(nombres):
+            rop[k, i] = politica.loc[(comp, nombre), 'ROP']
+            eoq[k, i] = politica.loc[(comp, nombre), 'EOQ']
+    estacion_dia = etiquetas_fijas(calendario.month.to_numpy())
+    punto = rop[estacion_dia]
+    # qr: el segundo parámetro es el lote Q; ss: el nivel S hasta el que se repone
+    segundo = eoq[estacion_dia] if tipo == 'qr' else rop[estacion_dia] + eoq[estacion_dia]
+    return {'tipo': tipo, 'punto': punto, 'segundo': segundo}
+
+
+# Replay -----------------------------------------------------------------------
+
+def reproducir(eventos: dict, params: dict, lead_time_dias: np.ndarray, h_diario: np.ndarray,
+               costo_ordenar: float, p: np.ndarray) -> dict:
+    """Reproduce los eventos en orden contra una política y acumula las métricas.
+
+    Un pedido emitido el día d llega al inicio del día d + L, antes de la demanda
+    de ese día. La trayectoria guarda el inventario neto (negativo = pendiente) al
+    cierre de cada día.
+    """
+    dias_ev, items_ev, cant_ev = eventos['dia'].tolist(), eventos['item'].tolist(), eventos['cantidad'].tolist()
+    n_dias = len(eventos['calendario'])
+    n_items = len(lead_time_dias)
+    punto, segundo = params['punto'].tolist(), params['segundo'].tolist()
+    es_qr = params['tipo'] == 'qr'
+    L = [int(x) for x in lead_time_dias]
+
+    # Estado por componente
+    neto = array('d', segundo[0] if not es_qr else [r + q for r, q in zip(punto[0], segundo[0])])
+    en_camino = array('d', [0.0] * n_items)
+    demanda = array('d', [0.0] * n_items)
+    faltante = array('d', [0.0] * n_items)
+    quiebres = array('l', [0] * n_items)
+    pedidos = array('l', [0] * n_items)
+    trayectoria = np.empty((n_dias, n_items))
+
+    cola = []      # (día de llegada, secuencia, ítem, cantidad)
+    secuencia = 0
+    dia_actual = 0
+
+    def recibir(dia):
+        while cola and cola[0][0] <= dia:
+            _, _, item, cantidad = heapq.heappop(cola)
+            neto[item] += cantidad
+            en_camino[item] -= cantidad
+
+    for dia, item, cantidad in zip(dias_ev, items_ev, cant_ev):
+        while dia_actual < dia:
+            trayectoria[dia_actual] = neto
+            dia_actual += 1
+            recibir(dia_actual)
+
+        disponible = neto[item] if neto[item] > 0 else 0.0
+        if cantidad > disponible:
+            faltante[item] += cantidad - disponible
+            quiebres[item] += 1
+        neto[item] -= cantidad
+        demanda[item] += cantidad
+
+        posicion = neto[item] + en_camino[item]
+        r = punto[dia][item]
+        if posicion <= r:
+            if es_qr:
+                q = segundo[dia][item]
+                pedido = ((r - posicion) // q + 1) * q
+            else:
+                pedido = segundo[dia][item] - posicion
+            if pedido > 0:
+                secuencia += 1
+                heapq.heappush(cola, (dia + L[item], secuencia, item, pedido))
+                en_camino[item] += pedido
+                pedidos[item] += 1
+
+    while dia_actual < n_dias:
+        trayectoria[dia_actual] = neto
+        dia_actual += 1
+        recibir(dia_actual)
+
+    demanda, faltante = np.asarray(demanda), np.asarray(faltante)
+    pedidos = np.asarray(pedidos, dtype=float)
+    inventario = np.maximum(trayectoria, 0)
+    costo_pedidos = costo_ordenar * pedidos
+    costo_mantener = h_diario * inventario.sum(axis=0)
+    costo_faltante = p * faltante
+    return {
+        'Demanda': demanda,
+        'Faltante_Unidades': faltante,
+        'Fill_Rate': np.divide(demanda - faltante, demanda, out=np.ones(n_items), where=demanda > 0),
+        'Eventos_Quiebre': np.asarray(quiebres, dtype=float),
+        'Dias_Con_Pendientes': (trayectoria < 0).sum(axis=0).astype(float),
+        'Pedidos': pedidos,
+        'Inventario_Promedio': inventario.mean(axis=0),
+        'Costo_Pedidos': costo_pedidos,
+        'Costo_Mantener': costo_mantener,
+        'Costo_Faltante': costo_faltante,
+        'Costo_Total': costo_pedidos + costo_mantener + costo_faltante,
+        'trayectoria': trayectoria,
+    }
+
+
+# Script -----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay de pedidos históricos contra políticas de inventario')
+    parser.add_argument('--datos', default=DATOS_POR_DEFECTO, help='CSV de líneas de pedido')
+    parser.add_argument('--tabla', nargs='+', default=[TABLA_POR_DEFECTO],
+                        help='Una o más tablas de políticas (tabla_valores_clave*.csv)')
+    parser.add_argument('--tipos', nargs='+', choices=TIPOS, default=['qr'])
+    parser.add_argument('--unidades', choices=['lineas', 'cantidad'], default='lineas',
+                        help='Autos por línea: 1 (como el pronóstico) o QUANTITYORDERED')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+
+    traza.etapa('carga')
+    pedidos = leer_pedidos(args.datos, args.unidades)
+    traza.filas(len(pedidos))
+
+    traza.etapa('eventos')
+    componentes = COMPONENTES
+    eventos = explotar_eventos(pedidos, componentes)
+    traza.filas(len(eventos['dia']))
+    lead_time_dias = componentes['Lead_Time_Semanas'].to_numpy(dtype=int) * 7
+    h_diario = componentes['Costo_Unitario'].to_numpy(dtype=float) * TASA_MANTENIMIENTO / 365
+    p = costo_agotamiento(componentes)
+
+    traza.etapa('replay')
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    filas = []
+    for path_tabla in args.tabla:
+        tabla = pd.read_csv(path_tabla)
+        for tipo in args.tipos:
+            nombre = f"{tipo}_{os.path.splitext(os.path.basename(path_tabla))[0]}"
+            params = parametros_politica(tabla, componentes, eventos['calendario'], tipo)
+            t0 = time.perf_counter()
+            res = reproducir(eventos, params, lead_time_dias, h_diario, COSTO_ORDENAR, p)
+            segundos = time.perf_counter() - t0
+            print(f"[OK] {nombre}: {len(eventos['dia']):,} eventos en {segundos:.2f} s "
+                  f"({len(eventos['dia']) / max(segundos, 1e-9) * 60:,.0f} eventos/min)")
+
+            metricas = [m for m in res if m != 'trayectoria']
+            df = pd.DataFrame({'Politica': nombre, 'Componente': componentes['Componente'].to_numpy()})
+            for m in metricas:
+                df[m] = res[m]
+            total = {'Politica': nombre, 'Componente': 'TOTAL'}
+            total.update({m: res[m].sum() for m in metricas if m not in ('Fill_Rate', 'Inventario_Promedio')})
+            filas.append(pd.concat([df, pd.DataFrame([total])], ignore_index=True))
+
+            tray = pd.DataFrame(res['trayectoria'], columns=componentes['Componente'].to_numpy())
+            tray.insert(0, 'Fecha', eventos['calendario'].strftime('%Y-%m-%d'))
+            tray.round(4).to_csv(os.path.join(OUTPUT_DIR, f'replay_trayectoria_{nombre}.csv'), index=False)
+
+    traza.etapa('exportacion')
+    resumen = pd.concat(filas, ignore_index=True)
+    salida = os.path.join(OUTPUT_DIR, 'replay_resumen.csv')
+    resumen.round(4).to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"REPLAY DE PEDIDOS: {len(pedidos):,} líneas, {eventos['calendario'][0]:%Y-%m-%d} a "
+          f"{eventos['calendario'][-1]:%Y-%m-%d}")
+    print("=" * 70)
+    cols = ['Politica', 'Componente', 'Fill_Rate', 'Eventos_Quiebre', 'Inventario_Promedio', 'Costo_Total']
+    print(resumen[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {OUTPUT_DIR}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# REPOSICIÓN CONJUNTA (JRP) DE COMPONENTES DEL MISMO PROVEEDOR
+# ------------------------------------------------------------
+# eoq_estacional.py pide cada componente por separado con COSTO_ORDENAR = 300.
+# Si varios componentes vienen del mismo proveedor, ese costo se separa en un
+# costo mayor S (el pedido al proveedor) y un costo menor s por ítem incluido
+# (S + s = COSTO_ORDENAR, así un pedido de un solo ítem cuesta lo mismo que hoy).
+# Se pide cada T (ciclo base) y el ítem i entra cada k_i ciclos:
+#   CT(T, k) = (S + sum_i s_i / k_i) / T + T/2 * sum_i k_i * h_i * D_i
+# Algoritmo RAND (Kaspi y Rosenblatt): desde varios T iniciales entre
+#   T_min = min_i sqrt(2 s_i / (h_i D_i))  y  T_max = sqrt(2 (S + sum s_i) / sum h_i D_i)
+# alterna el k_i entero óptimo para T,
+#   k_i(k_i - 1) <= 2 s_i / (h_i D_i T^2) <= k_i(k_i + 1),
+# con el T óptimo para los k. Todos los T iniciales y todos los ítems se
+# resuelven a la vez como arreglos (puntos, ítems). Con --metodo potencias2 los
+# k_i se restringen a potencias de dos (política de Roundy).
+# D es la demanda anual pronosticada y h el costo de mantener anual.
+#
+# Entrada: pronóstico Prophet y, opcional, CSV Componente,Proveedor (--proveedores);
+#          sin él todos los componentes son de un mismo proveedor.
+# Salidas: outputs/inventory/optimizacion/reposicion_conjunta.csv (por ítem)
+#          outputs/inventory/optimizacion/reposicion_conjunta_grupos.csv (ahorro por proveedor)
+#
+# Uso: python src/inventory/reposicion_conjunta.py --fraccion-mayor 0.8 --metodo rand
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, matriz_demanda
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'optimizacion')
+
+
+def _k_enteros(T, s, hD):
+    """k_i entero óptimo para cada T: menor k con 2 s / (hD T^2) <= k (k + 1)."""
+    r = 2 * s / (hD * T ** 2)
+    return np.maximum(1, np.ceil((np.sqrt(1 + 4 * r) - 1) / 2 - 1e-12))
+
+
+def _k_potencias2(T, s, hD):
+    """k_i potencia de dos de menor costo para cada T (2^p o 2^(p+1) alrededor del k continuo)."""
+    k_real = np.sqrt(2 * s / (hD * T ** 2))
+    p = np.floor(np.log2(np.maximum(k_real, 1)))
+    bajo, alto = 2.0 ** p, 2.0 ** (p + 1)
+    costo = lambda k: s / (k * T) + T * k * hD / 2
+    return np.where(costo(bajo) <= costo(alto), bajo, alto)
+
+
+def costo_conjunto(T, k, S, s, hD):
+    return (S + (s / k).sum(axis=-1)) / T[..., 0] + T[..., 0] / 2 * (k * hD).sum(axis=-1)
+
+
+def resolver_jrp(D, h, costo_mayor, costo_menor, metodo: str = 'rand', puntos: int = 10,
+                 max_iter: int = 100) -> dict:
+    """Ciclo base T (años) y multiplicadores k_i de un grupo de ítems.
+
+    D, h y costo_menor son vectores por ítem. Los ítems con h D <= 0 (sin demanda)
+    no se piden: quedan con k = 1, fuera del cálculo de T y del costo, y 'pide' los
+    marca en False. Devuelve T, k, pide, el costo anual conjunto y las iteraciones
+    (T = NaN y costo 0 si ningún ítem se pide).
+    """
+    D, h, s_todos = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (D, h, costo_menor)])
+    S = float(costo_mayor)
+    pide = h * D > 0
+    k_todos = np.ones(len(pide))
+    if not pide.any():
+        return {'T': np.nan, 'k': k_todos, 'pide': pide, 'costo': 0.0, 'iteraciones': 0}
+    hD, s = (h * D)[pide], s_todos[pide]
+    elegir_k = _k_potencias2 if metodo == 'potencias2' else _k_enteros
+
+    T_max = np.sqrt(2 * (S + s.sum()) / hD.sum())
+    T_min = min(np.sqrt(2 * s / hD).min(), T_max) if np.any(s > 0) else T_max
+    T = np.linspace(T_min, T_max, puntos)[:, None]                      # (puntos, 1)
+    k = elegir_k(T, s, hD)
+    iteraciones = 0
+    for iteraciones in range(1, max_iter + 1):
+        T = np.sqrt(2 * (S + (s / k).sum(axis=1, keepdims=True)) / (k * hD).sum(axis=1, keepdims=True))
+        nuevo = elegir_k(T, s, hD)
+        if np.array_equal(nuevo, k):
+            break
+        k = nuevo
+    costos = costo_conjunto(T, k, S, s, hD)
+    mejor = int(np.argmin(costos))
+    k_todos[pide] = k[mejor]
+    return {'T': float(T[mejor, 0]), 'k': k_todos, 'pide': pide, 'costo': float(costos[mejor]),
+            'iteraciones': iteraciones}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reposición conjunta (JRP) por proveedor')
+    parser.add_argument('--fraccion-mayor', type=float, default=0.8,
+                        help='Parte de COSTO_ORDENAR que es costo mayor del proveedor (default 0.8)')
+    parser.add_argument('--metodo', choices=['rand', 'potencias2'], default='rand')
+    parser.add_argument('--puntos', type=int, default=10, help='T iniciales del algoritmo RAND')
+    parser.add_argument('--proveedores', help='CSV con columnas Componente,Proveedor')
+    args = parser.parse_args()
+    if not 0 <= args.fraccion_mayor <= 1:
+        parser.error('--fraccion-mayor debe estar entre 0 y 1')
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES.copy()
+    if args.proveedores:
+        proveedores = pd.read_csv(args.proveedores).set_index('Componente')['Proveedor']
+        componentes['Proveedor'] = componentes['Componente'].map(proveedores).fillna('Sin proveedor')
+    else:
+        componentes['Proveedor'] = 'Unico'
+    D = matriz_demanda(componentes, df_pronostico).sum(axis=1)
+    h = componentes['Costo_Unitario'].to_numpy(dtype=float) * TASA_MANTENIMIENTO
+    S = args.fraccion_mayor * COSTO_ORDENAR
+    s = np.full(len(componentes), COSTO_ORDENAR - S)
+
+    traza.etapa('optimizacion')
+    traza.filas(len(componentes))
+    # Referencia: EOQ independiente con el costo de pedido completo
+    costo_indep = np.sqrt(2 * COSTO_ORDENAR * h * D)
+    filas, grupos = [], []
+    for proveedor, idx in componentes.groupby('Proveedor', sort=False).indices.items():
+        res = resolver_jrp(D[idx], h[idx], S, s[idx], args.metodo, args.puntos)
+        T, k, pide = res['T'], res['k'], res['pide']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            eoq_indep = np.where(pide, np.sqrt(2 * COSTO_ORDENAR * D[idx] / h[idx]), 0.0)
+        filas.append(pd.DataFrame({
+            'Proveedor': proveedor,
+            'Componente': componentes['Componente'].to_numpy()[idx],
+            'Demanda_Anual': D[idx],
+            'Se_Pide': pide,
+            'Multiplicador_k': k.astype(int),
+            'Ciclo_Semanas': np.where(pide, k * T * 52, np.nan),
+            'Lote': np.where(pide, D[idx] * k * T, 0.0),
+            'EOQ_Independiente': eoq_indep,
+            'Costo_Independiente': costo_indep[idx],
+            # Costo propio del ítem en el esquema conjunto (sin el costo mayor)
+            'Costo_Menor_y_Mantener': np.where(pide, s[idx] / (k * T) + k * T * h[idx] * D[idx] / 2, 0.0),
+        }))
+        independiente = costo_indep[idx].sum()
+        grupos.append({
+            'Proveedor': proveedor, 'Items': len(idx), 'Costo_Mayor': S, 'Costo_Menor': s[idx][0],
+            'Ciclo_Base_Semanas': T * 52, 'Costo_Independiente': independiente, 'Costo_Conjunto': res['costo'],
+            'Ahorro': independiente - res['costo'],
+            'Ahorro_Pct': 1 - res['costo'] / independiente if independiente > 0 else np.nan,
+            'Iteraciones': res['iteraciones'],
+        })
+    tabla = pd.concat(filas, ignore_index=True)
+    resumen = pd.DataFrame(grupos)
+
+    traza.etapa('exportacion')
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.metodo == 'rand' else f'_{args.metodo}'
+    salida = os.path.join(OUTPUT_DIR, f'reposicion_conjunta{sufijo}.csv')
+    tabla.to_csv(salida, index=False)
+    resumen.to_csv(os.path.join(OUTPUT_DIR, f'reposicion_conjunta_grupos{sufijo}.csv'), index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"REPOSICIÓN CONJUNTA ({args.metodo}, S = {S:,.0f}, s = {COSTO_ORDENAR - S:,.0f})")
+    print("=" * 70)
+    cols = ['Proveedor', 'Componente', 'Multiplicador_k', 'Ciclo_Semanas', 'Lote', 'EOQ_Independiente']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print()
+    print(resumen.to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
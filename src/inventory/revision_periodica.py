@@ -0,0 +1,169 @@
+# POLÍTICAS DE REVISIÓN PERIÓDICA (R, S) Y (s, S)
+# -----------------------------------------------
+# Las políticas de eoq_estacional.py son de revisión continua (se pide Q al tocar
+# el ROP). Con revisión cada R semanas el stock tiene que cubrir R + L semanas:
+#   sigma_{R+L} = sqrt((R + L) sigma_sem^2 + d_sem^2 sigma_LT^2),  SS = Z * sigma_{R+L}
+#   (R, S): en cada revisión se pide hasta S = d_sem (R + L) + SS.
+#   (s, S): se pide hasta S solo si la posición está en s o menos;
+#           s = d_sem (R + L) + SS y S = s + Q, con Q el EOQ anual de la Política B.
+# Costo de la estación con las convenciones de la Política B (SS con H anual):
+#   CTE = pedidos * K + (tamaño / 2) * H * fracción + SS * H
+# En (R, S) se pide d_sem R cada revisión. En (s, S) el pedido medio es Q más el
+# faltante bajo s al revisar (aprox. d_sem R / 2), y al menos d_sem R.
+# Se evalúa una grilla de R (1..--max-revision semanas) como un arreglo
+# (ítems, estaciones, R) y se elige el R de menor costo anual por ítem.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/inventory/revision_periodica/revision_periodica.csv (ítem x estación, R dado)
+#          outputs/inventory/revision_periodica/revision_periodica_grilla.csv (R óptimo por ítem)
+#
+# Uso: python src/inventory/revision_periodica.py --revision 1 --max-revision 13
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, Z_ALPHA, matriz_demanda
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas, sigma_lead_time
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'revision_periodica')
+POLITICAS = ('RS', 'sS')
+
+
+def politicas_revision(politicas: dict, L, L_desvio, R, costo_unitario,
+                       z=Z_ALPHA, tasa=TASA_MANTENIMIENTO, costo_ordenar=COSTO_ORDENAR) -> dict:
+    """Niveles y costo de (R, S) y (s, S) para cada ítem, estación y R.
+
+    politicas es la salida de calcular_politicas; L, L_desvio y costo_unitario son
+    vectores por ítem; R es escalar o un vector de intervalos (semanas). Los
+    arreglos devueltos tienen forma (ítems, estaciones, R).
+    """
+    servicio = politicas['servicio']
+    D = servicio['Demanda_Estacion'][:, :, None]
+    semanas = np.broadcast_to(politicas['estaciones']['semanas'], servicio['Demanda_Estacion'].shape)[:, :, None]
+    fraccion = np.broadcast_to(politicas['estaciones']['fraccion'], servicio['Demanda_Estacion'].shape)[:, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_sem = np.where(semanas > 0, D / semanas, 0.0)
+    R = np.atleast_1d(np.asarray(R, dtype=float))[None, None, :]
+    L = np.asarray(L, dtype=float).reshape(-1, 1, 1)
+    L_desvio = np.asarray(L_desvio, dtype=float).reshape(-1, 1, 1)
+    H = np.asarray(costo_unitario, dtype=float).reshape(-1, 1, 1) * tasa
+
+    sigma = sigma_lead_time(servicio['sigma_mensual'][:, :, None], d_sem, L + R, L_desvio)
+    SS = z * sigma
+    s = d_sem * (R + L) + SS
+    Q = servicio['EOQ'][:, :, None]
+    tamano = {'RS': np.broadcast_to(d_sem * R, SS.shape),
+              'sS': np.maximum(Q + d_sem * R / 2, d_sem * R)}
+    salida = {'d_sem': d_sem, 'sigma_RL': sigma, 'SS': SS, 's': s, 'S_RS': s, 'S_sS': s + Q}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for politica, tam in tamano.items():
+            pedidos = np.where(tam > 0, D / tam, 0.0)
+            salida[f'Pedidos_{politica}'] = pedidos
+            salida[f'Tamano_{politica}'] = tam
+            salida[f'CTE_{politica}'] = pedidos * costo_ordenar + tam / 2 * H * fraccion + SS * H
+    return salida
+
+
+def mejor_revision(resultado: dict, grilla) -> dict:
+    """R de menor costo anual (suma de estaciones) por ítem y política."""
+    grilla = np.asarray(grilla)
+    mejor = {}
+    for politica in POLITICAS:
+        anual = np.nansum(resultado[f'CTE_{politica}'], axis=1)              # (ítems, R)
+        idx = np.argmin(anual, axis=1)
+        mejor[politica] = {'R': grilla[idx], 'indice': idx, 'CTE': anual[np.arange(len(idx)), idx]}
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Políticas de revisión periódica (R, S) y (s, S)')
+    parser.add_argument('--revision', type=int, default=1, help='Intervalo de revisión en semanas (default 1)')
+    parser.add_argument('--max-revision', type=int, default=13, help='Mayor R de la grilla (semanas)')
+    args = parser.parse_args()
+    if args.revision < 1 or args.max_revision < 1:
+        parser.error('--revision y --max-revision deben ser al menos 1 semana')
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nombres = list(ESTACIONES_FIJAS)
+    L = componentes['Lead_Time_Semanas'].to_numpy(dtype=float)
+    L_desvio = componentes['Lead_Time_Desvio_Semanas'].to_numpy(dtype=float)
+    CU = componentes['Costo_Unitario'].to_numpy(dtype=float)
+
+    traza.etapa('calculo')
+    traza.filas(len(componentes))
+    politicas = calcular_politicas(demanda, estacion_mes, CU, L, lead_time_desvio_semanas=L_desvio)
+    servicio = politicas['servicio']
+    grilla = np.arange(1, max(args.max_revision, args.revision) + 1)
+    res = politicas_revision(politicas, L, L_desvio, grilla, CU)
+    mejor = mejor_revision(res, grilla)
+    r = args.revision - 1                                                  # índice del R pedido
+
+    traza.etapa('exportacion')
+    filas = []
+    for k, nombre in enumerate(nombres):
+        filas.append(pd.DataFrame({
+            'Componente': componentes['Componente'].to_numpy(),
+            'Estacion': nombre,
+            'Revision_Semanas': args.revision,
+            'Demanda_Semanal': res['d_sem'][:, k, 0],
+            'sigma_RL': res['sigma_RL'][:, k, r],
+            'Stock_Seguridad': res['SS'][:, k, r],
+            'S_RS': res['S_RS'][:, k, r],
+            'Pedidos_RS': res['Pedidos_RS'][:, k, r],
+            'CTE_RS': res['CTE_RS'][:, k, r],
+            's_sS': res['s'][:, k, r],
+            'S_sS': res['S_sS'][:, k, r],
+            'Pedidos_sS': res['Pedidos_sS'][:, k, r],
+            'CTE_sS': res['CTE_sS'][:, k, r],
+            'Stock_Seguridad_Continua': servicio['Stock_Seguridad'][:, k],
+            'ROP_Continua': servicio['ROP'][:, k],
+            'CTE_Continua': servicio['CTE'][:, k],
+        }))
+    tabla = pd.concat(filas, ignore_index=True)
+    resumen = pd.DataFrame({
+        'Componente': componentes['Componente'].to_numpy(),
+        'R_Optimo_RS': mejor['RS']['R'],
+        'CTE_RS_Optimo': mejor['RS']['CTE'],
+        'R_Optimo_sS': mejor['sS']['R'],
+        'CTE_sS_Optimo': mejor['sS']['CTE'],
+        f'CTE_RS_R{args.revision}': np.nansum(res['CTE_RS'][:, :, r], axis=1),
+        f'CTE_sS_R{args.revision}': np.nansum(res['CTE_sS'][:, :, r], axis=1),
+        'CTE_Continua': np.nansum(servicio['CTE'], axis=1),
+    })
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, 'revision_periodica.csv')
+    tabla.to_csv(salida, index=False)
+    resumen.to_csv(os.path.join(OUTPUT_DIR, 'revision_periodica_grilla.csv'), index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"REVISIÓN PERIÓDICA (R = {args.revision} semana(s), grilla 1..{grilla[-1]})")
+    print("=" * 70)
+    cols = ['Componente', 'Estacion', 'Stock_Seguridad', 'S_RS', 's_sS', 'S_sS', 'CTE_RS', 'CTE_sS', 'CTE_Continua']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print()
+    print(resumen.to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# SENSIBILIDADES DE INVENTARIO (CONTEXTO COMPARTIDO)
+# --------------------------------------------------
+# Núcleo común de analisis_sensibilidad.py y analisis_sensibilidad_v2.py.
+# ContextoSensibilidad lee una sola vez el pronóstico y las políticas EOQ (base de
+# resultados o CSVs) y memoiza por (componente, estación) los intermedios que usan
+# todos los escenarios: mu_L, sigma_L, k = (ROP - mu_L) / sigma_L y L(k), tanto con
+# el sigma mensual del pronóstico como con la aproximación sigma_L = 15% de la
+# demanda de la estación de la versión v2. Cada escenario (costo de agotamiento
+# ±variación, +15% de sigma, ...) es una transformación vectorizada de esas
+# columnas: agregar uno nuevo no vuelve a leer nada del disco.
+#
+# Modelo Hadley-Whitin para la Política A:
+#   CTE = (K·D)/q + c1·(q/2 + SR - E[x]) + (c2·D/q)·S,   S = sigma_L · L(k)
+#
+# Entradas: pronóstico Prophet y políticas EOQ estacionales (ver eoq_estacional.py)
+# Uso: desde los scripts de análisis,
+#   ctx = ContextoSensibilidad()
+#   agotamiento_costo_unitario(ctx, 0.5, 0.3); riesgo_sigma(ctx, 1.15)
+
+import os
+import sys
+from contextlib import closing
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR,
+                         COSTO_AGOTAMIENTO, normalizar_foco, matriz_demanda)
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+from perdida_normal import perdida
+
+EOQ_DIR = os.path.join('outputs', 'inventory', 'eoq_estacional')
+# Coeficiente de variación de la aproximación v2: sigma_L ~ 15% de la demanda de la estación
+CV_APROXIMADO = 0.15
+
+
+# Utilidades ------------------------------------------------------------------
+
+def _k_y_faltante(rop, mu_L, sigma_L):
+    """k = (ROP - mu_L) / sigma_L y S = sigma_L · L(k); ambos en cero sin sigma_L."""
+    hay_sigma = np.nan_to_num(sigma_L) > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(hay_sigma, (rop - mu_L) / sigma_L, 0.0)
+    L_k = perdida(k)
+    return k, L_k, np.where(hay_sigma, sigma_L * L_k, 0.0)
+
+
+def _por_ciclo(D, Q, x):
+    """(D / Q) · x, en cero si no hay lote."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(Q > 0, (D / Q) * x, 0.0)
+
+
+def _sufijo(factor: float) -> str:
+    return f'up{round((factor - 1) * 100)}'
+
+
+# Contexto --------------------------------------------------------------------
+
+class ContextoSensibilidad:
+    """Entradas e intermedios de los análisis de sensibilidad, cargados una vez."""
+
+    def __init__(self, proj_root: str = project_root, componentes: pd.DataFrame = COMPONENTES):
+        self.proj_root = proj_root
+        self.componentes = componentes
+        self.db_path = os.path.join(proj_root, 'outputs', 'resultados.db')
+
+    @cached_property
+    def pronostico(self) -> pd.DataFrame:
+        from resultados_db import leer_pronostico
+        return leer_pronostico('prophet', os.path.join(self.proj_root, 'outputs', 'forecast', 'prophet',
+                                                       'prophet_forecast.csv'), self.db_path)
+
+    @cached_property
+    def politicas_eoq(self) -> dict:
+        """{(modo, estacion): tabla} de la última corrida EOQ; CSVs si la base no las tiene."""
+        from resultados_db import conectar, cargar_politicas
+        claves = [(modo, estacion) for modo in ('costo', 'servicio') for estacion in ESTACIONES_FIJAS]
+        with closing(conectar(self.db_path)) as con:
+            tablas = {c: cargar_politicas(con, c[0], estacion=c[1]) for c in claves}
+        if all(len(t) for t in tablas.values()):
+            return tablas
+        base = os.path.join(self.proj_root, EOQ_DIR)
+        return {(modo, estacion): pd.read_csv(os.path.join(base, f'eoq_estacional_{estacion.lower()}_{modo}.csv'))
+                for modo, estacion in claves}
+
+    @cached_property
+    def intermedios(self) -> pd.DataFrame:
+        """Una fila por (estación, componente) con las políticas A y B y los intermedios de demanda.
+
+        mu_L y sigma_L salen del pronóstico (sigma mensual de la estación, ddof=0);
+        k y L(k) son los del ROP de la Política A.
+        """
+        comp = self.componentes
+        demanda = matriz_demanda(comp, self.pronostico)
+        meses = pd.to_datetime(self.pronostico['Periodo']).dt.month.to_numpy()
+        politicas = calcular_politicas(demanda, etiquetas_fijas(meses), comp['Costo_Unitario'],
+                                       comp['Lead_Time_Semanas'],
+                                       lead_time_desvio_semanas=comp['Lead_Time_Desvio_Semanas'])
+        sigma_mensual = politicas['servicio']['sigma_mensual']
+        demanda_pronostico = pd.DataFrame({
+            'mu_L': politicas['costo']['ROP'].T.ravel(),          # demanda semanal x L, sin SS
+            'sigma_mensual': sigma_mensual.T.ravel(),
+            'sigma_L': politicas['servicio']['sigma_L'].T.ravel(),
+        })
+
+        filas = []
+        for estacion in ESTACIONES_FIJAS:
+            a = self.politicas_eoq[('costo', estacion)].set_index('Componente')
+            b = self.politicas_eoq[('servicio', estacion)].set_index('Componente')
+            filas.append(pd.DataFrame({
+                'Componente': comp['Componente'].to_numpy(),
+                'Estacion': estacion,
+                'Costo_Unitario': comp['Costo_Unitario'].to_numpy(),
+                'Auto_Foco': comp['Auto_Foco'].map(normalizar_foco).to_numpy(),
+                'Demanda_Estacion': a['Demanda_Estacion'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'EOQ_A': a['EOQ'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'Num_Pedidos_A': a['Num_Pedidos'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'CTE_A': a['CTE'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'ROP_A': a['ROP'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'EOQ_B': b['EOQ'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'SS_B': b['Stock_Seguridad'].reindex(comp['Componente']).to_numpy(dtype=float),
+                'CTE_B': b['CTE'].reindex(comp['Componente']).to_numpy(dtype=float),
+            }))
+        tabla = pd.concat(filas, ignore_index=True)
+        tabla = pd.concat([tabla, demanda_pronostico], axis=1)
+        tabla = tabla[tabla['EOQ_A'].notna()].reset_index(drop=True)
+        tabla['k'], tabla['L_k'], tabla['S_ciclo'] = _k_y_faltante(tabla['ROP_A'].to_numpy(),
+                                                                   tabla['mu_L'].to_numpy(),
+                                                                   tabla['sigma_L'].to_numpy())
+        return tabla
+
+    @cached_property
+    def intermedios_aproximados(self) -> pd.DataFrame:
+        """Intermedios de la versión v2: D anualizada, sigma_L = 15% y mu_L = 50% de la demanda de la estación."""
+        base = self.intermedios
+        D_est = base['Demanda_Estacion'].to_numpy()
+        meses = base['Estacion'].map(lambda e: len(ESTACIONES_FIJAS[e])).to_numpy()
+        sigma_L = D_est * CV_APROXIMADO
+        mu_L = D_est / 2
+        k, L_k, S = _k_y_faltante(base['ROP_A'].to_numpy(), mu_L, sigma_L)
+        return pd.DataFrame({'D_anual': D_est * 12 / meses, 'mu_L': mu_L, 'sigma_L': sigma_L,
+                             'k': k, 'L_k': L_k, 'S_ciclo': S,
+                             'c_mant': TASA_MANTENIMIENTO * base['Costo_Unitario'].to_numpy(dtype=float)})
+
+    def por_componente(self, tabla: pd.DataFrame) -> pd.DataFrame:
+        """Reordena una tabla por estación a orden componente-estación (el de la versión original)."""
+        orden = {c: i for i, c in enumerate(self.componentes['Componente'])}
+        estaciones = {e: i for i, e in enumerate(ESTACIONES_FIJAS)}
+        clave = self.intermedios['Componente'].map(orden) * len(estaciones) + self.intermedios['Estacion'].map(estaciones)
+        return tabla.iloc[np.argsort(clave.to_numpy(), kind='stable')].reset_index(drop=True)
+
+
+# Escenarios con sigma del pronóstico ------------------------------------------
+
+def agotamiento_costo_unitario(ctx: ContextoSensibilidad, rate_agotamiento: float = 0.5,
+                               variacion: float = 0.3) -> pd.DataFrame:
+    """CTE de la Política A con c2 = rate · costo unitario, en la base y a ±variación."""
+    t = ctx.intermedios
+    faltante_anual = _por_ciclo(t['Demanda_Estacion'], t['EOQ_A'], t['S_ciclo'])
+    c_agot_base = rate_agotamiento * t['Costo_Unitario']
+    pct = round(variacion * 100)
+    df = pd.DataFrame({
+        'Componente': t['Componente'], 'Estacion': t['Estacion'], 'Costo_Unitario': t['Costo_Unitario'],
+        'CTE_Base_A': t['CTE_A'], 'ROP_A': t['ROP_A'], 'mu_L': t['mu_L'],
+        'sigma_mensual': t['sigma_mensual'], 'sigma_L': t['sigma_L'], 'k': t['k'],
+        'EOQ': t['EOQ_A'], 'Num_Pedidos': t['Num_Pedidos_A'],
+        'S_esperado_ciclo': t['S_ciclo'], 'Faltante_Anual': faltante_anual,
+        'c_agot_base': c_agot_base,
+        'CTE_A_conAgot_base': t['CTE_A'] + c_agot_base * faltante_anual,
+        f'CTE_A_conAgot_low(-{pct}%)': t['CTE_A'] + ((1 - variacion) * c_agot_base) * faltante_anual,
+        f'CTE_A_conAgot_high(+{pct}%)': t['CTE_A'] + ((1 + variacion) * c_agot_base) * faltante_anual,
+    })
+    df['CTE_A_delta_low'] = df[f'CTE_A_conAgot_low(-{pct}%)'] - df['CTE_Base_A']
+    df['CTE_A_delta_high'] = df[f'CTE_A_conAgot_high(+{pct}%)'] - df['CTE_Base_A']
+    return ctx.por_componente(df)
+
+
+def riesgo_sigma(ctx: ContextoSensibilidad, factor: float = 1.15) -> pd.DataFrame:
+    """Impacto de multiplicar sigma_L por factor: faltante por ciclo de A (ROP fijo) y SS de B."""
+    t = ctx.intermedios
+    suf = _sufijo(factor)
+    hay_sigma = np.nan_to_num(t['sigma_L']) > 0
+    SS_up = factor * t['SS_B']
+    delta_cte_b = (SS_up - t['SS_B']) * (t['Costo_Unitario'] * TASA_MANTENIMIENTO)
+    df = pd.DataFrame({
+        'Componente': t['Componente'], 'Estacion': t['Estacion'],
+        'CTE_A_base': t['CTE_A'], 'ROP_A': t['ROP_A'], 'k_A': t['k'], 'SS_A_base': 0.0,
+        'S_esperado_ciclo_A_base': t['S_ciclo'],
+        f'S_esperado_ciclo_A_{suf}': np.where(hay_sigma, factor * t['sigma_L'] * t['L_k'], 0.0),
+        'CTE_B_base': t['CTE_B'], 'SS_B_base': t['SS_B'], f'SS_B_{suf}': SS_up,
+        'Delta_SS_B': SS_up - t['SS_B'], 'Delta_CTE_B': delta_cte_b,
+        f'CTE_B_{suf}': t['CTE_B'] + delta_cte_b,
+    })
+    return ctx.por_componente(df)
+
+
+# Escenarios con la aproximación v2 (c2 por tipo de auto) ----------------------
+
+def _c2_por_foco(ctx: ContextoSensibilidad, descuentos: dict) -> np.ndarray:
+    return ctx.intermedios['Auto_Foco'].map(descuentos).to_numpy(dtype=float)
+
+
+def agotamiento_por_foco(ctx: ContextoSensibilidad, descuentos: dict = COSTO_AGOTAMIENTO,
+                         variacion: float = 0.3) -> pd.DataFrame:
+    """CTE de la Política A con c2 según el auto del componente, en la base y a ±variación."""
+    t, ap = ctx.intermedios, ctx.intermedios_aproximados
+    Q = t['EOQ_A'].to_numpy()
+    cte_base = (COSTO_ORDENAR * ap['D_anual']) / Q + ap['c_mant'] * (Q / 2)
+    faltante_anual = _por_ciclo(t['Demanda_Estacion'].to_numpy(), Q, ap['S_ciclo'].to_numpy())
+    c2 = pd.Series(_c2_por_foco(ctx, descuentos))
+    escenarios = {'Base': c2, 'Low': (1 - variacion) * c2, 'High': (1 + variacion) * c2}
+    costos = {n: c * faltante_anual for n, c in escenarios.items()}
+    df = pd.DataFrame({
+        'Componente': t['Componente'], 'Estacion': t['Estacion'], 'Auto_Foco': t['Auto_Foco'],
+        'CTE_Base_A': cte_base,
+        **{f'c2_{n}': c for n, c in escenarios.items()},
+        'Faltante_Anual': faltante_anual,
+        **{f'CTE_A_conAgot_{n.lower()}': cte_base + costo for n, costo in costos.items()},
+        **{f'Costo_Agot_{n}': costo for n, costo in costos.items()},
+        'sigma_L': ap['sigma_L'], 'k': ap['k'],
+    })
+    return df
+
+
+def riesgo_sigma_por_foco(ctx: ContextoSensibilidad, descuentos: dict = COSTO_AGOTAMIENTO,
+                          factor: float = 1.15) -> pd.DataFrame:
+    """CTE de A (con agotamiento) y de B con sigma_L y SS multiplicados por factor."""
+    t, ap = ctx.intermedios, ctx.intermedios_aproximados
+    suf = _sufijo(factor)
+    Q_A, Q_B = t['EOQ_A'].to_numpy(), t['EOQ_B'].to_numpy()
+    D_anual, H = ap['D_anual'].to_numpy(), ap['c_mant'].to_numpy()
+    c2 = _c2_por_foco(ctx, descuentos)
+    pedidos_A = (COSTO_ORDENAR * D_anual) / Q_A
+    cte_A = pedidos_A + H * (Q_A / 2)
+    cte_A_agot = cte_A + c2 * _por_ciclo(D_anual, Q_A, ap['S_ciclo'].to_numpy())
+    S_up = np.where(ap['sigma_L'] > 0, (ap['sigma_L'] * factor) * ap['L_k'], 0.0)
+    cte_A_up = cte_A + c2 * _por_ciclo(D_anual, Q_A, S_up)
+    SS_B = t['SS_B'].fillna(0).to_numpy()
+    pedidos_B = (COSTO_ORDENAR * D_anual) / Q_B
+    cte_B = pedidos_B + H * (Q_B / 2 + SS_B)
+    cte_B_up = pedidos_B + H * (Q_B / 2 + SS_B * factor)
+    return pd.DataFrame({
+        'Componente': t['Componente'], 'Estacion': t['Estacion'], 'Auto_Foco': t['Auto_Foco'],
+        'CTE_A_conAgot_base': cte_A_agot, f'CTE_A_conAgot_{suf}': cte_A_up,
+        'Delta_CTE_A': cte_A_up - cte_A_agot,
+        'CTE_B_base': cte_B, f'CTE_B_{suf}': cte_B_up, 'Delta_CTE_B': cte_B_up - cte_B,
+    })
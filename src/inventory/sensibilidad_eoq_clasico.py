@@ -5,11 +5,16 @@
 # para cambios en cantidad de pedido (q' = alpha * q*)
 
 import os
+import sys
 import math
+from contextlib import closing
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+from resultados_db import conectar, registrar_corrida, guardar_sensibilidad
+
 def calcular_lambda(alpha):
     """
     Calcula relacion de sensibilidad: lambda = (1/2)*(alpha + 1/alpha)
@@ -226,6 +231,8 @@ def main():
     # CSV
     csv_path = os.path.join(output_dir, 'sensibilidad_eoq_clasico.csv')
     df.to_csv(csv_path, index=False)
+    with closing(conectar()) as con, con:
+        guardar_sensibilidad(con, registrar_corrida(con, 'sensibilidad_eoq_clasico'), 'eoq_clasico', df)
     
     # Grafico
     graph_path = generar_grafico(df, output_dir)
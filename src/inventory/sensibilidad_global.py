@@ -0,0 +1,260 @@
+# SENSIBILIDAD GLOBAL DEL MODELO EOQ ESTACIONAL
+# ---------------------------------------------
+# En lugar de escenarios elegidos a mano (sensibilidad_eoq_clasico.py), muestrea
+# el espacio conjunto de los parámetros inciertos como multiplicadores sobre su
+# valor nominal:
+#   K (costo de ordenar), tasa de mantenimiento, demanda, lead time, c2 y sigma.
+# Salidas evaluadas por componente (suma de las estaciones, cada una por su
+# fracción del año):
+#   - politica: CTE de la Política B nominal (Q y ROP calculados con los valores
+#               nominales) si los parámetros reales son los muestreados, con el
+#               faltante esperado Hadley-Whitin: K*D/Q + h*(Q/2 + ROP - mu_L) + c2*D*n(ROP)/Q.
+#   - optimo:   CTE de la Política B recalculada con los parámetros muestreados.
+# Índices de Sobol de primer orden (S1) y totales (ST) con el diseño de Saltelli
+# (matrices A, B y A con la columna i de B; estimadores de Saltelli 2010 y
+# Jansen), muestreadas con Sobol o hipercubo latino (scipy.stats.qmc). Además,
+# tornado: cada factor en su extremo con el resto en el nominal.
+# Las evaluaciones van por bloques de escenarios x componentes x estaciones.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/inventory/comparacion/sensibilidad_global.csv
+#          outputs/inventory/comparacion/sensibilidad_global_tornado.png
+#
+# Uso: python src/inventory/sensibilidad_global.py --muestras 131072 --muestreo sobol
+
+import os
+import sys
+import time
+import argparse
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy.stats import qmc
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, Z_ALPHA,
+                         costo_agotamiento, matriz_demanda)
+from estaciones import etiquetas_fijas
+from motor_politicas import calcular_politicas, sigma_lead_time
+from perdida_normal import perdida
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'comparacion')
+
+# Rango de cada factor como multiplicador del valor nominal
+FACTORES = {
+    'K': (0.70, 1.30),
+    'Tasa_Mantenimiento': (0.80, 1.20),
+    'Demanda': (0.85, 1.15),
+    'Lead_Time': (0.80, 1.20),
+    'c2': (0.70, 1.30),
+    'Sigma': (0.85, 1.15),
+}
+SALIDAS = ('politica', 'optimo')
+
+
+# Modelo -----------------------------------------------------------------------
+
+def parametros_nominales(demanda, estacion_mes, componentes: pd.DataFrame) -> dict:
+    """Arreglos (ítems, estaciones) del modelo y la Política B nominal."""
+    politicas = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                   componentes['Lead_Time_Semanas'],
+                                   lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])
+    servicio = politicas['servicio']
+    return {
+        'D_est': servicio['Demanda_Estacion'],
+        'sigma': np.nan_to_num(servicio['sigma_mensual']),
+        'fraccion': np.broadcast_to(politicas['estaciones']['fraccion'], servicio['EOQ'].shape),
+        'semanas': np.broadcast_to(politicas['estaciones']['semanas'], servicio['EOQ'].shape),
+        'C': componentes['Costo_Unitario'].to_numpy(dtype=float)[:, None],
+        'L': componentes['Lead_Time_Semanas'].to_numpy(dtype=float)[:, None],
+        'L_desvio': componentes['Lead_Time_Desvio_Semanas'].to_numpy(dtype=float)[:, None],
+        'c2': costo_agotamiento(componentes)[:, None],
+        'Q': servicio['EOQ'],
+        'ROP': servicio['ROP'],
+    }
+
+
+def evaluar(x: np.ndarray, nom: dict, z: float = Z_ALPHA) -> dict:
+    """CTE por escenario y componente para multiplicadores x (escenarios, factores).
+
+    Opera sobre (escenarios, ítems, estaciones) y suma las estaciones.
+    """
+    m = {f: x[:, j, None, None] for j, f in enumerate(FACTORES)}
+    K = COSTO_ORDENAR * m['K']
+    h = nom['C'] * TASA_MANTENIMIENTO * m['Tasa_Mantenimiento']
+    D_est = nom['D_est'] * m['Demanda']
+    L = nom['L'] * m['Lead_Time']
+    c2 = nom['c2'] * m['c2']
+    f = nom['fraccion']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        D_tasa = np.where(f > 0, D_est / f, 0.0)                     # demanda anualizada
+        d_sem = np.where(nom['semanas'] > 0, D_est / nom['semanas'], 0.0)
+        mu_L = d_sem * L
+        sigma_L = sigma_lead_time(nom['sigma'] * m['Sigma'], d_sem, L, nom['L_desvio'])
+
+        # Política nominal con los parámetros reales
+        Q, ROP = nom['Q'], nom['ROP']
+        k = np.where(sigma_L > 0, (ROP - mu_L) / sigma_L, np.inf)
+        faltante = np.where(sigma_L > 0, sigma_L * perdida(np.minimum(k, 1e6)), 0.0)
+        politica = f * (K * D_tasa / Q + h * (Q / 2 + ROP - mu_L) + c2 * D_tasa * faltante / Q)
+
+        # Política B recalculada: EOQ anual y SS con Z
+        Q_opt = np.sqrt(2 * (D_est.sum(axis=2, keepdims=True)) * K / h)
+        optimo = f * (K * D_tasa / Q_opt + h * (Q_opt / 2 + z * sigma_L) + c2 * D_tasa * sigma_L * perdida(z) / Q_opt)
+    return {'politica': np.nansum(politica, axis=2), 'optimo': np.nansum(optimo, axis=2)}
+
+
+def evaluar_por_bloques(x: np.ndarray, nom: dict, bloque: int) -> dict:
+    """evaluar() sobre bloques de escenarios para acotar la memoria."""
+    partes = [evaluar(x[i:i + bloque], nom) for i in range(0, len(x), bloque)]
+    return {s: np.concatenate([p[s] for p in partes]) for s in SALIDAS}
+
+
+# Muestreo e índices -----------------------------------------------------------
+
+def muestrear(n: int, muestreo: str, semilla: int):
+    """Matrices A y B (n, factores) de multiplicadores, por Sobol o hipercubo latino."""
+    d = len(FACTORES)
+    if muestreo == 'sobol':
+        # Sobol pide potencias de 2: se genera la siguiente y se recorta
+        u = qmc.Sobol(d=2 * d, scramble=True, seed=semilla).random_base2(int(np.ceil(np.log2(n))))[:n]
+    else:
+        u = qmc.LatinHypercube(d=2 * d, seed=semilla).random(n)
+    bajos = np.array([r[0] for r in FACTORES.values()])
+    altos = np.array([r[1] for r in FACTORES.values()])
+    escalar = lambda v: bajos + v * (altos - bajos)
+    return escalar(u[:, :d]), escalar(u[:, d:])
+
+
+def indices_sobol(A: np.ndarray, B: np.ndarray, nom: dict, bloque: int) -> dict:
+    """S1 y ST por salida, ítem y factor.
+
+    Devuelve ({salida: (S1, ST)} con arreglos (ítems, factores), escenarios evaluados).
+    """
+    n, d = A.shape
+    AB = np.repeat(A[None], d, axis=0)
+    AB[np.arange(d), :, np.arange(d)] = B.T                          # A con la columna i de B
+    y = evaluar_por_bloques(np.concatenate([A, B, AB.reshape(-1, d)]), nom, bloque)
+    resultado = {}
+    for salida in SALIDAS:
+        y_A, y_B = y[salida][:n], y[salida][n:2 * n]
+        y_AB = y[salida][2 * n:].reshape(d, n, -1)                  # (factores, n, ítems)
+        var = np.concatenate([y_A, y_B]).var(axis=0)
+        var = np.where(var > 0, var, np.nan)
+        S1 = (y_B[None] * (y_AB - y_A[None])).mean(axis=1) / var     # Saltelli 2010
+        ST = 0.5 * ((y_A[None] - y_AB) ** 2).mean(axis=1) / var      # Jansen
+        resultado[salida] = (S1.T, ST.T)
+    return resultado, len(A) * (d + 2)
+
+
+def tornado(nom: dict) -> dict:
+    """Cambio de la salida con cada factor en su mínimo y en su máximo.
+
+    Devuelve {salida: (bajo, alto, nominal)}; bajo y alto son (ítems, factores).
+    """
+    d = len(FACTORES)
+    x = np.ones((2 * d + 1, d))
+    for j, (bajo, alto) in enumerate(FACTORES.values()):
+        x[1 + 2 * j, j] = bajo
+        x[2 + 2 * j, j] = alto
+    y = evaluar(x, nom)
+    return {s: ((y[s][1::2] - y[s][0]).T, (y[s][2::2] - y[s][0]).T, y[s][0]) for s in SALIDAS}
+
+
+# Script -----------------------------------------------------------------------
+
+def graficar_tornado(tabla: pd.DataFrame, salida: str, path: str):
+    comps = tabla['Componente'].unique()
+    fig, axes = plt.subplots(len(comps), 1, figsize=(10, 2.2 * len(comps)), squeeze=False)
+    fig.suptitle(f'Tornado del CTE ({salida}): cada factor en su rango, resto nominal', fontsize=12)
+    for ax, comp in zip(axes[:, 0], comps):
+        df = tabla[(tabla['Componente'] == comp) & (tabla['Salida'] == salida)].copy()
+        df['Rango'] = (df['Tornado_Alto'] - df['Tornado_Bajo']).abs()
+        df = df.sort_values('Rango')
+        ax.barh(df['Factor'], df['Tornado_Bajo'], color='#2ca02c', alpha=0.8, label='mínimo')
+        ax.barh(df['Factor'], df['Tornado_Alto'], color='#d62728', alpha=0.8, label='máximo')
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.set_title(comp, fontsize=10)
+        ax.grid(axis='x', alpha=0.3)
+    axes[0, 0].legend(fontsize=8)
+    axes[-1, 0].set_xlabel('Cambio en CTE (USD)')
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sensibilidad global (Sobol / tornado) del modelo EOQ estacional')
+    parser.add_argument('--muestras', type=int, default=2 ** 14,
+                        help='Tamaño N de las matrices A y B (se evalúan N x (factores + 2) escenarios)')
+    parser.add_argument('--muestreo', choices=['sobol', 'lhs'], default='sobol')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--bloque', type=int, default=100_000, help='Escenarios por bloque de evaluación')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import conectar, registrar_corrida, guardar_sensibilidad, leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nom = parametros_nominales(demanda, estacion_mes, componentes)
+
+    traza.etapa('muestreo')
+    A, B = muestrear(args.muestras, args.muestreo, args.semilla)
+
+    traza.etapa('evaluacion')
+    t0 = time.perf_counter()
+    sobol, n_escenarios = indices_sobol(A, B, nom, args.bloque)
+    segundos = time.perf_counter() - t0
+    traza.filas(n_escenarios * len(componentes))
+    extremos = tornado(nom)
+
+    traza.etapa('exportacion')
+    filas = []
+    for salida in SALIDAS:
+        S1, ST = sobol[salida]
+        bajo, alto, base = extremos[salida]
+        for i, comp in enumerate(componentes['Componente']):
+            for j, factor in enumerate(FACTORES):
+                filas.append({
+                    'Componente': comp, 'Salida': salida, 'Factor': factor,
+                    'Rango_Min': FACTORES[factor][0], 'Rango_Max': FACTORES[factor][1],
+                    'S1': S1[i, j], 'ST': ST[i, j],
+                    'CTE_Nominal': base[i], 'Tornado_Bajo': bajo[i, j], 'Tornado_Alto': alto[i, j],
+                })
+    tabla = pd.DataFrame(filas)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    csv_path = os.path.join(OUTPUT_DIR, 'sensibilidad_global.csv')
+    tabla.to_csv(csv_path, index=False)
+    png_path = os.path.join(OUTPUT_DIR, 'sensibilidad_global_tornado.png')
+    graficar_tornado(tabla, 'politica', png_path)
+    with closing(conectar()) as con, con:
+        corrida = registrar_corrida(con, 'sensibilidad_global', {'muestras': args.muestras, 'muestreo': args.muestreo,
+                                                                 'semilla': args.semilla, 'factores': FACTORES})
+        guardar_sensibilidad(con, corrida, 'sobol', tabla)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"SENSIBILIDAD GLOBAL ({args.muestreo}): {n_escenarios:,} escenarios x {len(componentes)} componentes "
+          f"en {segundos:.2f} s")
+    print("=" * 70)
+    resumen = tabla[tabla['Salida'] == 'politica'].pivot(index='Componente', columns='Factor', values='ST')
+    print("Índices totales ST (CTE de la política nominal):")
+    print(resumen[list(FACTORES)].to_string(float_format=lambda x: f'{x:.3f}'))
+    print(f"\n[OK] Resultados exportados a: {csv_path}")
+    print(f"[OK] Tornado: {png_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+# SIMULACIÓN MONTE CARLO DE POLÍTICAS (Q, R)
+# ------------------------------------------
+# Valida contra la operación simulada los ROP/SS analíticos de eoq_estacional.py
+# (y, por extensión, los faltantes Hadley-Whitin de analisis_sensibilidad_v2.py).
+# Simulación por períodos (por defecto diarios: 52 semanas x 7) con revisión al
+# cierre de cada período: si la posición de inventario cae a R o menos se piden
+# tantos lotes Q como hagan falta para superarlo (R, nQ). Los faltantes quedan
+# pendientes (backorder) y se cubren con la siguiente llegada. Con períodos
+# semanales el exceso bajo R al revisar (undershoot) se come buena parte del SS,
+# por eso el valor por defecto se acerca a la revisión continua del modelo.
+# Si el componente tiene Lead_Time_Desvio_Semanas > 0, cada pedido sortea su lead
+# time (normal redondeada al período, entre 0 y L + 4 desvíos); los pedidos pueden
+# llegar cruzados.
+# Todas las réplicas y componentes avanzan juntos como arreglos (réplicas x ítems);
+# las réplicas se reparten en bloques de semilla fija, opcionalmente en varios
+# procesos, así el resultado no depende de cuántos procesos se usen.
+#
+# Entradas: tabla de políticas (outputs/inventory/eoq_estacional/tabla_valores_clave.csv),
+#           pronóstico Prophet del mismo origen (outputs/forecast/prophet/prophet_forecast.csv)
+#           y lead times de componentes.py.
+#           Con --trayectorias se usan trayectorias propias (.npy, réplicas x ítems x períodos).
+# Salidas:  outputs/inventory/simulacion/simulacion_qr[_<sufijo>].csv
+#
+# Uso: python src/inventory/simulacion_qr.py --replicas 10000 --procesos 4
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, script_dir)
+
+from componentes import (COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, SEMANAS_POR_MES,
+                         costo_agotamiento, matriz_demanda)
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+
+TABLA_POR_DEFECTO = os.path.join(project_root, 'outputs', 'inventory', 'eoq_estacional', 'tabla_valores_clave.csv')
+PRONOSTICO_POR_DEFECTO = os.path.join(project_root, 'outputs', 'forecast', 'prophet', 'prophet_forecast.csv')
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'inventory', 'simulacion')
+SEMANAS = int(round(12 * SEMANAS_POR_MES))   # 52
+Z_IC = 1.96                                   # intervalos de confianza del 95%
+
+METRICAS = ['Fill_Rate', 'CSL', 'Inventario_Promedio', 'Faltante_Unidades', 'Pedidos',
+            'Costo_Pedidos', 'Costo_Mantener', 'Costo_Faltante', 'Costo_Total']
+
+
+# Preparación ------------------------------------------------------------------
+
+def mes_de_semana(n_semanas: int = SEMANAS) -> np.ndarray:
+    """Índice de mes (0..11, en el orden del pronóstico) al que pertenece cada semana."""
+    return np.minimum((np.arange(n_semanas) / SEMANAS_POR_MES).astype(int), 11)
+
+
+def preparar_escenario(tabla: pd.DataFrame, df_pronostico: pd.DataFrame,
+                       componentes: pd.DataFrame = COMPONENTES, periodos_semana: int = 7) -> dict:
+    """Arreglos por ítem y período a partir de la tabla de políticas y el pronóstico.
+
+    R y Q salen de la fila (componente, estación) de la semana; la demanda semanal
+    media es la del mes del pronóstico / 4.33 y su desvío el sigma mensual de la
+    estación / sqrt(4.33), el mismo supuesto con el que se calcula el SS. Cada
+    semana se parte en 'periodos_semana' períodos iguales (media / n, desvío /
+    sqrt(n), lead time y su desvío x n).
+    """
+    componentes = componentes[componentes['Componente'].isin(tabla['Componente'])].reset_index(drop=True)
+    meses_cal = pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy()
+    estacion_mes = etiquetas_fijas(meses_cal)
+    nombres = list(ESTACIONES_FIJAS)
+    semana_mes = mes_de_semana()
+    estacion_semana = estacion_mes[semana_mes]
+
+    politica = tabla.set_index(['Componente', 'Estacion'])
+    R = np.empty((len(componentes), len(nombres)))
+    Q = np.empty_like(R)
+    for i, comp in enumerate(componentes['Componente']):
+        for k, nombre in enumerate(nombres):
+            R[i, k] = politica.loc[(comp, nombre), 'ROP']
+            Q[i, k] = politica.loc[(comp, nombre), 'EOQ']
+
+    demanda = matriz_demanda(componentes, df_pronostico)
+    sigma_mensual = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                       componentes['Lead_Time_Semanas'])['servicio']['sigma_mensual']
+    sigma_mensual = np.nan_to_num(sigma_mensual)
+    n = periodos_semana
+    semana = np.repeat(np.arange(SEMANAS), n)     # semana de cada período
+    return {
+        'componentes': componentes,
+        'R': R[:, estacion_semana][:, semana],
+        'Q': Q[:, estacion_semana][:, semana],
+        'L': componentes['Lead_Time_Semanas'].to_numpy(dtype=int) * n,
+        'L_desvio': componentes['Lead_Time_Desvio_Semanas'].to_numpy(dtype=float) * n,
+        'mu': (demanda[:, semana_mes] / SEMANAS_POR_MES)[:, semana] / n,
+        'sigma': (sigma_mensual[:, estacion_semana] / np.sqrt(SEMANAS_POR_MES))[:, semana] / np.sqrt(n),
+        'h': componentes['Costo_Unitario'].to_numpy(dtype=float) * TASA_MANTENIMIENTO / (SEMANAS * n),
+        'S': float(COSTO_ORDENAR),
+        'p': costo_agotamiento(componentes),
+        'estacion_semana': estacion_semana,
+    }
+
+
+def generar_demanda(rng, mu: np.ndarray, sigma: np.ndarray, replicas: int) -> np.ndarray:
+    """Trayectorias (réplicas, ítems, períodos) Gamma con la media y el desvío dados.
+
+    Gamma en lugar de Normal para no generar demandas negativas; sin desvío la
+    demanda es la media.
+    """
+    hay_ruido = (sigma > 0) & (mu > 0)
+    forma = np.where(hay_ruido, (mu / np.where(hay_ruido, sigma, 1)) ** 2, 1.0)
+    escala = np.where(hay_ruido, sigma ** 2 / np.where(hay_ruido, mu, 1), 0.0)
+    muestras = rng.gamma(forma, escala, size=(replicas,) + mu.shape)
+    return np.where(hay_ruido, muestras, mu)
+
+
+# Simulación -------------------------------------------------------------------
+
+def simular(demanda: np.ndarray, R: np.ndarray, Q: np.ndarray, L: np.ndarray,
+            h: np.ndarray, S: float, p: np.ndarray, inventario_inicial=None,
+            L_desvio=None, rng=None) -> dict:
+    """Simula la política (R, nQ) con backorders sobre todas las réplicas a la vez.
+
+    demanda: (réplicas, ítems, períodos); R, Q: (ítems, períodos); L: lead time en
+    períodos por ítem; h: costo de mantener por unidad y período; p: costo por unidad
+    faltante. Un pedido hecho al cierre del período t llega al inicio de t + L + 1,
+    así queda expuesto a exactamente L períodos de demanda. Con L_desvio (períodos,
+    por ítem) y rng, cada pedido sortea su propio lead time. Devuelve métricas
+    (réplicas, ítems).
+    """
+    n_rep, n_items, n_per = demanda.shape
+    L = np.maximum(np.asarray(L, dtype=int), 0)
+    L_desvio = np.zeros(n_items) if L_desvio is None else np.asarray(L_desvio, dtype=float)
+    variable = L_desvio > 0
+    if variable.any() and rng is None:
+        raise ValueError('Con lead time variable hace falta un generador (rng)')
+    L_max = L + np.ceil(4 * L_desvio).astype(int)
+    largo = L_max.max() + 2
+    items = np.arange(n_items)
+    replicas = np.arange(n_rep)[:, None]
+
+    neto = np.broadcast_to(R[:, 0] + Q[:, 0] if inventario_inicial is None else inventario_inicial,
+                           (n_rep, n_items)).astype(float).copy()
+    en_camino = np.zeros((n_rep, n_items))
+    llegadas = np.zeros((n_rep, n_items, largo))   # buffer circular por período de llegada
+
+    servido = np.zeros((n_rep, n_items))
+    total = np.zeros((n_rep, n_items))
+    inventario = np.zeros((n_rep, n_items))
+    pedidos = np.zeros((n_rep, n_items))
+    ciclos = np.zeros((n_rep, n_items))
+    ciclos_con_quiebre = np.zeros((n_rep, n_items))
+
+    for t in range(n_per):
+        # 1) Recepción: un ciclo tuvo quiebre si el pedido llega con faltantes pendientes
+        ranura = t % largo
+        llega = llegadas[:, :, ranura]
+        hay_llegada = llega > 0
+        ciclos += hay_llegada
+        ciclos_con_quiebre += hay_llegada & (neto < 0)
+        neto += llega
+        en_camino -= llega
+        llegadas[:, :, ranura] = 0
+
+        # 2) Demanda del período
+        d = demanda[:, :, t]
+        servido += np.minimum(d, np.maximum(neto, 0))
+        total += d
+        neto -= d
+
+        # 3) Revisión: pedir n lotes Q si la posición quedó en R o menos
+        posicion = neto + en_camino
+        faltan = R[:, t] - posicion
+        n_lotes = np.where(faltan >= 0, np.floor(faltan / Q[:, t]) + 1, 0)
+        pedido = n_lotes * Q[:, t]
+        pedidos += n_lotes > 0
+        en_camino += pedido
+        if variable.any():
+            sorteo = np.rint(rng.normal(L, np.where(variable, L_desvio, 1.0), size=(n_rep, n_items)))
+            L_pedido = np.where(variable, np.clip(sorteo, 0, L_max), L).astype(int)
+            llegadas[replicas, items, (t + L_pedido + 1) % largo] += pedido
+        else:
+            llegadas[:, items, (t + L + 1) % largo] += pedido
+
+        inventario += np.maximum(neto, 0)
+
+    faltante = total - servido
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_rate = np.where(total > 0, servido / total, 1.0)
+        csl = np.where(ciclos > 0, 1 - ciclos_con_quiebre / ciclos, np.nan)
+    costo_pedidos = S * pedidos
+    costo_mantener = h * inventario
+    costo_faltante = p * faltante
+    return {
+        'Fill_Rate': fill_rate,
+        'CSL': csl,
+        'Inventario_Promedio': inventario / n_per,
+        'Faltante_Unidades': faltante,
+        'Pedidos': pedidos,
+        'Costo_Pedidos': costo_pedidos,
+        'Costo_Mantener': costo_mantener,
+        'Costo_Faltante': costo_faltante,
+        'Costo_Total': costo_pedidos + costo_mantener + costo_faltante,
+    }
+
+
+def _simular_bloque(args):
+    """Un bloque de réplicas con su propia semilla (unidad de trabajo de cada proceso)."""
+    escenario, semilla, replicas = args
+    rng = np.random.default_rng(semilla)
+    demanda = generar_demanda(rng, escenario['mu'], escenario['sigma'], replicas)
+    return simular(demanda, escenario['R'], escenario['Q'], escenario['L'],
+                   escenario['h'], escenario['S'], escenario['p'],
+                   L_desvio=escenario['L_desvio'], rng=rng)
+
+
+def simular_replicas(escenario: dict, replicas: int, semilla: int = 42, bloque: int = 1000,
+                     procesos: int = 1) -> dict:
+    """Corre las réplicas en bloques de semilla fija y concatena las métricas."""
+    tamanos = [min(bloque, replicas - i) for i in range(0, replicas, bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    livianos = {k: v for k, v in escenario.items() if k != 'componentes'}
+    trabajos = [(livianos, s, n) for s, n in zip(semillas, tamanos)]
+    if procesos > 1 and len(trabajos) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            partes = list(pool.map(_simular_bloque, trabajos))
+    else:
+        partes = [_simular_bloque(t) for t in trabajos]
+    return {m: np.concatenate([parte[m] for parte in partes]) for m in METRICAS}
+
+
+def resumir(metricas: dict, componentes: pd.DataFrame) -> pd.DataFrame:
+    """Media e IC 95% (normal) de cada métrica por componente, más la fila TOTAL de costos."""
+    filas = []
+    nombres = list(componentes['Componente'])
+    for i, comp in enumerate(nombres + ['TOTAL']):
+        fila = {'Componente': comp}
+        for m in METRICAS:
+            if comp == 'TOTAL':
+                if not m.startswith('Costo') and m not in ('Faltante_Unidades', 'Pedidos'):
+                    continue
+                valores = metricas[m].sum(axis=1)
+            else:
+                valores = metricas[m][:, i]
+            valores = valores[~np.isnan(valores)]
+            media = valores.mean() if len(valores) else np.nan
+            semi = Z_IC * valores.std(ddof=1) / np.sqrt(len(valores)) if len(valores) > 1 else np.nan
+            fila[m] = media
+            fila[f'{m}_IC_Inf'] = media - semi
+            fila[f'{m}_IC_Sup'] = media + semi
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+# Script -----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulación Monte Carlo de las políticas (Q, R) de eoq_estacional')
+    parser.add_argument('--tabla', default=TABLA_POR_DEFECTO, help='Tabla de políticas (tabla_valores_clave*.csv)')
+    parser.add_argument('--pronostico', default=PRONOSTICO_POR_DEFECTO,
+                        help='Pronóstico con el que se calculó la tabla (prophet_forecast.csv)')
+    parser.add_argument('--replicas', type=int, default=5000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--bloque', type=int, default=1000, help='Réplicas por bloque de semilla')
+    parser.add_argument('--procesos', type=int, default=1)
+    parser.add_argument('--periodos-semana', type=int, default=7,
+                        help='Períodos de revisión por semana (7 = diario, 1 = semanal)')
+    parser.add_argument('--trayectorias', help='Archivo .npy con demanda (réplicas x ítems x períodos)')
+    parser.add_argument('--sufijo', default='', help='Sufijo del CSV de salida')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+
+    traza.etapa('carga')
+    # Tabla y pronóstico del mismo origen (los CSVs), para que no mezclen corridas
+    tabla = pd.read_csv(args.tabla)
+    df_pronostico = pd.read_csv(args.pronostico)
+    escenario = preparar_escenario(tabla, df_pronostico, periodos_semana=args.periodos_semana)
+    componentes = escenario['componentes']
+
+    traza.etapa('simulacion')
+    if args.trayectorias:
+        demanda = np.load(args.trayectorias)
+        traza.filas(demanda.shape[0] * demanda.shape[1])
+        metricas = simular(demanda, escenario['R'], escenario['Q'], escenario['L'],
+                           escenario['h'], escenario['S'], escenario['p'],
+                           L_desvio=escenario['L_desvio'], rng=np.random.default_rng(args.semilla))
+    else:
+        traza.filas(args.replicas * len(componentes))
+        metricas = simular_replicas(escenario, args.replicas, args.semilla, args.bloque, args.procesos)
+
+    traza.etapa('exportacion')
+    resumen = resumir(metricas, componentes)
+    # Referencias analíticas: CSL objetivo del SS (Z = 1.645) y CTE anual de la tabla
+    analitico = tabla.groupby('Componente', sort=False)['CTE'].sum()
+    resumen['CTE_Analitico'] = resumen['Componente'].map(analitico)
+    resumen.loc[resumen['Componente'] == 'TOTAL', 'CTE_Analitico'] = analitico.sum()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, f'simulacion_qr{"_" + args.sufijo if args.sufijo else ""}.csv')
+    resumen.round(4).to_csv(salida, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"SIMULACIÓN (Q, R): {len(metricas['Fill_Rate'])} réplicas x {len(componentes)} componentes x "
+          f"{SEMANAS} semanas ({args.periodos_semana} períodos por semana)")
+    print("=" * 70)
+    cols = ['Componente', 'Fill_Rate', 'CSL', 'Inventario_Promedio', 'Costo_Total', 'CTE_Analitico']
+    print(resumen[cols].to_string(index=False, float_format=lambda x: f'{x:,.4f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
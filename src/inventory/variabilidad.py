@@ -0,0 +1,140 @@
+# VARIABILIDAD DE LA DEMANDA POR VENTANAS
+# ---------------------------------------
+# CV de Winston (pág. 872-873): CV = Var(d) / E[d]^2, con Var(d) = E[d^2] - E[d]^2.
+# EOQ es razonable en un período si CV < 0.20.
+# CV estándar (análisis XYZ): desvío / media, con ddof = 1 para el desvío muestral.
+#   - Medias y varianzas de cualquier ventana contigua en O(1) con sumas prefijas
+#     de d y d^2 (la serie se centra antes para no perder precisión al restar).
+#   - Ambos CV de todas las ventanas de todos los ítems en un arreglo
+#     (ítems, tamaños, inicios), base de la elección de estaciones.
+#   - Segmentación óptima: mínimo número de períodos contiguos con CV < 0.20,
+#     por programación dinámica, para todos los ítems a la vez.
+# Las funciones aceptan una serie (períodos,) o una matriz (ítems, períodos).
+
+import numpy as np
+
+CV_UMBRAL = 0.20
+MEDIDAS_CV = ('winston', 'estandar')
+
+
+def cv_winston(datos, axis=-1):
+    """CV según Winston sobre el eje dado; inf si la demanda media es <= 0."""
+    datos = np.asarray(datos, dtype=float)
+    d_prom = datos.mean(axis=axis)
+    var_est = (datos ** 2).mean(axis=axis) - d_prom ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(d_prom > 0, var_est / d_prom ** 2, np.inf)[()]
+
+
+def cv_estandar(datos, axis=-1, ddof: int = 0):
+    """Desvío / media sobre el eje dado; inf si la demanda media es <= 0."""
+    datos = np.asarray(datos, dtype=float)
+    d_prom = datos.mean(axis=axis)
+    desvio = datos.std(axis=axis, ddof=ddof)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(d_prom > 0, desvio / d_prom, np.inf)[()]
+
+
+class SumasPrefijas:
+    """Sumas acumuladas de d y d^2 (centradas en la media de cada ítem).
+
+    ventana(i, j) devuelve media y varianza de los períodos [i, j) en O(1);
+    i y j pueden ser enteros o arreglos que se difunden contra los ítems.
+    """
+
+    def __init__(self, demanda):
+        d = np.atleast_2d(np.asarray(demanda, dtype=float))
+        self.n_items, self.n = d.shape
+        self.centro = d.mean(axis=1, keepdims=True)
+        x = d - self.centro
+        ceros = np.zeros((self.n_items, 1))
+        self.s1 = np.concatenate([ceros, np.cumsum(x, axis=1)], axis=1)
+        self.s2 = np.concatenate([ceros, np.cumsum(x ** 2, axis=1)], axis=1)
+
+    def ventana(self, i, j):
+        largo = np.asarray(j) - np.asarray(i)
+        m1 = (self.s1[:, j] - self.s1[:, i]) / largo
+        m2 = (self.s2[:, j] - self.s2[:, i]) / largo
+        var = np.maximum(m2 - m1 ** 2, 0)
+        centro = self.centro.reshape((-1,) + (1,) * np.ndim(j))
+        return centro + m1, var
+
+    def cv(self, i, j):
+        media, var = self.ventana(i, j)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(media > 0, var / media ** 2, np.inf)
+
+    def cv_estandar(self, i, j, ddof: int = 0):
+        media, var = self.ventana(i, j)
+        largo = np.asarray(j) - np.asarray(i)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            desvio = np.sqrt(var * largo / (largo - ddof))
+            return np.where(media > 0, desvio / media, np.inf)
+
+
+def cv_ventanas(demanda, tamanos=None, medida: str = 'winston', ddof: int = 0) -> np.ndarray:
+    """CV de todas las ventanas contiguas: arreglo (ítems, tamaños, inicios).
+
+    tamanos: tamaños de ventana a evaluar (por defecto 2..n). Las posiciones de
+    inicio que no caben quedan en NaN. medida: 'winston' (Var / E[d]^2) o
+    'estandar' (desvío / media, con ddof grados de libertad descontados).
+    """
+    if medida not in MEDIDAS_CV:
+        raise ValueError(f"medida desconocida: {medida!r}")
+    pref = SumasPrefijas(demanda)
+    n = pref.n
+    tamanos = np.arange(2, n + 1) if tamanos is None else np.asarray(tamanos)
+    inicios = np.arange(n)
+    fin = inicios[None, :] + tamanos[:, None]                    # (tamaños, inicios)
+    valida = fin <= n
+    fin_seguro = np.where(valida, fin, inicios[None, :] + 1)      # ventana de relleno
+    inicio = np.broadcast_to(inicios[None, :], fin.shape)
+    if medida == 'winston':
+        cv = pref.cv(inicio, fin_seguro)                          # (ítems, tamaños, inicios)
+    else:
+        cv = pref.cv_estandar(inicio, fin_seguro, ddof)
+    return np.where(valida[None], cv, np.nan)
+
+
+def segmentar(demanda, umbral: float = CV_UMBRAL, min_periodos: int = 2):
+    """Mínimo número de períodos contiguos con CV < umbral, para cada ítem.
+
+    Programación dinámica sobre el fin de cada período: costo[j] = menor cantidad
+    de períodos que cubren [0, j). Entre particiones con igual cantidad se prefiere
+    la de menor suma de CV. Devuelve (n_periodos, etiquetas): n_periodos (ítems,)
+    vale 0 si no hay partición posible, y etiquetas (ítems, períodos) numera los
+    períodos en orden temporal (-1 si no hay partición).
+    """
+    pref = SumasPrefijas(demanda)
+    n_items, n = pref.n_items, pref.n
+    cantidad = np.full((n + 1, n_items), np.inf)
+    suma_cv = np.full((n + 1, n_items), np.inf)
+    desde = np.zeros((n + 1, n_items), dtype=int)
+    cantidad[0] = 0
+    suma_cv[0] = 0
+    for j in range(min_periodos, n + 1):
+        for i in range(0, j - min_periodos + 1):
+            cv = pref.cv(i, j)
+            cand_cant = np.where(cv < umbral, cantidad[i] + 1, np.inf)
+            cand_suma = suma_cv[i] + cv
+            mejor = (cand_cant < cantidad[j]) | ((cand_cant == cantidad[j]) & (cand_suma < suma_cv[j]))
+            mejor &= np.isfinite(cand_cant)
+            cantidad[j] = np.where(mejor, cand_cant, cantidad[j])
+            suma_cv[j] = np.where(mejor, cand_suma, suma_cv[j])
+            desde[j] = np.where(mejor, i, desde[j])
+
+    factible = np.isfinite(cantidad[n])
+    n_periodos = np.where(factible, cantidad[n], 0).astype(int)
+    etiquetas = np.full((n_items, n), -1)
+    items = np.arange(n_items)
+    fin = np.full(n_items, n)
+    restantes = n_periodos.copy()
+    while (restantes > 0).any():
+        activos = restantes > 0
+        inicio = desde[fin, items]
+        posicion = np.arange(n)[None, :]
+        en_tramo = activos[:, None] & (posicion >= inicio[:, None]) & (posicion < fin[:, None])
+        etiquetas = np.where(en_tramo, (restantes - 1)[:, None], etiquetas)
+        fin = np.where(activos, inicio, fin)
+        restantes = restantes - activos
+    return n_periodos, etiquetas
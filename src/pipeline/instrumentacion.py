@@ -0,0 +1,235 @@
+# INSTRUMENTACIÓN DE ETAPAS
+# -------------------------
+# Mide cada etapa de un script (carga, agregacion, ajuste, pronostico, politica,
+# grafico, exportacion) y guarda una traza JSON compatible con Chrome
+# (chrome://tracing o https://ui.perfetto.dev).
+# Por etapa se registra: tiempo de reloj, tiempo de CPU, RSS pico del proceso,
+# filas/series procesadas y filas por segundo.
+#
+# Se activa con variables de entorno (el orquestador las define con --trazar):
+#   IO_TRAZA_DIR=<dir>        directorio donde cada proceso escribe su traza
+#   IO_PERFIL_ETAPA=<etapa>   captura cProfile + tracemalloc para esa etapa
+# Sin IO_TRAZA_DIR todas las llamadas son no-ops.
+#
+# Uso en un script lineal:
+#   from instrumentacion import traza
+#   traza.etapa('carga')      # cierra la etapa anterior y abre 'carga'
+#   df = pd.read_csv(...)
+#   traza.filas(len(df))
+#   traza.etapa('politica')
+#   ...
+# o como context manager:  with traza.medir('ajuste'): ...
+
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_pico_mb():
+    """RSS máximo alcanzado por el proceso hasta ahora (MB), o None si no se puede medir."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KB, macOS bytes
+        return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def rss_actual_mb():
+    """RSS actual del proceso (MB), o None si no se puede medir."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+class Traza:
+    """Registro de etapas de un proceso. Inactiva si directorio es None."""
+
+    def __init__(self, proceso: str, directorio=None, etapa_perfil=None):
+        self.proceso = proceso
+        self.directorio = directorio
+        self.etapa_perfil = etapa_perfil
+        self.activa = directorio is not None
+        self.registros = []
+        self._abierta = None
+        self._perfil = None
+        self._t0 = time.perf_counter()
+        self._epoch_us = time.time() * 1e6
+        if self.activa:
+            atexit.register(self.cerrar)
+
+    @classmethod
+    def desde_entorno(cls):
+        script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0] or 'python'
+        proceso = ' '.join([script] + [a for a in sys.argv[1:] if a])
+        return cls(proceso, os.environ.get('IO_TRAZA_DIR') or None,
+                   os.environ.get('IO_PERFIL_ETAPA') or None)
+
+    # API -----------------------------------------------------------------------
+
+    def etapa(self, nombre: str, **meta):
+        """Cierra la etapa en curso (si hay) y abre una nueva."""
+        if not self.activa:
+            return
+        self._cerrar_etapa()
+        self._abierta = {
+            'nombre': nombre,
+            'meta': meta,
+            'filas': None,
+            'inicio': time.perf_counter(),
+            'cpu_inicio': time.process_time(),
+        }
+        if self.etapa_perfil == nombre:
+            self._iniciar_perfil()
+
+    def filas(self, n):
+        """Registra la cantidad de filas/series procesadas en la etapa en curso."""
+        if self.activa and self._abierta is not None:
+            self._abierta['filas'] = int(n)
+
+    @contextmanager
+    def medir(self, nombre: str, filas=None, **meta):
+        """Context manager equivalente a etapa(nombre) ... fin()."""
+        if not self.activa:
+            yield self
+            return
+        anterior = self._abierta
+        self._abierta = None
+        self.etapa(nombre, **meta)
+        if filas is not None:
+            self.filas(filas)
+        try:
+            yield self
+        finally:
+            self._cerrar_etapa()
+            self._abierta = anterior
+
+    def fin(self):
+        """Cierra la etapa en curso sin abrir otra."""
+        if self.activa:
+            self._cerrar_etapa()
+
+    def cerrar(self):
+        """Cierra la etapa en curso y escribe la traza del proceso."""
+        if not self.activa:
+            return
+        self._cerrar_etapa()
+        os.makedirs(self.directorio, exist_ok=True)
+        path = os.path.join(self.directorio, f'{_nombre_archivo(self.proceso)}_{os.getpid()}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.a_chrome(), f, indent=1, ensure_ascii=False)
+        self.activa = False
+        return path
+
+    # Internos ------------------------------------------------------------------
+
+    def _cerrar_etapa(self):
+        e = self._abierta
+        if e is None:
+            return
+        self._abierta = None
+        fin = time.perf_counter()
+        segundos = fin - e['inicio']
+        registro = {
+            'proceso': self.proceso,
+            'etapa': e['nombre'],
+            'inicio_s': round(e['inicio'] - self._t0, 6),
+            'segundos': round(segundos, 6),
+            'cpu_segundos': round(time.process_time() - e['cpu_inicio'], 6),
+            'rss_pico_mb': _redondear(rss_pico_mb()),
+            'rss_mb': _redondear(rss_actual_mb()),
+            'filas': e['filas'],
+            'filas_por_segundo': round(e['filas'] / segundos, 1) if e['filas'] and segundos > 0 else None,
+        }
+        registro.update(e['meta'])
+        if self._perfil is not None:
+            registro.update(self._detener_perfil(e['nombre']))
+        self.registros.append(registro)
+
+    def _iniciar_perfil(self):
+        tracemalloc.start()
+        perfil = cProfile.Profile()
+        perfil.enable()
+        self._perfil = perfil
+
+    def _detener_perfil(self, nombre):
+        perfil, self._perfil = self._perfil, None
+        perfil.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, pico_tracemalloc = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        base = os.path.join(self.directorio, f'{_nombre_archivo(self.proceso)}_{nombre}')
+        os.makedirs(self.directorio, exist_ok=True)
+        perfil.dump_stats(base + '.prof')
+        with open(base + '_perfil.txt', 'w', encoding='utf-8') as f:
+            pstats.Stats(perfil, stream=f).sort_stats('cumulative').print_stats(30)
+            f.write('\n=== tracemalloc: top 20 asignaciones por línea ===\n')
+            for stat in snapshot.statistics('lineno')[:20]:
+                f.write(f'{stat}\n')
+        return {'perfil': base + '.prof', 'tracemalloc_pico_mb': _redondear(pico_tracemalloc / (1024 * 1024))}
+
+    def a_chrome(self):
+        """Eventos en formato Chrome Trace ('X' = evento completo, tiempos en µs)."""
+        pid = os.getpid()
+        eventos = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                    'args': {'name': self.proceso}}]
+        for r in self.registros:
+            eventos.append({
+                'name': r['etapa'],
+                'cat': self.proceso,
+                'ph': 'X',
+                'pid': pid,
+                'tid': 0,
+                'ts': round(self._epoch_us + r['inicio_s'] * 1e6, 1),
+                'dur': round(r['segundos'] * 1e6, 1),
+                'args': {k: v for k, v in r.items() if k not in ('proceso', 'etapa', 'inicio_s')},
+            })
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms', 'etapas': self.registros}
+
+
+def combinar_trazas(directorio: str, destino: str):
+    """Une las trazas de todos los procesos de una corrida en un único archivo Chrome Trace."""
+    eventos, etapas = [], []
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.endswith('.json'):
+            continue
+        with open(os.path.join(directorio, nombre), encoding='utf-8') as f:
+            datos = json.load(f)
+        eventos.extend(datos.get('traceEvents', []))
+        etapas.extend(datos.get('etapas', []))
+    with open(destino, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms', 'etapas': etapas}, f, indent=1, ensure_ascii=False)
+    return etapas
+
+
+def _nombre_archivo(texto: str) -> str:
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in texto).strip('_')
+
+
+def _redondear(x, n=2):
+    return round(x, n) if x is not None else None
+
+
+# Instancia global usada por los scripts
+traza = Traza.desde_entorno()
@@ -0,0 +1,444 @@
+# ORQUESTADOR DEL PIPELINE
+# ------------------------
+# Ejecuta las etapas del proyecto como un grafo de dependencias (DAG).
+# - Cada etapa declara sus entradas y salidas; las dependencias se deducen
+#   de qué etapa produce cada archivo de entrada.
+# - Una etapa se omite si el hash de su script, argumentos y entradas no
+#   cambió desde la última ejecución y todas sus salidas existen.
+# - Las etapas independientes (p.ej. los 3 pronósticos o los 2 modos EOQ)
+#   se ejecutan en paralelo, cada una en su propio proceso.
+# - Con --trazar, cada etapa registra tiempos, CPU, RSS pico y filas por
+#   subetapa (ver instrumentacion.py) y se genera una traza Chrome por corrida.
+# Uso:     python src/pipeline/orquestador.py [etapa ...] [--forzar] [--jobs N]
+#                 [--trazar] [--perfil ETAPA]
+# Estado:  outputs/pipeline/estado.json
+# Trazas:  outputs/pipeline/trazas/traza_<corrida>.json
+
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from instrumentacion import combinar_trazas
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+ESTADO_PATH = os.path.join(PROJECT_ROOT, 'outputs', 'pipeline', 'estado.json')
+TRAZAS_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'pipeline', 'trazas')
+
+
+@dataclass
+class Etapa:
+    nombre: str
+    script: str
+    args: list = field(default_factory=list)
+    entradas: list = field(default_factory=list)
+    salidas: list = field(default_factory=list)
+
+
+# Definición de etapas -----------------------------------------------------------
+# Rutas relativas a la raíz del proyecto.
+
+EOQ_DIR = 'outputs/inventory/eoq_estacional'
+# Módulos que importa eoq_estacional.py: si cambian, hay que recalcular las políticas
+MOTOR_EOQ = ['src/inventory/componentes.py', 'src/inventory/estaciones.py', 'src/inventory/motor_politicas.py']
+
+ETAPAS = [
+    Etapa('limpiar', 'src/preprocessing/01_limpiar_dataset.py',
+          entradas=['data/sales_data_sample_raw.csv'],
+          salidas=['data/sales_data_sample_clean.csv']),
+    Etapa('ventas_mensuales', 'src/preprocessing/02_generar_ventas_mensuales.py',
+          entradas=['data/sales_data_sample_clean.csv'],
+          salidas=['data/ventaspormes.csv']),
+    Etapa('abc', 'src/analysis/ABC_analysis.py',
+          entradas=['data/sales_data_sample_clean.csv']),
+    Etapa('xyz', 'src/analysis/XYZ_analisis.py',
+          entradas=['data/sales_data_sample_clean.csv', 'src/inventory/variabilidad.py']),
+    Etapa('prophet', 'src/forecast/prophet_forecast.py',
+          entradas=['data/sales_data_sample_clean.csv'],
+          salidas=['outputs/forecast/prophet/prophet_forecast.csv',
+                   'outputs/forecast/prophet/prophet_results.csv']),
+    Etapa('sarima', 'src/forecast/sarima_forecast.py',
+          entradas=['data/sales_data_sample_clean.csv'],
+          salidas=['outputs/forecast/sarima/sarima_forecast.csv',
+                   'outputs/forecast/sarima/sarima_results.csv']),
+    Etapa('winters', 'src/forecast/winters_forecast.py',
+          entradas=['data/sales_data_sample_clean.csv'],
+          salidas=['outputs/forecast/winters/winters_forecast.csv',
+                   'outputs/forecast/winters/winters_results.csv']),
+    Etapa('eoq_costo', 'src/inventory/eoq_estacional.py', ['--modo', 'costo'],
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=[f'{EOQ_DIR}/eoq_estacional_pico_costo.csv',
+                   f'{EOQ_DIR}/eoq_estacional_normal_costo.csv',
+                   f'{EOQ_DIR}/eoq_estacional_resumen_costo.csv']),
+    Etapa('eoq_servicio', 'src/inventory/eoq_estacional.py', ['--modo', 'servicio'],
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=[f'{EOQ_DIR}/eoq_estacional_pico_servicio.csv',
+                   f'{EOQ_DIR}/eoq_estacional_normal_servicio.csv',
+                   f'{EOQ_DIR}/eoq_estacional_resumen_servicio.csv',
+                   f'{EOQ_DIR}/tabla_valores_clave.csv']),
+    Etapa('qr_optimo', 'src/inventory/optimizador_qr.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/perdida_normal.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/qr_optimo.csv']),
+    Etapa('objetivos_servicio', 'src/inventory/objetivos_servicio.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/perdida_normal.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/objetivos_servicio.csv']),
+    Etapa('reposicion_conjunta', 'src/inventory/reposicion_conjunta.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/reposicion_conjunta.csv',
+                   'outputs/inventory/optimizacion/reposicion_conjunta_grupos.csv']),
+    Etapa('lote_dinamico', 'src/inventory/lote_dinamico.py', ['--periodos', 'semanal'],
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/lote_dinamico_semanal.csv',
+                   'outputs/inventory/optimizacion/lote_dinamico_plan_semanal.csv']),
+    Etapa('lead_time_estocastico', 'src/inventory/lead_time_estocastico.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/lead_time/lead_time_estocastico.csv']),
+    Etapa('revision_periodica', 'src/inventory/revision_periodica.py', ['--revision', '1'],
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/revision_periodica/revision_periodica.csv',
+                   'outputs/inventory/revision_periodica/revision_periodica_grilla.csv']),
+    Etapa('newsvendor_pico', 'src/inventory/newsvendor_pico.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/perdida_normal.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/newsvendor_pico.csv']),
+    Etapa('clsp_milp', 'src/inventory/clsp_milp.py', ['--periodos', 'semanal', '--ventana', '12', '--paso', '4'],
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/lote_dinamico.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/optimizacion/clsp_plan_semanal.csv',
+                   'outputs/inventory/optimizacion/clsp_ventanas_semanal.csv']),
+    Etapa('cv_periodos', 'src/inventory/analisis_cv_periodos.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/variabilidad.py',
+                    'src/inventory/componentes.py'],
+          salidas=['outputs/inventory/cv/analisis_cv_periodos.png',
+                   'outputs/inventory/cv/segmentacion_cv.csv']),
+    Etapa('sensibilidad', 'src/inventory/analisis_sensibilidad_v2.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv',
+                    f'{EOQ_DIR}/eoq_estacional_pico_costo.csv',
+                    f'{EOQ_DIR}/eoq_estacional_normal_costo.csv',
+                    f'{EOQ_DIR}/eoq_estacional_pico_servicio.csv',
+                    f'{EOQ_DIR}/eoq_estacional_normal_servicio.csv',
+                    'src/inventory/sensibilidad.py', 'src/inventory/perdida_normal.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/comparacion/sensibilidad_agotamiento_politica_a_v2.csv',
+                   'outputs/inventory/comparacion/riesgo_mas_15_v2.csv']),
+    Etapa('sensibilidad_eoq_clasico', 'src/inventory/sensibilidad_eoq_clasico.py',
+          salidas=['outputs/inventory/comparacion/sensibilidad_eoq_clasico.csv']),
+    Etapa('sensibilidad_global', 'src/inventory/sensibilidad_global.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv', 'src/inventory/perdida_normal.py'] + MOTOR_EOQ,
+          salidas=['outputs/inventory/comparacion/sensibilidad_global.csv']),
+    Etapa('capacidad_almacen', 'src/warehouse/capacidad_minima_almacen.py',
+          entradas=[f'{EOQ_DIR}/tabla_valores_clave.csv'],
+          salidas=['outputs/warehouse/capacidad_minima_almacen.csv',
+                   'outputs/warehouse/capacidad_minima_almacen_totales.csv']),
+    Etapa('lote_restringido', 'src/warehouse/lote_restringido.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/warehouse/lote_restringido.csv',
+                   'outputs/warehouse/lote_restringido_estaciones.csv']),
+    Etapa('ocupacion_temporal', 'src/warehouse/ocupacion_temporal.py',
+          entradas=['outputs/forecast/prophet/prophet_forecast.csv'] + MOTOR_EOQ,
+          salidas=['outputs/warehouse/ocupacion_temporal.csv',
+                   'outputs/warehouse/ocupacion_temporal_diaria.csv']),
+    Etapa('escalonamiento_pedidos', 'src/warehouse/escalonamiento_pedidos.py',
+          entradas=[f'{EOQ_DIR}/tabla_valores_clave.csv', 'outputs/forecast/prophet/prophet_forecast.csv',
+                    'src/warehouse/ocupacion_temporal.py'] + MOTOR_EOQ,
+          salidas=['outputs/warehouse/escalonamiento_pedidos.csv',
+                   'outputs/warehouse/escalonamiento_resumen.csv']),
+]
+
+
+# Grafo -------------------------------------------------------------------------
+
+def construir_dependencias(etapas):
+    """Devuelve {etapa: set(etapas de las que depende)} según entradas/salidas."""
+    productor = {}
+    for e in etapas:
+        for salida in e.salidas:
+            if salida in productor:
+                raise ValueError(f"La salida '{salida}' la producen '{productor[salida]}' y '{e.nombre}'")
+            productor[salida] = e.nombre
+    return {
+        e.nombre: {productor[x] for x in e.entradas if x in productor and productor[x] != e.nombre}
+        for e in etapas
+    }
+
+
+def cerrar_objetivos(objetivos, dependencias):
+    """Agrega a los objetivos todas las etapas de las que dependen (transitivamente)."""
+    pendientes = list(objetivos)
+    seleccion = set()
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre in seleccion:
+            continue
+        seleccion.add(nombre)
+        pendientes.extend(dependencias[nombre])
+    return seleccion
+
+
+def orden_topologico(seleccion, dependencias):
+    """Orden topológico (Kahn); lanza ValueError si hay ciclos."""
+    grado = {n: len(dependencias[n] & seleccion) for n in seleccion}
+    listos = sorted(n for n, g in grado.items() if g == 0)
+    orden = []
+    while listos:
+        n = listos.pop(0)
+        orden.append(n)
+        for m in sorted(seleccion):
+            if n in dependencias[m]:
+                grado[m] -= 1
+                if grado[m] == 0:
+                    listos.append(m)
+    if len(orden) != len(seleccion):
+        raise ValueError('El grafo de etapas tiene ciclos')
+    return orden
+
+
+# Hash de contenido -------------------------------------------------------------
+
+def hash_archivo(path: str, bloque: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(bloque), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_etapa(etapa: Etapa) -> str:
+    """Hash del script, los argumentos y el contenido de todas las entradas."""
+    h = hashlib.sha256()
+    h.update(hash_archivo(os.path.join(PROJECT_ROOT, etapa.script)).encode())
+    h.update(json.dumps(etapa.args).encode())
+    for entrada in etapa.entradas:
+        path = os.path.join(PROJECT_ROOT, entrada)
+        h.update(entrada.encode())
+        h.update(hash_archivo(path).encode() if os.path.exists(path) else b'<faltante>')
+    return h.hexdigest()
+
+
+def cargar_estado():
+    if not os.path.exists(ESTADO_PATH):
+        return {}
+    with open(ESTADO_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_estado(estado):
+    os.makedirs(os.path.dirname(ESTADO_PATH), exist_ok=True)
+    tmp = ESTADO_PATH + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2, sort_keys=True)
+    os.replace(tmp, ESTADO_PATH)
+
+
+def esta_actualizada(etapa: Etapa, estado: dict, hash_actual: str) -> bool:
+    if estado.get(etapa.nombre, {}).get('hash') != hash_actual:
+        return False
+    return all(os.path.exists(os.path.join(PROJECT_ROOT, s)) for s in etapa.salidas)
+
+
+# Ejecución ---------------------------------------------------------------------
+
+def ejecutar_etapa(etapa: Etapa, env_extra=None, raiz=PROJECT_ROOT):
+    """Corre el script de la etapa en un proceso aparte (raiz: copia del proyecto a usar).
+
+    Devuelve un dict con codigo, segundos, cpu_segundos, rss_pico_mb y log.
+    CPU y RSS del hijo se obtienen con os.wait4 (sólo POSIX; None en Windows).
+    """
+    env = dict(os.environ)
+    env.setdefault('MPLBACKEND', 'Agg')  # evita ventanas bloqueantes de plt.show()
+    env.setdefault('PYTHONIOENCODING', 'utf-8')
+    env.update(env_extra or {})
+    cpu, rss = None, None
+    inicio = time.perf_counter()
+    with tempfile.TemporaryFile() as salida:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(raiz, etapa.script), *etapa.args],
+            cwd=raiz, env=env, stdout=salida, stderr=subprocess.STDOUT
+        )
+        if hasattr(os, 'wait4'):
+            _, status, uso = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            cpu = uso.ru_utime + uso.ru_stime
+            rss = uso.ru_maxrss / (1024 * 1024) if sys.platform == 'darwin' else uso.ru_maxrss / 1024
+        else:
+            proc.wait()
+        segundos = time.perf_counter() - inicio
+        salida.seek(0)
+        log = salida.read().decode('utf-8', errors='replace')
+    return {'codigo': proc.returncode, 'segundos': segundos, 'cpu_segundos': cpu,
+            'rss_pico_mb': rss, 'log': log}
+
+
+def ejecutar_pipeline(objetivos=None, forzar=False, jobs=None, simular=False, etapas=ETAPAS,
+                      trazar=False, perfil=None):
+    """Ejecuta las etapas pedidas (y sus dependencias) respetando el DAG.
+
+    Con trazar=True cada proceso escribe su traza y al final se combinan en
+    outputs/pipeline/trazas/traza_<corrida>.json. perfil=<subetapa> activa
+    cProfile + tracemalloc en esa subetapa (p.ej. 'politica').
+    Devuelve {etapa: 'ejecutada' | 'omitida' | 'fallida' | 'bloqueada'}.
+    """
+    por_nombre = {e.nombre: e for e in etapas}
+    dependencias = construir_dependencias(etapas)
+    objetivos = objetivos or list(por_nombre)
+    desconocidas = [o for o in objetivos if o not in por_nombre]
+    if desconocidas:
+        raise SystemExit(f"Etapas desconocidas: {desconocidas}. Disponibles: {list(por_nombre)}")
+    seleccion = cerrar_objetivos(objetivos, dependencias)
+    orden = orden_topologico(seleccion, dependencias)
+
+    estado = cargar_estado()
+    resultado = {}
+    en_curso = {}
+    jobs = jobs or os.cpu_count() or 1
+    # Agrupa en outputs/resultados.db las corridas de esta ejecución
+    env_extra = {'IO_PIPELINE_ID': time.strftime('%Y%m%d_%H%M%S')}
+    corrida_dir, eventos = None, []
+    if trazar or perfil:
+        corrida = env_extra['IO_PIPELINE_ID']
+        corrida_dir = os.path.join(TRAZAS_DIR, corrida)
+        env_extra['IO_TRAZA_DIR'] = corrida_dir
+        if perfil:
+            env_extra['IO_PERFIL_ETAPA'] = perfil
+    t0 = time.time()
+
+    def lista_para_decidir(nombre):
+        return all(resultado.get(d) in ('ejecutada', 'omitida') for d in dependencias[nombre] & seleccion)
+
+    # Carriles de la traza (tid): cada etapa toma uno libre al empezar a correr y lo
+    # devuelve al terminar, así dos etapas solapadas nunca comparten fila.
+    carriles = queue.SimpleQueue()
+    for carril in range(jobs):
+        carriles.put(carril)
+
+    def correr(etapa):
+        carril = carriles.get()
+        inicio = time.time()
+        try:
+            return ejecutar_etapa(etapa, env_extra), carril, inicio
+        finally:
+            carriles.put(carril)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(resultado) < len(orden):
+            for nombre in orden:
+                if nombre in resultado or nombre in en_curso.values():
+                    continue
+                deps = dependencias[nombre] & seleccion
+                if any(resultado.get(d) in ('fallida', 'bloqueada') for d in deps):
+                    resultado[nombre] = 'bloqueada'
+                    print(f"[BLOQUEADA] {nombre}: falló una dependencia")
+                    continue
+                if not lista_para_decidir(nombre):
+                    continue
+                etapa = por_nombre[nombre]
+                h = hash_etapa(etapa)
+                if not forzar and esta_actualizada(etapa, estado, h):
+                    resultado[nombre] = 'omitida'
+                    print(f"[OMITIDA]   {nombre}: entradas sin cambios")
+                    continue
+                if simular:
+                    resultado[nombre] = 'ejecutada'
+                    print(f"[SIMULADA]  {nombre}: {etapa.script} {' '.join(etapa.args)}")
+                    continue
+                print(f"[INICIO]    {nombre}: {etapa.script} {' '.join(etapa.args)}")
+                futuro = pool.submit(correr, etapa)
+                en_curso[futuro] = nombre
+                estado.setdefault(nombre, {})['hash_pendiente'] = h
+
+            if not en_curso:
+                continue
+            terminados, _ = wait(list(en_curso), return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                nombre = en_curso.pop(futuro)
+                r, carril, inicio = futuro.result()
+                info = estado.setdefault(nombre, {})
+                h = info.pop('hash_pendiente', None)
+                eventos.append({'name': nombre, 'cat': 'orquestador', 'ph': 'X', 'pid': os.getpid(),
+                                'tid': carril, 'ts': round(inicio * 1e6, 1),
+                                'dur': round(r['segundos'] * 1e6, 1),
+                                'args': {k: r[k] for k in ('codigo', 'segundos', 'cpu_segundos', 'rss_pico_mb')}})
+                if r['codigo'] == 0:
+                    resultado[nombre] = 'ejecutada'
+                    info.update({'hash': h, 'segundos': round(r['segundos'], 3),
+                                 'fecha': time.strftime('%Y-%m-%d %H:%M:%S')})
+                    print(f"[OK]        {nombre} ({r['segundos']:.1f} s)")
+                else:
+                    resultado[nombre] = 'fallida'
+                    info.pop('hash', None)
+                    print(f"[ERROR]     {nombre} (código {r['codigo']}, {r['segundos']:.1f} s)\n{r['log'][-2000:]}")
+                if not simular:
+                    guardar_estado(estado)
+
+    if corrida_dir and eventos:
+        escribir_traza_corrida(corrida_dir, eventos, t0)
+    return resultado
+
+
+def escribir_traza_corrida(corrida_dir, eventos, t0):
+    """Combina las trazas de los procesos con los eventos del orquestador e imprime un resumen."""
+    os.makedirs(corrida_dir, exist_ok=True)
+    with open(os.path.join(corrida_dir, 'orquestador.json'), 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0,
+                                    'args': {'name': 'orquestador'}}] + eventos}, f, indent=1)
+    destino = os.path.join(TRAZAS_DIR, f'traza_{os.path.basename(corrida_dir)}.json')
+    subetapas = combinar_trazas(corrida_dir, destino)
+    print(f"\n[TRAZA] {destino} (abrir en chrome://tracing o ui.perfetto.dev)")
+    print(f"  {'Etapa':<24} {'Pared (s)':>10} {'CPU (s)':>9} {'RSS pico (MB)':>14}")
+    for ev in sorted(eventos, key=lambda e: -e['dur']):
+        a = ev['args']
+        cpu = f"{a['cpu_segundos']:.2f}" if a['cpu_segundos'] is not None else '-'
+        rss = f"{a['rss_pico_mb']:.0f}" if a['rss_pico_mb'] is not None else '-'
+        print(f"  {ev['name']:<24} {a['segundos']:>10.2f} {cpu:>9} {rss:>14}")
+    if subetapas:
+        print(f"\n  {'Proceso / subetapa':<48} {'Pared (s)':>10} {'Filas/s':>12}")
+        for r in sorted(subetapas, key=lambda r: -r['segundos'])[:15]:
+            fps = f"{r['filas_por_segundo']:,.0f}" if r.get('filas_por_segundo') else '-'
+            print(f"  {(r['proceso'] + ' / ' + r['etapa'])[:48]:<48} {r['segundos']:>10.3f} {fps:>12}")
+
+
+# CLI ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Orquestador del pipeline (DAG incremental y paralelo)')
+    parser.add_argument('etapas', nargs='*', help='Etapas objetivo (por defecto, todas)')
+    parser.add_argument('--forzar', action='store_true', help='Ejecuta aunque las entradas no hayan cambiado')
+    parser.add_argument('--jobs', type=int, default=None, help='Procesos en paralelo (default: núcleos de CPU)')
+    parser.add_argument('--simular', action='store_true', help='Muestra qué se ejecutaría sin ejecutar nada')
+    parser.add_argument('--listar', action='store_true', help='Lista las etapas y sus dependencias')
+    parser.add_argument('--trazar', action='store_true',
+                        help='Registra tiempos/CPU/RSS por subetapa y genera una traza Chrome JSON')
+    parser.add_argument('--perfil', metavar='SUBETAPA', default=None,
+                        help="Captura cProfile + tracemalloc en la subetapa indicada (ej. 'politica')")
+    args = parser.parse_args()
+
+    if args.listar:
+        dependencias = construir_dependencias(ETAPAS)
+        for e in ETAPAS:
+            deps = ', '.join(sorted(dependencias[e.nombre])) or '-'
+            print(f"{e.nombre:<26} <- {deps}")
+        return
+
+    print("=" * 60)
+    print("PIPELINE - INVESTIGACIÓN OPERATIVA")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    resultado = ejecutar_pipeline(args.etapas, forzar=args.forzar, jobs=args.jobs, simular=args.simular,
+                                  trazar=args.trazar, perfil=args.perfil)
+    print("=" * 60)
+    for estado in ('ejecutada', 'omitida', 'fallida', 'bloqueada'):
+        etapas = [n for n, r in resultado.items() if r == estado]
+        if etapas:
+            print(f"  {estado.capitalize():<10} ({len(etapas)}): {', '.join(etapas)}")
+    print(f"  Tiempo total: {time.perf_counter() - inicio:.1f} s")
+    if any(r in ('fallida', 'bloqueada') for r in resultado.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+# ALMACÉN DE RESULTADOS (SQLite)
+# ------------------------------
+# Base local outputs/resultados.db con tablas tipadas para los resultados del
+# pipeline, en lugar de CSVs con filas mezcladas (TOTAL, pies de tabla):
+#   corridas        una fila por ejecución de un script (etapa, parámetros, fecha)
+#   pronosticos     serie x periodo (formato largo) por modelo
+#   politicas       valores clave EOQ por modo, componente y estación
+#   capacidades     inventario máximo y m³ por componente y estación
+#   sensibilidades  métricas de los análisis de sensibilidad (formato largo)
+# Las corridas anteriores no se borran: cada tabla se consulta por corrida_id y,
+# si no se indica, se usa la última corrida que tenga datos para el filtro pedido.
+# Los CSVs se siguen exportando para lectura humana.
+#
+# Uso:
+#   from contextlib import closing
+#   from resultados_db import conectar, registrar_corrida, guardar_politicas, cargar_politicas
+#   with closing(conectar()) as con, con:    # 'con' confirma la transacción, 'closing' cierra
+#       corrida = registrar_corrida(con, 'eoq_estacional', {'modo': 'servicio'})
+#       guardar_politicas(con, corrida, 'servicio', tabla_df)
+#   with closing(conectar()) as con:
+#       politicas = cargar_politicas(con, modo='servicio', estacion='PICO')
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import closing
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+DB_PATH = os.path.join(PROJECT_ROOT, 'outputs', 'resultados.db')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    etapa       TEXT NOT NULL,
+    parametros  TEXT NOT NULL DEFAULT '{}',
+    fecha       TEXT NOT NULL,
+    pipeline    TEXT,
+    origen      TEXT NOT NULL DEFAULT 'script'
+);
+CREATE INDEX IF NOT EXISTS ix_corridas_etapa ON corridas (etapa, parametros);
+
+CREATE TABLE IF NOT EXISTS pronosticos (
+    corrida_id       INTEGER NOT NULL REFERENCES corridas(id),
+    modelo           TEXT NOT NULL,
+    serie            TEXT NOT NULL,
+    periodo          TEXT NOT NULL,
+    valor            REAL NOT NULL,
+    limite_inferior  REAL,
+    limite_superior  REAL,
+    PRIMARY KEY (corrida_id, serie, periodo)
+);
+CREATE INDEX IF NOT EXISTS ix_pronosticos_serie ON pronosticos (modelo, serie, periodo);
+
+CREATE TABLE IF NOT EXISTS politicas (
+    corrida_id         INTEGER NOT NULL REFERENCES corridas(id),
+    modo               TEXT NOT NULL,
+    componente         TEXT NOT NULL,
+    estacion           TEXT NOT NULL,
+    demanda_estacion   REAL,
+    eoq                REAL,
+    num_pedidos        REAL,
+    lead_time_semanas  REAL,
+    rop                REAL,
+    stock_seguridad    REAL,
+    sigma_mensual      REAL,
+    fraccion           REAL,
+    cte                REAL,
+    ct_optimo          REAL,
+    costo_unitario     REAL,
+    PRIMARY KEY (corrida_id, modo, componente, estacion)
+);
+CREATE INDEX IF NOT EXISTS ix_politicas_componente ON politicas (modo, componente, estacion);
+CREATE INDEX IF NOT EXISTS ix_politicas_estacion ON politicas (modo, estacion);
+
+CREATE TABLE IF NOT EXISTS capacidades (
+    corrida_id              INTEGER NOT NULL REFERENCES corridas(id),
+    componente              TEXT NOT NULL,
+    estacion                TEXT NOT NULL,
+    inventario_maximo       REAL,
+    volumen_por_unidad_m3   REAL,
+    capacidad_requerida_m3  REAL,
+    PRIMARY KEY (corrida_id, componente, estacion)
+);
+CREATE INDEX IF NOT EXISTS ix_capacidades_estacion ON capacidades (estacion, componente);
+
+CREATE TABLE IF NOT EXISTS sensibilidades (
+    corrida_id   INTEGER NOT NULL REFERENCES corridas(id),
+    analisis     TEXT NOT NULL,
+    fila         INTEGER NOT NULL,
+    componente   TEXT,
+    estacion     TEXT,
+    metrica      TEXT NOT NULL,
+    valor        REAL,
+    valor_texto  TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_sensibilidades_componente ON sensibilidades (analisis, componente, estacion);
+CREATE INDEX IF NOT EXISTS ix_sensibilidades_corrida ON sensibilidades (corrida_id, analisis);
+"""
+
+# sqlite3 no conoce los enteros de numpy (los float64 sí, son subclase de float)
+for _tipo in (np.int64, np.int32):
+    sqlite3.register_adapter(_tipo, int)
+
+# Columnas de la tabla de valores clave (CSV) -> columnas de `politicas`
+COLUMNAS_POLITICA = {
+    'Componente': 'componente', 'Estacion': 'estacion', 'Demanda_Estacion': 'demanda_estacion',
+    'EOQ': 'eoq', 'Num_Pedidos': 'num_pedidos', 'Lead_Time_Semanas': 'lead_time_semanas',
+    'ROP': 'rop', 'Stock_Seguridad': 'stock_seguridad', 'sigma_mensual': 'sigma_mensual',
+    'fraccion': 'fraccion', 'CTE': 'cte', 'CT_Optimo': 'ct_optimo', 'Costo_Unitario': 'costo_unitario',
+}
+COLUMNAS_CAPACIDAD = {
+    'Componente': 'componente', 'Estacion': 'estacion', 'Inventario_Maximo': 'inventario_maximo',
+    'Volumen_por_Unidad_m3': 'volumen_por_unidad_m3', 'Capacidad_Requerida_m3': 'capacidad_requerida_m3',
+}
+
+
+# Conexión y corridas ------------------------------------------------------------
+
+def conectar(path: str = DB_PATH) -> sqlite3.Connection:
+    """Abre (o crea) la base. WAL permite que varias etapas escriban en paralelo."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    con = sqlite3.connect(path, timeout=60)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA foreign_keys=ON')
+    con.executescript(ESQUEMA)
+    return con
+
+
+def registrar_corrida(con, etapa: str, parametros=None, origen: str = 'script') -> int:
+    """Inserta una corrida y devuelve su id. `pipeline` agrupa las corridas de una misma ejecución del orquestador."""
+    cur = con.execute(
+        'INSERT INTO corridas (etapa, parametros, fecha, pipeline, origen) VALUES (?, ?, ?, ?, ?)',
+        (etapa, json.dumps(parametros or {}, sort_keys=True, ensure_ascii=False),
+         time.strftime('%Y-%m-%d %H:%M:%S'), os.environ.get('IO_PIPELINE_ID'), origen))
+    return cur.lastrowid
+
+
+def listar_corridas(con, etapa=None) -> pd.DataFrame:
+    sql = 'SELECT * FROM corridas' + (' WHERE etapa = ?' if etapa else '') + ' ORDER BY id'
+    return pd.read_sql_query(sql, con, params=(etapa,) if etapa else ())
+
+
+def _ultima_corrida(con, tabla: str, **filtros):
+    """Mayor corrida_id de `tabla` que tenga filas para los filtros dados (columna = valor)."""
+    condiciones = ' AND '.join(f'{col} = ?' for col in filtros) or '1'
+    fila = con.execute(f'SELECT MAX(corrida_id) FROM {tabla} WHERE {condiciones}', tuple(filtros.values())).fetchone()
+    return fila[0]
+
+
+def _consultar(con, tabla: str, columnas: dict, corrida_id=None, **filtros) -> pd.DataFrame:
+    """SELECT de una corrida (la última si corrida_id es None) renombrando a los nombres del CSV."""
+    filtros = {k: v for k, v in filtros.items() if v is not None}
+    if corrida_id is None:
+        corrida_id = _ultima_corrida(con, tabla, **filtros)
+        if corrida_id is None:
+            return pd.DataFrame(columns=list(columnas))
+    filtros['corrida_id'] = corrida_id
+    condiciones = ' AND '.join(f'{col} = ?' for col in filtros)
+    seleccion = ', '.join(f'{col} AS "{nombre}"' for nombre, col in columnas.items())
+    return pd.read_sql_query(f'SELECT {seleccion} FROM {tabla} WHERE {condiciones} ORDER BY rowid',
+                             con, params=tuple(filtros.values()))
+
+
+# Pronósticos --------------------------------------------------------------------
+
+def guardar_pronostico(con, corrida_id: int, modelo: str, df: pd.DataFrame, series=None):
+    """Guarda un pronóstico con columnas Periodo + una columna por serie.
+
+    Limite_Inferior / Limite_Superior, si existen, se asocian a la serie 'Pronostico'.
+    Filas cuyo Periodo no es una fecha (p.ej. 'TOTAL') se descartan.
+    """
+    periodos = pd.to_datetime(df['Periodo'], errors='coerce')
+    df = df[periodos.notnull()]
+    periodos = periodos[periodos.notnull()].dt.strftime('%Y-%m-%d')
+    series = series or [c for c in df.columns if c not in ('Periodo', 'Limite_Inferior', 'Limite_Superior')]
+    filas = []
+    for serie in series:
+        tiene_limites = serie == 'Pronostico' and 'Limite_Inferior' in df
+        for i, periodo in enumerate(periodos):
+            filas.append((corrida_id, modelo, serie, periodo, float(df[serie].iloc[i]),
+                          float(df['Limite_Inferior'].iloc[i]) if tiene_limites else None,
+                          float(df['Limite_Superior'].iloc[i]) if tiene_limites else None))
+    con.executemany('INSERT INTO pronosticos VALUES (?, ?, ?, ?, ?, ?, ?)', filas)
+
+
+def cargar_pronostico(con, modelo: str = 'prophet', corrida_id=None) -> pd.DataFrame:
+    """Pronóstico en formato ancho (Periodo, Pronostico, Limite_Inferior, Limite_Superior, <series>)."""
+    if corrida_id is None:
+        corrida_id = _ultima_corrida(con, 'pronosticos', modelo=modelo)
+        if corrida_id is None:
+            return pd.DataFrame(columns=['Periodo'])
+    largo = pd.read_sql_query(
+        'SELECT serie, periodo, valor, limite_inferior, limite_superior FROM pronosticos '
+        'WHERE corrida_id = ? AND modelo = ? ORDER BY periodo, rowid', con, params=(corrida_id, modelo))
+    ancho = largo.pivot(index='periodo', columns='serie', values='valor')
+    orden = ['Pronostico'] + [s for s in dict.fromkeys(largo['serie']) if s != 'Pronostico']
+    ancho = ancho[[s for s in orden if s in ancho.columns]]
+    limites = largo[largo['serie'] == 'Pronostico'].set_index('periodo')
+    if limites['limite_inferior'].notnull().any():
+        ancho.insert(1, 'Limite_Inferior', limites['limite_inferior'])
+        ancho.insert(2, 'Limite_Superior', limites['limite_superior'])
+    ancho = ancho.reset_index().rename(columns={'periodo': 'Periodo'})
+    ancho.columns.name = None
+    return ancho
+
+
+def _huella(path: str) -> str:
+    """sha256 del contenido de un archivo (la misma huella que usa el orquestador)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def leer_pronostico(modelo: str = 'prophet', csv_path=None, path: str = DB_PATH) -> pd.DataFrame:
+    """Último pronóstico del modelo.
+
+    Sin csv_path (o si el CSV no existe) se lee la última corrida de la base. Con
+    csv_path, el CSV manda: la última corrida se usa solo si se importó de ese
+    mismo contenido (sha256 en sus parámetros); si no, el CSV se vuelve a importar.
+    Así un CSV regenerado o editado nunca queda tapado por una copia vieja.
+    """
+    with closing(conectar(path)) as con:
+        corrida = _ultima_corrida(con, 'pronosticos', modelo=modelo)
+        if csv_path is None or not os.path.exists(csv_path):
+            if corrida is None and csv_path is not None:
+                raise FileNotFoundError(csv_path)
+            return cargar_pronostico(con, modelo, corrida)
+        huella = _huella(csv_path)
+        if corrida is not None:
+            parametros = con.execute('SELECT parametros FROM corridas WHERE id = ?', (corrida,)).fetchone()[0]
+            if json.loads(parametros).get('sha256') == huella:
+                return cargar_pronostico(con, modelo, corrida)
+        with con:
+            corrida = registrar_corrida(con, modelo, {'csv': os.path.relpath(csv_path, PROJECT_ROOT),
+                                                      'sha256': huella}, origen='csv')
+            guardar_pronostico(con, corrida, modelo, pd.read_csv(csv_path))
+        return cargar_pronostico(con, modelo, corrida)
+
+
+# Políticas y capacidades --------------------------------------------------------
+
+def guardar_politicas(con, corrida_id: int, modo: str, df: pd.DataFrame):
+    """Guarda la tabla de valores clave EOQ (columnas como en tabla_valores_clave.csv)."""
+    cols = [c for c in COLUMNAS_POLITICA if c in df.columns]
+    destino = ', '.join(['corrida_id', 'modo'] + [COLUMNAS_POLITICA[c] for c in cols])
+    marcas = ', '.join('?' * (len(cols) + 2))
+    con.executemany(f'INSERT INTO politicas ({destino}) VALUES ({marcas})',
+                    [(corrida_id, modo, *fila) for fila in df[cols].itertuples(index=False)])
+
+
+def cargar_politicas(con, modo: str = 'servicio', corrida_id=None, componente=None, estacion=None) -> pd.DataFrame:
+    return _consultar(con, 'politicas', COLUMNAS_POLITICA, corrida_id,
+                      modo=modo, componente=componente, estacion=estacion)
+
+
+def guardar_capacidades(con, corrida_id: int, df: pd.DataFrame):
+    cols = list(COLUMNAS_CAPACIDAD)
+    destino = ', '.join(['corrida_id'] + [COLUMNAS_CAPACIDAD[c] for c in cols])
+    marcas = ', '.join('?' * (len(cols) + 1))
+    con.executemany(f'INSERT INTO capacidades ({destino}) VALUES ({marcas})',
+                    [(corrida_id, *fila) for fila in df[cols].itertuples(index=False)])
+
+
+def cargar_capacidades(con, corrida_id=None, estacion=None) -> pd.DataFrame:
+    return _consultar(con, 'capacidades', COLUMNAS_CAPACIDAD, corrida_id, estacion=estacion)
+
+
+def totales_capacidad(con, corrida_id=None) -> pd.DataFrame:
+    """Suma de inventario máximo y m³ por estación (reemplaza los pies de tabla del CSV)."""
+    if corrida_id is None:
+        corrida_id = _ultima_corrida(con, 'capacidades')
+    return pd.read_sql_query(
+        'SELECT estacion AS Estacion, SUM(inventario_maximo) AS Inventario_Maximo, '
+        'SUM(capacidad_requerida_m3) AS Capacidad_Requerida_m3 FROM capacidades '
+        'WHERE corrida_id = ? GROUP BY estacion ORDER BY Capacidad_Requerida_m3 DESC', con, params=(corrida_id,))
+
+
+# Sensibilidades -----------------------------------------------------------------
+
+def guardar_sensibilidad(con, corrida_id: int, analisis: str, df: pd.DataFrame):
+    """Guarda un DataFrame de sensibilidad en formato largo (una fila por celda).
+
+    Componente y Estacion, si existen, quedan como columnas indexadas; el resto
+    como (metrica, valor) o (metrica, valor_texto) si no es numérica.
+    """
+    claves = [c for c in ('Componente', 'Estacion') if c in df.columns]
+    metricas = [c for c in df.columns if c not in claves]
+    filas = []
+    for i, fila in enumerate(df.itertuples(index=False)):
+        registro = dict(zip(df.columns, fila))
+        comp = registro.get('Componente')
+        est = registro.get('Estacion')
+        for m in metricas:
+            v = registro[m]
+            numerico = pd.api.types.is_number(v) and not isinstance(v, (bool, np.bool_))
+            filas.append((corrida_id, analisis, i, comp, est, m,
+                          float(v) if numerico else None, None if numerico else str(v)))
+    con.executemany('INSERT INTO sensibilidades VALUES (?, ?, ?, ?, ?, ?, ?, ?)', filas)
+
+
+def cargar_sensibilidad(con, analisis: str, corrida_id=None, componente=None, estacion=None) -> pd.DataFrame:
+    """Reconstruye el DataFrame ancho de un análisis de sensibilidad."""
+    filtros = {k: v for k, v in {'componente': componente, 'estacion': estacion}.items() if v is not None}
+    if corrida_id is None:
+        corrida_id = _ultima_corrida(con, 'sensibilidades', analisis=analisis, **filtros)
+        if corrida_id is None:
+            return pd.DataFrame()
+    condiciones = ''.join(f' AND {col} = ?' for col in filtros)
+    largo = pd.read_sql_query(
+        'SELECT fila, componente, estacion, metrica, COALESCE(valor, valor_texto) AS valor '
+        f'FROM sensibilidades WHERE corrida_id = ? AND analisis = ?{condiciones} ORDER BY fila, rowid',
+        con, params=(corrida_id, analisis, *filtros.values()))
+    metricas = list(dict.fromkeys(largo['metrica']))
+    claves = ['fila'] + [c for c in ('componente', 'estacion') if largo[c].notnull().any()]
+    ancho = largo.pivot(index=claves, columns='metrica', values='valor')
+    ancho = ancho[metricas].reset_index().drop(columns='fila')
+    ancho.columns.name = None
+    return ancho.rename(columns={'componente': 'Componente', 'estacion': 'Estacion'})
@@ -8,6 +8,7 @@ Entrada: data/sales_data_sample_raw.csv (original sin filtrar)
 Salida:  data/sales_data_sample_clean.csv (limpio y filtrado)
 """
 import os
+import sys
 import pandas as pd
 
 
@@ -18,6 +19,9 @@ DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 RAW_PATH = os.path.join(DATA_DIR, 'sales_data_sample_raw.csv')
 CLEAN_PATH = os.path.join(DATA_DIR, 'sales_data_sample_clean.csv')
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'pipeline'))
+from instrumentacion import traza
+
 
 def main():
     """Lee el CSV original, filtra por STATUS 'Shipped' y PRODUCTLINE 'Classic Cars' o 'Vintage Cars', y guarda el resultado."""
@@ -25,6 +29,7 @@ def main():
     print("LIMPIEZA DEL DATASET")
     print("="*60)
     
+    traza.etapa('carga')
     try:
         df = pd.read_csv(RAW_PATH, encoding='latin-1')
         print(f"\nArchivo cargado: {RAW_PATH}")
@@ -32,6 +37,8 @@ def main():
     except FileNotFoundError:
         raise SystemExit(f"Archivo no encontrado: {RAW_PATH}\n\nAsegurate de tener sales_data_sample_raw.csv en data/")
 
+    traza.etapa('filtrado')
+    traza.filas(len(df))
     # Filtrar filas con STATUS == 'Shipped'
     df_filtered = df[df['STATUS'] == 'Shipped']
     print(f"Despues de filtrar STATUS='Shipped': {len(df_filtered)}")
@@ -41,11 +48,14 @@ def main():
     df_filtered = df_filtered[df_filtered['PRODUCTLINE'].isin(allowed)]
     print(f"Despues de filtrar PRODUCTLINE (Classic/Vintage): {len(df_filtered)}")
 
+    traza.etapa('exportacion')
+    traza.filas(len(df_filtered))
     # Guardar el dataset limpio
     df_filtered.to_csv(CLEAN_PATH, index=False)
     
     print(f"\nDataset limpio guardado en: {CLEAN_PATH}")
     print(f"Total de registros finales: {len(df_filtered)}")
+    traza.fin()
     print("="*60)
 
 
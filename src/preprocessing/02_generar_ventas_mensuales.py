@@ -7,6 +7,7 @@ Entrada: data/sales_data_sample_clean.csv
 Salida:  data/ventaspormes.csv
 """
 import os
+import sys
 import pandas as pd
 
 # === Configuración de rutas ===
@@ -14,14 +15,21 @@ SCRIPT_DIR = os.path.dirname(__file__) or os.getcwd()
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src', 'pipeline'))
+from instrumentacion import traza
+
 filename = 'sales_data_sample_clean.csv'
 file_path = os.path.join(DATA_DIR, filename)
 
 if not os.path.exists(file_path):
     raise SystemExit(f"Archivo no encontrado: {file_path}\n\nAsegurate de ejecutar primero 01_limpiar_dataset.py")
 
+traza.etapa('carga')
 df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
+traza.filas(len(df))
 
+traza.etapa('agregacion')
+traza.filas(len(df))
 # === Preparar columnas de fecha ===
 df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'], errors='coerce')
 df = df.dropna(subset=['ORDERDATE'])
@@ -51,9 +59,12 @@ result = counts.reset_index().rename(columns={'index': 'Periodo'})
 result.insert(0, 'Mes', range(1, len(result) + 1))
 result = result[['Mes', 'Classic Cars', 'Vintage Cars']]
 
+traza.etapa('exportacion')
+traza.filas(len(result))
 # Guardar CSV
 output_path = os.path.join(DATA_DIR, 'ventaspormes.csv')
 result.to_csv(output_path, index=False)
+traza.fin()
 
 # Salida mínima
 print(f"CSV generado: {output_path}")
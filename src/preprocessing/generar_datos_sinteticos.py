@@ -0,0 +1,290 @@
+"""
+generar_datos_sinteticos.py
+===========================
+Generador de líneas de pedido sintéticas con el mismo esquema que
+data/sales_data_sample_raw.csv, para pruebas de carga del pipeline.
+
+Parámetros configurables: cantidad de filas, SKUs, clientes y meses, intensidad
+de los picos de octubre-noviembre, intermitencia (probabilidad de que un SKU no
+venda en un mes) y líneas por pedido. La salida se escribe por bloques (CSV o
+Parquet), de modo que el uso de memoria no depende del total de filas.
+Con la misma semilla y los mismos parámetros el archivo generado es idéntico.
+
+Uso:
+    python src/preprocessing/generar_datos_sinteticos.py --filas 1000000
+    python src/preprocessing/generar_datos_sinteticos.py --filas 200000000 --salida data/sintetico/ventas.parquet
+
+Salida por defecto: data/sintetico/sales_data_sample_synth.csv
+Parquet requiere pyarrow (opcional).
+"""
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# === Configuración de rutas ===
+SCRIPT_DIR = os.path.dirname(__file__) or os.getcwd()
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+SALIDA_DEFECTO = os.path.join(PROJECT_ROOT, 'data', 'sintetico', 'sales_data_sample_synth.csv')
+
+COLUMNAS = [
+    'ORDERNUMBER', 'QUANTITYORDERED', 'PRICEEACH', 'ORDERLINENUMBER', 'SALES', 'ORDERDATE',
+    'STATUS', 'QTR_ID', 'MONTH_ID', 'YEAR_ID', 'PRODUCTLINE', 'MSRP', 'PRODUCTCODE',
+    'CUSTOMERNAME', 'PHONE', 'ADDRESSLINE1', 'ADDRESSLINE2', 'CITY', 'STATE', 'POSTALCODE',
+    'COUNTRY', 'TERRITORY', 'CONTACTLASTNAME', 'CONTACTFIRSTNAME', 'DEALSIZE',
+]
+
+# === Distribuciones tomadas del archivo original ===
+# Línea de producto: (proporción de SKUs, MSRP mínimo, MSRP máximo)
+LINEAS_PRODUCTO = {
+    'Classic Cars': (0.34, 35, 214),
+    'Vintage Cars': (0.22, 33, 170),
+    'Motorcycles': (0.12, 40, 193),
+    'Planes': (0.11, 49, 157),
+    'Trucks and Buses': (0.10, 54, 136),
+    'Ships': (0.08, 54, 122),
+    'Trains': (0.03, 58, 100),
+}
+PREFIJOS_CODIGO = ['S10', 'S12', 'S18', 'S24', 'S32', 'S50', 'S700', 'S72']
+
+ESTADOS = ['Shipped', 'Cancelled', 'Resolved', 'On Hold', 'In Process', 'Disputed']
+PROB_ESTADOS = [0.927, 0.021, 0.017, 0.016, 0.014, 0.005]
+
+# País: (peso, territorio, ciudad, estado/provincia)
+PAISES = {
+    'USA': (0.36, 'NA', 'NYC', 'NY'),
+    'Spain': (0.12, 'EMEA', 'Madrid', ''),
+    'France': (0.11, 'EMEA', 'Paris', ''),
+    'Australia': (0.06, 'APAC', 'Melbourne', 'Victoria'),
+    'UK': (0.05, 'EMEA', 'London', ''),
+    'Italy': (0.04, 'EMEA', 'Torino', ''),
+    'Finland': (0.03, 'EMEA', 'Helsinki', ''),
+    'Norway': (0.03, 'EMEA', 'Oslo', ''),
+    'Singapore': (0.03, 'Japan', 'Singapore', ''),
+    'Canada': (0.03, 'NA', 'Vancouver', 'BC'),
+    'Denmark': (0.02, 'EMEA', 'Kobenhavn', ''),
+    'Germany': (0.02, 'EMEA', 'Frankfurt', ''),
+    'Sweden': (0.02, 'EMEA', 'Boras', ''),
+    'Austria': (0.02, 'EMEA', 'Graz', ''),
+    'Japan': (0.02, 'Japan', 'Tokyo', 'Tokyo'),
+    'Belgium': (0.01, 'EMEA', 'Bruxelles', ''),
+    'Switzerland': (0.01, 'EMEA', 'Geneve', ''),
+    'Philippines': (0.01, 'Japan', 'Makati City', ''),
+    'Ireland': (0.01, 'EMEA', 'Dublin', ''),
+}
+APELLIDOS = ['Brown', 'Frick', 'Yu', 'Young', 'Freyre', 'Henriot', 'Ashworth', 'Pipps', 'Moroni', 'Cruz']
+NOMBRES = ['Julie', 'Michael', 'Kwai', 'Diego', 'Paul', 'Victoria', 'Georg', 'Maria', 'Leslie', 'Juri']
+
+# Factor estacional por mes (1 = mes promedio) observado en el dataset original
+FACTORES_MES = np.array([1.0, 1.0, 0.95, 0.8, 1.0, 0.7, 0.7, 0.85, 0.8, 1.65, 3.1, 0.9])
+
+ORDEN_INICIAL = 10100
+CANTIDAD_MEDIA, CANTIDAD_DESVIO, CANTIDAD_MIN = 35, 10, 6
+
+
+# === Catálogos ===
+
+def crear_catalogo_skus(rng, n_skus: int) -> pd.DataFrame:
+    """SKUs con línea de producto, código y MSRP. Popularidad ~ Gamma(2) (la mayoría vende parecido)."""
+    lineas = list(LINEAS_PRODUCTO)
+    props = np.array([LINEAS_PRODUCTO[l][0] for l in lineas])
+    idx_linea = rng.choice(len(lineas), size=n_skus, p=props / props.sum())
+    msrp_min = np.array([LINEAS_PRODUCTO[l][1] for l in lineas])[idx_linea]
+    msrp_max = np.array([LINEAS_PRODUCTO[l][2] for l in lineas])[idx_linea]
+    prefijos = rng.choice(PREFIJOS_CODIGO, size=n_skus)
+    return pd.DataFrame({
+        'PRODUCTLINE': np.array(lineas, dtype=object)[idx_linea],
+        'PRODUCTCODE': [f'{p}_{1000 + i}' for i, p in enumerate(prefijos)],
+        'MSRP': rng.integers(msrp_min, msrp_max + 1),
+        'popularidad': rng.gamma(2.0, 1.0, size=n_skus),
+    })
+
+
+def crear_catalogo_clientes(rng, n_clientes: int) -> pd.DataFrame:
+    """Clientes con país, territorio, dirección y contacto (textos ASCII, como el original en latin-1)."""
+    paises = list(PAISES)
+    pesos = np.array([PAISES[p][0] for p in paises])
+    idx_pais = rng.choice(len(paises), size=n_clientes, p=pesos / pesos.sum())
+    ids = np.arange(1, n_clientes + 1)
+    return pd.DataFrame({
+        'CUSTOMERNAME': [f'Synthetic Collectables {i:05d}' for i in ids],
+        'PHONE': [f'555-{n:07d}' for n in rng.integers(0, 10**7, size=n_clientes)],
+        'ADDRESSLINE1': [f'{n} Synthetic Street' for n in rng.integers(1, 9999, size=n_clientes)],
+        'ADDRESSLINE2': '',
+        'CITY': [PAISES[paises[i]][2] for i in idx_pais],
+        'STATE': [PAISES[paises[i]][3] for i in idx_pais],
+        'POSTALCODE': [f'{n:05d}' for n in rng.integers(1000, 99999, size=n_clientes)],
+        'COUNTRY': np.array(paises, dtype=object)[idx_pais],
+        'TERRITORY': [PAISES[paises[i]][1] for i in idx_pais],
+        'CONTACTLASTNAME': rng.choice(APELLIDOS, size=n_clientes),
+        'CONTACTFIRSTNAME': rng.choice(NOMBRES, size=n_clientes),
+    })
+
+
+# === Generación ===
+
+def filas_por_mes(rng, filas: int, meses: int, mes_inicial: int, estacionalidad: float) -> np.ndarray:
+    """Reparte el total de filas entre los meses según los factores estacionales (multinomial)."""
+    meses_calendario = (mes_inicial - 1 + np.arange(meses)) % 12
+    factores = 1.0 + estacionalidad * (FACTORES_MES[meses_calendario] - 1.0)
+    factores = np.clip(factores, 0.05, None)
+    return rng.multinomial(filas, factores / factores.sum())
+
+
+def generar_bloque(rng, n: int, anio: int, mes: int, skus: pd.DataFrame, clientes: pd.DataFrame,
+                   activos: np.ndarray, orden_inicial: int, max_lineas: int):
+    """Genera n líneas de pedido de un mes. Devuelve (DataFrame, próximo número de orden)."""
+    # Pedidos: tamaños 1..max_lineas hasta cubrir n líneas
+    tamanios = rng.integers(1, max_lineas + 1, size=n // max(1, (max_lineas + 1) // 2) + 2)
+    while tamanios.sum() < n:
+        tamanios = np.concatenate([tamanios, rng.integers(1, max_lineas + 1, size=len(tamanios))])
+    fin = np.cumsum(tamanios)
+    n_pedidos = int(np.searchsorted(fin, n) + 1)
+    tamanios = tamanios[:n_pedidos].copy()
+    tamanios[-1] -= fin[n_pedidos - 1] - n
+    inicio = np.concatenate([[0], np.cumsum(tamanios)[:-1]])
+
+    pedido = np.repeat(np.arange(n_pedidos), tamanios)
+    linea = np.arange(n) - np.repeat(inicio, tamanios) + 1
+
+    # Atributos a nivel pedido: cliente, día, estado
+    dias_mes = pd.Period(year=anio, month=mes, freq='M').days_in_month
+    cliente_pedido = rng.integers(0, len(clientes), size=n_pedidos)
+    dia_pedido = rng.integers(1, dias_mes + 1, size=n_pedidos)
+    estado_pedido = rng.choice(len(ESTADOS), size=n_pedidos, p=PROB_ESTADOS)
+    fechas = np.array([f'{mes}/{d}/{anio} 0:00' for d in range(1, dias_mes + 1)], dtype=object)
+
+    # Atributos a nivel línea: SKU (solo los activos en el mes), cantidad y precio
+    pesos = skus['popularidad'].to_numpy() * activos
+    sku = rng.choice(len(skus), size=n, p=pesos / pesos.sum())
+    cantidad = np.maximum(CANTIDAD_MIN, np.rint(rng.normal(CANTIDAD_MEDIA, CANTIDAD_DESVIO, size=n))).astype(np.int64)
+    msrp = skus['MSRP'].to_numpy()[sku]
+    precio = np.round(msrp * rng.uniform(0.75, 1.15, size=n), 2)
+    ventas = np.round(cantidad * precio, 2)
+
+    cli = clientes.iloc[cliente_pedido[pedido]].reset_index(drop=True)
+    df = pd.DataFrame({
+        'ORDERNUMBER': orden_inicial + pedido,
+        'QUANTITYORDERED': cantidad,
+        # En el archivo original PRICEEACH está truncado en 100; SALES usa el precio real
+        'PRICEEACH': np.minimum(precio, 100.0),
+        'ORDERLINENUMBER': linea,
+        'SALES': ventas,
+        'ORDERDATE': fechas[dia_pedido[pedido] - 1],
+        'STATUS': np.array(ESTADOS, dtype=object)[estado_pedido[pedido]],
+        'QTR_ID': (mes - 1) // 3 + 1,
+        'MONTH_ID': mes,
+        'YEAR_ID': anio,
+        'PRODUCTLINE': skus['PRODUCTLINE'].to_numpy()[sku],
+        'MSRP': msrp,
+        'PRODUCTCODE': skus['PRODUCTCODE'].to_numpy()[sku],
+    })
+    for col in cli.columns:
+        df[col] = cli[col].to_numpy()
+    df['DEALSIZE'] = np.where(ventas < 3000, 'Small', np.where(ventas < 7000, 'Medium', 'Large'))
+    return df[COLUMNAS], orden_inicial + n_pedidos
+
+
+class EscritorBloques:
+    """Escribe DataFrames por bloques en CSV (append) o Parquet (ParquetWriter de pyarrow)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.formato = 'parquet' if path.lower().endswith('.parquet') else 'csv'
+        self._writer = None
+        self._primero = True
+        if self.formato == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SystemExit("La salida Parquet requiere pyarrow (pip install pyarrow). Usá una salida .csv.")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def escribir(self, df: pd.DataFrame):
+        if self.formato == 'csv':
+            df.to_csv(self.path, mode='a', header=self._primero, index=False, encoding='latin-1')
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, tabla.schema, compression='snappy')
+            self._writer.write_table(tabla)
+        self._primero = False
+
+    def cerrar(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def generar(salida: str, filas: int, skus: int, clientes: int, meses: int, inicio: str,
+            estacionalidad: float, intermitencia: float, max_lineas: int, bloque: int, semilla: int) -> int:
+    """Genera el archivo completo. Devuelve la cantidad de filas escritas."""
+    if not 0 <= intermitencia < 1:
+        raise ValueError('intermitencia debe estar en [0, 1)')
+    semillas = np.random.SeedSequence(semilla)
+    rng_catalogo, rng_meses, rng_bloques = [np.random.default_rng(s) for s in semillas.spawn(3)]
+
+    cat_skus = crear_catalogo_skus(rng_catalogo, skus)
+    cat_clientes = crear_catalogo_clientes(rng_catalogo, clientes)
+    periodo = pd.Period(inicio, freq='M')
+    n_mes = filas_por_mes(rng_meses, filas, meses, periodo.month, estacionalidad)
+
+    escritor = EscritorBloques(salida)
+    orden = ORDEN_INICIAL
+    escritas = 0
+    t0 = time.perf_counter()
+    try:
+        for i, n in enumerate(n_mes):
+            p = periodo + i
+            # Intermitencia: cada SKU queda inactivo en el mes con probabilidad `intermitencia`
+            activos = rng_meses.random(skus) >= intermitencia
+            if not activos.any():
+                activos[rng_meses.integers(skus)] = True
+            for desde in range(0, int(n), bloque):
+                m = min(bloque, int(n) - desde)
+                df, orden = generar_bloque(rng_bloques, m, p.year, p.month, cat_skus, cat_clientes,
+                                           activos, orden, max_lineas)
+                escritor.escribir(df)
+                escritas += m
+            print(f"  {p}: {int(n):>12,} filas  (acumulado {escritas:,}, {time.perf_counter() - t0:.1f} s)")
+    finally:
+        escritor.cerrar()
+    return escritas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de líneas de pedido sintéticas (esquema sales_data_sample)')
+    parser.add_argument('--salida', default=SALIDA_DEFECTO, help='Archivo .csv o .parquet')
+    parser.add_argument('--filas', type=int, default=100_000, help='Total de líneas de pedido')
+    parser.add_argument('--skus', type=int, default=109)
+    parser.add_argument('--clientes', type=int, default=92)
+    parser.add_argument('--meses', type=int, default=29)
+    parser.add_argument('--inicio', default='2003-01', help='Primer mes (AAAA-MM)')
+    parser.add_argument('--estacionalidad', type=float, default=1.0,
+                        help='Intensidad de los picos Oct-Nov (0 = sin estacionalidad, 1 = como el original)')
+    parser.add_argument('--intermitencia', type=float, default=0.3,
+                        help='Probabilidad de que un SKU no venda en un mes dado')
+    parser.add_argument('--max-lineas', type=int, default=18, help='Máximo de líneas por pedido')
+    parser.add_argument('--bloque', type=int, default=1_000_000, help='Filas por bloque escrito')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("GENERADOR DE DATOS SINTÉTICOS")
+    print("=" * 60)
+    print(f"Filas: {args.filas:,} | SKUs: {args.skus} | Clientes: {args.clientes} | Meses: {args.meses} desde {args.inicio}")
+    t0 = time.perf_counter()
+    escritas = generar(args.salida, args.filas, args.skus, args.clientes, args.meses, args.inicio,
+                       args.estacionalidad, args.intermitencia, args.max_lineas, args.bloque, args.semilla)
+    seg = time.perf_counter() - t0
+    print(f"\n[OK] {escritas:,} filas en {seg:.1f} s ({escritas / max(seg, 1e-9):,.0f} filas/s)")
+    print(f"Archivo: {args.salida}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
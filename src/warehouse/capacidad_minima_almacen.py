@@ -2,9 +2,13 @@
 Cálculo de la Capacidad Mínima de Almacén requerida para soportar el pronóstico de demanda.
 - Utiliza los volúmenes de cada componente y los resultados del pronóstico/EOQ estacional.
 - Considera el máximo inventario esperado por componente y estación.
+- Lee las políticas (modo servicio) de outputs/resultados.db; si la base no las tiene, usa tabla_valores_clave.csv.
+- Salidas: capacidad_minima_almacen.csv (una fila por componente y estación),
+  capacidad_minima_almacen_totales.csv (totales por estación) y la tabla 'capacidades' de la base.
 """
 
 import os
+import sys
 import pandas as pd
 
 # Rutas
@@ -12,9 +16,19 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 output_dir = os.path.join(project_root, 'outputs', 'warehouse')
 os.makedirs(output_dir, exist_ok=True)
 
-# Cargar tabla de valores clave (resultado EOQ estacional)
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+from instrumentacion import traza
+from resultados_db import conectar, registrar_corrida, cargar_politicas, guardar_capacidades
+
+# Cargar políticas EOQ estacional (modo servicio): última corrida de la base, o el CSV como respaldo
 tabla_path = os.path.join(project_root, 'outputs', 'inventory', 'eoq_estacional', 'tabla_valores_clave.csv')
-tabla = pd.read_csv(tabla_path)
+traza.etapa('carga')
+con = conectar()
+# Mismo redondeo que tabla_valores_clave.csv, para no alterar las cifras publicadas
+tabla = cargar_politicas(con, modo='servicio').round(4)
+if tabla.empty:
+    tabla = pd.read_csv(tabla_path)
+traza.filas(len(tabla))
 
 # Definir volúmenes por componente (m³/unidad) según la definición del problema
 volumenes = {
@@ -26,6 +40,8 @@ volumenes = {
     # Agregar más componentes aquí si se amplía el análisis
 }
 
+traza.etapa('capacidad')
+traza.filas(len(tabla))
 # Calcular el inventario máximo esperado por componente y estación
 # Inventario máximo ≈ ROP + EOQ (o ROP + Q/2 + SS, según política)
 resultados = []
@@ -55,7 +71,7 @@ capacidad_df = capacidad_df.round(4)
 totales_estacion = capacidad_df.groupby('Estacion').agg({
     'Inventario_Maximo': 'sum',
     'Capacidad_Requerida_m3': 'sum'
-}).reset_index()
+}).reset_index().round(4)
 
 # Determinar estación con mayor necesidad
 idx_max = totales_estacion['Capacidad_Requerida_m3'].idxmax()
@@ -63,29 +79,23 @@ estacion_max = totales_estacion.loc[idx_max, 'Estacion']
 inv_max = totales_estacion.loc[idx_max, 'Inventario_Maximo']
 cap_max = totales_estacion.loc[idx_max, 'Capacidad_Requerida_m3']
 
-# Agregar fila de total de la estación más demandante
-total_row = {
-    'Componente': 'TOTAL',
-    'Estacion': f'{estacion_max} (mayor necesidad, suma de máximos por componente)',
-    'Inventario_Maximo': inv_max,
-    'Volumen_por_Unidad_m3': '—',
-    'Capacidad_Requerida_m3': cap_max
-}
-capacidad_df = pd.concat([capacidad_df, pd.DataFrame([total_row])], ignore_index=True)
+totales_estacion['Mayor_Necesidad'] = totales_estacion['Estacion'] == estacion_max
 
-# Guardar resultados principales
+traza.etapa('exportacion')
+# Guardar resultados: detalle y totales en archivos separados (sin filas de pie en el CSV)
 csv_path = os.path.join(output_dir, 'capacidad_minima_almacen.csv')
 capacidad_df.to_csv(csv_path, index=False)
+totales_path = os.path.join(output_dir, 'capacidad_minima_almacen_totales.csv')
+totales_estacion.to_csv(totales_path, index=False)
 
-# Guardar totales por estación y resumen en el mismo CSV (agregando como nuevas filas)
-with open(csv_path, 'a', encoding='utf-8') as f:
-    f.write('\n')
-    f.write('Totales por estación,,Inventario_Maximo,Capacidad_Requerida_m3\n')
-    for _, row in totales_estacion.iterrows():
-        f.write(f"{row['Estacion']},,{row['Inventario_Maximo']},{row['Capacidad_Requerida_m3']}\n")
-    f.write(f"\nEstación con mayor necesidad:,{estacion_max},Inventario_Maximo:,{inv_max},Capacidad_Requerida_m3:,{cap_max}\n")
+with con:
+    corrida = registrar_corrida(con, 'capacidad_almacen', {'volumenes': volumenes})
+    guardar_capacidades(con, corrida, capacidad_df)
+con.close()
+traza.fin()
 
 print("[OK] Capacidad mínima de almacén calculada y exportada a:", csv_path)
+print("[OK] Totales por estación:", totales_path)
 print(capacidad_df)
 print("\nTotales por estación:")
 print(totales_estacion)
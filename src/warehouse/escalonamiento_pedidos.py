@@ -0,0 +1,196 @@
+# ESCALONAMIENTO DE PEDIDOS PARA MINIMIZAR EL PICO DE ALMACÉN
+# -----------------------------------------------------------
+# Con la ocupación proyectada día a día (ocupacion_temporal.py), el pico depende de
+# la fase del ciclo de reposición de cada componente. Se eligen las fases de todos
+# los componentes de tabla_valores_clave.csv en una grilla de M posiciones por
+# ciclo (fase = m / M) para minimizar el pico anual de m³:
+#   1) Colocación golosa: de mayor a menor volumen de lote, cada ítem toma la fase
+#      que menos sube el pico de la ocupación acumulada hasta ese momento.
+#   2) Búsqueda local: se saca un ítem de la ocupación total (restando su aporte),
+#      se prueban sus M fases contra el resto y se lo reubica si baja el pico (o lo
+#      deja igual con menos m³·día por encima del P99). El total se actualiza
+#      restando y sumando el aporte del ítem, sin volver a sumar todos los ítems.
+# La demanda diaria de cada estación es Demanda_Estacion repartida en sus días;
+# Q y SS son los de la tabla (política de servicio).
+#
+# Entradas: outputs/resultados.db (o tabla_valores_clave.csv) y el pronóstico
+#           Prophet para el calendario
+# Salidas:  outputs/warehouse/escalonamiento_pedidos.csv (fase por componente)
+#           outputs/warehouse/escalonamiento_resumen.csv (pico por escenario)
+#
+# Uso: python src/warehouse/escalonamiento_pedidos.py --posiciones 48 --pasadas 20
+
+import os
+import sys
+import argparse
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+sys.path.insert(0, script_dir)
+
+from componentes import COMPONENTES
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from ocupacion_temporal import grilla_diaria, inventario
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'warehouse')
+TABLA_PATH = os.path.join(project_root, 'outputs', 'inventory', 'eoq_estacional', 'tabla_valores_clave.csv')
+
+
+# Datos --------------------------------------------------------------------------
+
+def trayectorias_base(tabla: pd.DataFrame, volumenes: pd.Series, grilla: dict, estacion_paso) -> dict:
+    """Demanda acumulada, Q, SS y volumen por ítem (ítems, pasos) desde la tabla por estación."""
+    nombres = list(ESTACIONES_FIJAS)
+    comps = [c for c in dict.fromkeys(tabla['Componente']) if c in volumenes.index]
+    pivote = {campo: tabla.pivot(index='Componente', columns='Estacion', values=campo).reindex(index=comps, columns=nombres)
+              for campo in ('Demanda_Estacion', 'EOQ', 'Stock_Seguridad')}
+    pasos_est = np.bincount(estacion_paso, minlength=len(nombres))
+    tasa = pivote['Demanda_Estacion'].to_numpy(dtype=float) / pasos_est           # por paso
+    return {
+        'componentes': comps,
+        'acumulada': np.cumsum(tasa[:, estacion_paso], axis=1),
+        'Q': pivote['EOQ'].to_numpy(dtype=float)[:, estacion_paso],
+        'SS': np.nan_to_num(pivote['Stock_Seguridad'].to_numpy(dtype=float))[:, estacion_paso],
+        'volumen': volumenes.reindex(comps).to_numpy(dtype=float),
+    }
+
+
+def aportes(datos: dict, i: int, fases) -> np.ndarray:
+    """m³ del ítem i en cada paso para cada fase candidata: (fases, pasos)."""
+    fases = np.asarray(fases, dtype=float)
+    C = np.broadcast_to(datos['acumulada'][i], (len(fases), datos['acumulada'].shape[1]))
+    return datos['volumen'][i] * inventario(C, datos['Q'][i], datos['SS'][i], fases)
+
+
+# Optimización -------------------------------------------------------------------
+
+def _mejor(resto, candidatos, p99: float):
+    """Fase candidata con menor pico de resto + aporte; empata por m³·día sobre p99."""
+    total = resto[None, :] + candidatos
+    pico = total.max(axis=1)
+    exceso = np.clip(total - p99, 0, None).sum(axis=1)
+    orden = np.lexsort((exceso, pico))
+    return orden[0], pico, exceso
+
+
+def escalonar(datos: dict, posiciones: int = 48, max_pasadas: int = 20) -> dict:
+    """Fases (índice de posición por ítem) por colocación golosa + búsqueda local."""
+    n, T = datos['acumulada'].shape
+    grilla = np.arange(posiciones) / posiciones
+    fase = np.zeros(n, dtype=int)
+    total = np.zeros(T)
+
+    # Colocación golosa: primero los lotes más voluminosos
+    orden = np.argsort(-np.nanmax(datos['volumen'][:, None] * datos['Q'], axis=1), kind='stable')
+    for i in orden:
+        candidatos = aportes(datos, i, grilla)                        # (posiciones, pasos)
+        fase[i], _, _ = _mejor(total, candidatos, np.inf)
+        total += candidatos[fase[i]]
+    total_goloso = total.copy()
+
+    # Búsqueda local con actualización incremental del total
+    pasadas, movimientos = 0, 0
+    for pasadas in range(1, max_pasadas + 1):
+        mejoras = 0
+        for i in orden:
+            candidatos = aportes(datos, i, grilla)
+            p99 = np.percentile(total, 99)
+            resto = total - candidatos[fase[i]]
+            nueva, pico, exceso = _mejor(resto, candidatos, p99)
+            actual = fase[i]
+            if (pico[nueva], exceso[nueva]) < (pico[actual], exceso[actual]):
+                total = resto + candidatos[nueva]
+                fase[i] = nueva
+                mejoras += 1
+        movimientos += mejoras
+        if not mejoras:
+            break
+    return {'fase': fase, 'fraccion': grilla[fase], 'total': total, 'total_goloso': total_goloso,
+            'pasadas': pasadas, 'movimientos': movimientos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fases de pedido que minimizan el pico de ocupación del almacén')
+    parser.add_argument('--posiciones', type=int, default=48, help='Fases candidatas por ciclo')
+    parser.add_argument('--pasadas', type=int, default=20, help='Máximo de pasadas de búsqueda local')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import conectar, cargar_politicas, leer_pronostico
+
+    traza.etapa('carga')
+    with closing(conectar()) as con:
+        # Mismo redondeo que tabla_valores_clave.csv, como en capacidad_minima_almacen.py
+        tabla = cargar_politicas(con, modo='servicio').round(4)
+    if tabla.empty:
+        tabla = pd.read_csv(TABLA_PATH)
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    grilla = grilla_diaria(df_pronostico['Periodo'])
+    estacion_paso = etiquetas_fijas(grilla['mes_calendario'])
+    volumenes = COMPONENTES.set_index('Componente')['Volumen_m3']
+    datos = trayectorias_base(tabla, volumenes, grilla, estacion_paso)
+    faltan = sorted(set(tabla['Componente']) - set(datos['componentes']))
+    if faltan:
+        print(f"[ADVERTENCIA] Componentes sin volumen definido (se omiten): {', '.join(faltan)}")
+
+    traza.etapa('optimizacion')
+    traza.filas(len(datos['componentes']))
+    res = escalonar(datos, args.posiciones, args.pasadas)
+    n = len(datos['componentes'])
+    cero = sum(aportes(datos, i, [0.0])[0] for i in range(n))
+
+    traza.etapa('exportacion')
+    nombres = list(ESTACIONES_FIJAS)
+    con_volumen = tabla[tabla['Componente'].isin(datos['componentes'])]
+    requerida = (con_volumen['Componente'].map(volumenes)
+                 * (con_volumen['ROP'] + con_volumen['EOQ'] + con_volumen['Stock_Seguridad'].fillna(0)))
+    por_estacion = requerida.groupby(con_volumen['Estacion']).sum().reindex(nombres)
+    escenarios = {'capacidad_minima_almacen': None, 'fases_cero': cero,
+                  'golosa': res['total_goloso'], 'busqueda_local': res['total']}
+    filas = []
+    for escenario, serie in escenarios.items():
+        fila = {'Escenario': escenario}
+        if escenario == 'capacidad_minima_almacen':
+            fila.update({f'Pico_{e}_m3': por_estacion[e] for e in nombres})
+            fila['Pico_m3'] = por_estacion.max()
+        else:
+            fila.update({f'Pico_{e}_m3': serie[estacion_paso == k].max() for k, e in enumerate(nombres)})
+            fila['Pico_m3'] = serie.max()
+        filas.append(fila)
+    resumen = pd.DataFrame(filas)[['Escenario', 'Pico_m3'] + [f'Pico_{e}_m3' for e in nombres]]
+    resumen['Reduccion_vs_Capacidad_Minima'] = 1 - resumen['Pico_m3'] / resumen.loc[0, 'Pico_m3']
+
+    propios = np.stack([aportes(datos, i, [res['fraccion'][i]])[0] for i in range(n)])
+    fases = pd.DataFrame({
+        'Componente': datos['componentes'],
+        'Fase_Ciclo': res['fraccion'],
+        # Primer paso en que el inventario sube: llega el primer lote del año
+        'Primer_Arribo': grilla['fecha'][np.argmax(np.diff(propios, axis=1) > 0, axis=1) + 1],
+        'Pico_Propio_m3': propios.max(axis=1),
+    })
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, 'escalonamiento_pedidos.csv')
+    fases.to_csv(salida, index=False)
+    resumen.to_csv(os.path.join(OUTPUT_DIR, 'escalonamiento_resumen.csv'), index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"ESCALONAMIENTO DE PEDIDOS ({args.posiciones} fases por ciclo, {res['pasadas']} pasadas, "
+          f"{res['movimientos']} movimientos)")
+    print("=" * 70)
+    print(fases.to_string(index=False, float_format=lambda x: f'{x:,.3f}'))
+    print()
+    print(resumen.to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# EOQ MULTI-ÍTEM CON RESTRICCIÓN DE VOLUMEN DE ALMACÉN
+# ----------------------------------------------------
+# capacidad_minima_almacen.py informa cuánto espacio pide la política sin
+# restricción (ROP + EOQ + SS por Volumen_m3). Con un almacén fijo, los lotes se
+# recortan minimizando el costo anual de pedir y mantener de todos los ítems:
+#   min  sum_i K*D_i/Q_i + h_i*Q_i/2   s.a.  sum_i v_i*(Q_i + F_i) <= C
+# donde F_i = ROP + SS es la ocupación que no depende del lote (la misma
+# definición de inventario máximo que capacidad_minima_almacen.py). Con el
+# multiplicador de Lagrange lambda (costo anual de un m³ más de almacén):
+#   Q_i(lambda) = sqrt(2*K*D_i / (h_i + 2*lambda*v_i))
+# La ocupación es decreciente en lambda; lambda se busca por bisección entre 0 y
+#   lambda_max = (sum_i sqrt(v_i*K*D_i) / (C - sum_i v_i*F_i))^2,
+# cota en la que la ocupación ya no supera C aun con h = 0. Cada paso recalcula
+# Q para todos los ítems y estaciones en una sola operación de arreglos.
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/warehouse/lote_restringido.csv (ítem x estación)
+#          outputs/warehouse/lote_restringido_estaciones.csv (lambda y ocupación)
+#
+# Uso: python src/warehouse/lote_restringido.py --capacidad 900
+#      python src/warehouse/lote_restringido.py --fraccion 0.8
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+
+from componentes import COMPONENTES, TASA_MANTENIMIENTO, COSTO_ORDENAR, matriz_demanda
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'warehouse')
+
+
+def _lote(D, h, volumen, lam, K):
+    return np.sqrt(2 * K * D / (h + 2 * lam * volumen))
+
+
+def eoq_restringido(D, h, volumen, capacidad, fijo=0.0, costo_ordenar=COSTO_ORDENAR,
+                    tol: float = 1e-9, max_iter: int = 200) -> dict:
+    """Lotes de mínimo costo con sum(v * (Q + fijo)) <= capacidad.
+
+    D, h, volumen y fijo son arreglos (ítems, ...) — p. ej. (ítems, estaciones) —;
+    capacidad es escalar o un arreglo con la forma de las columnas (...). Se
+    resuelve un lambda por columna. Una columna es infactible si la ocupación fija
+    ya llena el almacén; ahí Q queda en NaN. La bisección para cuando la ocupación
+    de todas las columnas activas está a menos de tol (relativo) de la capacidad,
+    siempre del lado factible.
+    """
+    D, h, volumen, fijo = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (D, h, volumen, fijo)])
+    K = float(costo_ordenar)
+    capacidad = np.broadcast_to(np.asarray(capacidad, dtype=float), D.shape[1:])
+    libre = capacidad - (volumen * fijo).sum(axis=0)
+    factible = libre > 0
+
+    Q0 = _lote(D, h, volumen, 0.0, K)
+    activa = factible & ((volumen * Q0).sum(axis=0) > libre)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lam_hi = np.where(activa, (np.sqrt(volumen * K * D).sum(axis=0) / libre) ** 2, 0.0)
+    lam_lo = np.zeros_like(lam_hi)
+    uso_hi = (volumen * _lote(D, h, volumen, lam_hi, K)).sum(axis=0)
+
+    pasadas = 0
+    for pasadas in range(1, max_iter + 1):
+        lam = (lam_lo + lam_hi) / 2
+        uso = (volumen * _lote(D, h, volumen, lam, K)).sum(axis=0)
+        excede = uso > libre
+        lam_lo = np.where(activa & excede, lam, lam_lo)
+        lam_hi = np.where(activa & ~excede, lam, lam_hi)
+        uso_hi = np.where(excede, uso_hi, uso)
+        if np.all(np.abs(uso_hi - libre)[activa] <= tol * libre[activa]):
+            break
+
+    lam = np.where(activa, lam_hi, 0.0)
+    Q = np.where(factible, _lote(D, h, volumen, lam, K), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        costo = np.where(Q > 0, K * D / Q, 0.0) + h * Q / 2
+        costo_libre = np.where(Q0 > 0, K * D / Q0, 0.0) + h * Q0 / 2
+    return {
+        'Q': Q, 'Q_Libre': Q0, 'lambda': lam, 'Activa': activa, 'Factible': factible,
+        'Ocupacion_m3': (volumen * (Q + fijo)).sum(axis=0),
+        'Ocupacion_Libre_m3': (volumen * (Q0 + fijo)).sum(axis=0),
+        'Costo': costo, 'Costo_Libre': costo_libre, 'pasadas': pasadas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EOQ multi-ítem con restricción de volumen de almacén')
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--capacidad', type=float, help='Volumen disponible del almacén (m³)')
+    grupo.add_argument('--fraccion', type=float, default=0.8,
+                       help='Sin --capacidad: fracción del espacio de los lotes EOQ que entra en el almacén, '
+                            'en la estación de mayor necesidad (default 0.8)')
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nombres = list(ESTACIONES_FIJAS)
+
+    traza.etapa('optimizacion')
+    traza.filas(demanda.shape[0])
+    # Política de servicio: EOQ anual y ROP/SS por estación, como en capacidad_minima_almacen.py
+    servicio = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                  componentes['Lead_Time_Semanas'],
+                                  lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])['servicio']
+    D_anual = demanda.sum(axis=1)[:, None]
+    h = componentes['Costo_Unitario'].to_numpy(dtype=float)[:, None] * TASA_MANTENIMIENTO
+    volumen = componentes['Volumen_m3'].to_numpy(dtype=float)[:, None]
+    fijo = servicio['ROP'] + np.nan_to_num(servicio['Stock_Seguridad'])
+    D, h, volumen = (np.broadcast_to(x, fijo.shape) for x in (D_anual, h, volumen))
+    if args.capacidad is not None:
+        capacidad = args.capacidad
+    else:
+        # El ROP y el SS no se pueden recortar: la fracción se aplica al espacio de los lotes
+        capacidad = ((volumen * fijo).sum(axis=0) + args.fraccion * (volumen * servicio['EOQ']).sum(axis=0)).max()
+    res = eoq_restringido(D, h, volumen, capacidad, fijo)
+
+    traza.etapa('exportacion')
+    filas = []
+    for k, nombre in enumerate(nombres):
+        filas.append(pd.DataFrame({
+            'Componente': componentes['Componente'].to_numpy(),
+            'Estacion': nombre,
+            'Volumen_por_Unidad_m3': volumen[:, k],
+            'Ocupacion_Fija': fijo[:, k],
+            'EOQ': res['Q_Libre'][:, k],
+            'Q_Restringido': res['Q'][:, k],
+            'Inventario_Maximo': fijo[:, k] + res['Q'][:, k],
+            'Capacidad_Requerida_m3': volumen[:, k] * (fijo[:, k] + res['Q'][:, k]),
+            'Costo_Anual_EOQ': res['Costo_Libre'][:, k],
+            'Costo_Anual_Restringido': res['Costo'][:, k],
+        }))
+    tabla = pd.concat(filas, ignore_index=True)
+    estaciones = pd.DataFrame({
+        'Estacion': nombres,
+        'Capacidad_m3': np.broadcast_to(capacidad, (len(nombres),)),
+        'Ocupacion_Sin_Restriccion_m3': res['Ocupacion_Libre_m3'],
+        'Ocupacion_m3': res['Ocupacion_m3'],
+        'Multiplicador_m3_Anual': res['lambda'],
+        'Restriccion_Activa': res['Activa'],
+        'Factible': res['Factible'],
+        'Costo_Extra_Anual': np.nansum(res['Costo'] - res['Costo_Libre'], axis=0),
+    })
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    salida = os.path.join(OUTPUT_DIR, 'lote_restringido.csv')
+    tabla.to_csv(salida, index=False)
+    salida_est = os.path.join(OUTPUT_DIR, 'lote_restringido_estaciones.csv')
+    estaciones.to_csv(salida_est, index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"EOQ CON RESTRICCIÓN DE VOLUMEN ({res['pasadas']} pasadas de bisección)")
+    print("=" * 70)
+    cols = ['Componente', 'Estacion', 'EOQ', 'Q_Restringido', 'Capacidad_Requerida_m3', 'Costo_Anual_Restringido']
+    print(tabla[cols].to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    print()
+    print(estaciones.to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+    for fila in estaciones[~estaciones['Factible']].itertuples():
+        print(f"[ADVERTENCIA] {fila.Estacion}: el ROP y el SS ya ocupan más de {fila.Capacidad_m3:,.1f} m³")
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+# OCUPACIÓN TEMPORAL DEL ALMACÉN
+# ------------------------------
+# capacidad_minima_almacen.py suma por componente ROP + EOQ + SS, como si todos
+# los ítems tuvieran su máximo el mismo día. Acá se proyecta el diente de sierra de
+# cada componente en una grilla diaria (o más fina) del año pronosticado:
+#   I_i(t) = SS_i(t) + Q_i * (1 - frac(C_i(t) / Q_i + fase_i))   (Q constante)
+# con C_i(t) la demanda acumulada (la mensual del pronóstico repartida por día) y
+# fase_i en [0, 1) la fracción del ciclo ya consumida al arrancar el año (cuándo
+# llegó el último pedido). Con demanda determinística el pedido sale al cruzar el ROP y
+# llega cuando quedan SS unidades, así que la fase resume el calendario de pedidos.
+# Si Q cambia de estación (modo costo), el lote en curso se termina con su tamaño
+# y el Q nuevo rige desde la llegada siguiente (lote_restante, por tramos de Q
+# constante): el inventario solo sube cuando llega un pedido.
+# La ocupación del almacén es sum_i v_i * I_i(t), por bloques de réplicas (einsum).
+# El resumen por estación separa las tres fuentes de la diferencia con la suma de
+# máximos de capacidad_minima_almacen.py, v (ROP + Q + SS):
+#   - Pico_Sincronizado: v (SS + Q), todos los ítems recién repuestos el mismo día;
+#     la diferencia con la suma de máximos es el término del ROP (Termino_ROP).
+#   - Pico_Fases_Cero: todas las fases en cero al arrancar el año. Con demanda
+#     que varía en el tiempo los ciclos se desfasan solos, así que puede quedar
+#     por debajo del pico sincronizado y aun del pico medio con fases al azar.
+#   - Pico y percentiles con fases al azar (--replicas sorteos).
+#
+# Entrada: pronóstico Prophet (outputs/forecast/prophet/prophet_forecast.csv)
+# Salidas: outputs/warehouse/ocupacion_temporal.csv (resumen por estación)
+#          outputs/warehouse/ocupacion_temporal_diaria.csv (trayectoria)
+#
+# Uso: python src/warehouse/ocupacion_temporal.py --replicas 200 --pasos-dia 1
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'pipeline'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'inventory'))
+
+from componentes import COMPONENTES, matriz_demanda
+from estaciones import ESTACIONES_FIJAS, etiquetas_fijas
+from motor_politicas import calcular_politicas
+
+OUTPUT_DIR = os.path.join(project_root, 'outputs', 'warehouse')
+PERCENTILES = (50, 95, 99)
+
+
+# Grilla temporal ----------------------------------------------------------------
+
+def grilla_diaria(periodos, pasos_dia: int = 1) -> dict:
+    """Pasos de la grilla para los meses del pronóstico (el inventario se mide al final de cada paso).
+
+    Devuelve el índice de mes y la fecha de cada paso, y la fracción del mes que
+    cubre cada paso (para repartir la demanda mensual).
+    """
+    meses = pd.to_datetime(pd.Series(periodos)).dt.to_period('M')
+    dias = meses.dt.days_in_month.to_numpy()
+    pasos_mes = dias * pasos_dia
+    mes_de_paso = np.repeat(np.arange(len(meses)), pasos_mes)
+    inicio = meses.dt.start_time.to_numpy()
+    offset = np.concatenate([np.arange(n) for n in pasos_mes])
+    fechas = np.repeat(inicio, pasos_mes) + pd.to_timedelta(offset / pasos_dia, unit='D').to_numpy()
+    return {'mes': mes_de_paso, 'fecha': fechas, 'fraccion': 1.0 / pasos_mes[mes_de_paso],
+            'mes_calendario': meses.dt.month.to_numpy()[mes_de_paso]}
+
+
+def demanda_acumulada(demanda, grilla: dict) -> np.ndarray:
+    """Demanda acumulada (ítems, pasos) al final de cada paso, a tasa constante dentro del mes."""
+    por_paso = demanda[:, grilla['mes']] * grilla['fraccion']
+    return np.cumsum(por_paso, axis=1)
+
+
+# Motor --------------------------------------------------------------------------
+
+def lote_restante(acumulada, Q, fase) -> np.ndarray:
+    """Unidades que quedan del último lote recibido (..., pasos); fase por fila.
+
+    Con Q constante es Q (1 - frac(C / Q + fase)). Cuando Q cambia de estación, el
+    lote en curso conserva el tamaño con que se pidió y el Q nuevo rige desde la
+    llegada siguiente: se avanza por tramos de Q constante, y en cada tramo lo que
+    quedaba R se consume primero y después se repite el ciclo de Q. Así el
+    inventario solo sube cuando llega un pedido. Pasos sin lote (Q <= 0 o NaN) dan 0.
+    """
+    acumulada = np.asarray(acumulada, dtype=float)
+    fase = np.asarray(fase, dtype=float)[..., None]
+    forma = np.broadcast_shapes(acumulada.shape, fase.shape, np.shape(Q))
+    acumulada = np.broadcast_to(acumulada, forma)
+    hay_lote = np.broadcast_to(np.nan_to_num(Q) > 0, forma)
+    Q_seg = np.where(hay_lote, np.nan_to_num(Q), 1.0)
+    cambia = np.any(Q_seg[..., 1:] != Q_seg[..., :-1], axis=tuple(range(len(forma) - 1)))
+    limites = np.concatenate([[0], np.flatnonzero(cambia) + 1, [forma[-1]]])
+
+    restante = np.empty(forma)
+    R = Q_seg[..., :1] * (1 - fase)                                # lo que queda al arrancar
+    C0 = np.zeros_like(R)
+    for a, b in zip(limites[:-1], limites[1:]):
+        q = Q_seg[..., a:b]
+        x = acumulada[..., a:b] - C0                                 # consumido en el tramo
+        v = np.maximum(x - R, 0) / q                                 # ciclos completos de q
+        restante[..., a:b] = np.where(x < R, R - x, q * (1 - (v - np.floor(v))))
+        R = np.where(hay_lote[..., b - 1:b], restante[..., b - 1:b], 0.0)
+        C0 = acumulada[..., b - 1:b]
+    return np.where(hay_lote, restante, 0.0)
+
+
+def inventario(acumulada, Q, SS, fase) -> np.ndarray:
+    """Inventario a mano (filas, pasos) del diente de sierra; Q y SS por paso, fase por fila.
+
+    Ítems sin lote (Q <= 0 o NaN) quedan con su SS.
+    """
+    return np.nan_to_num(SS) + lote_restante(acumulada, Q, fase)
+
+
+def sincronizada(Q, SS, volumen) -> np.ndarray:
+    """m³ por paso si todos los ítems estuvieran recién repuestos a la vez: v (SS + Q)."""
+    return volumen @ (np.nan_to_num(SS) + np.where(np.nan_to_num(Q) > 0, Q, 0.0))
+
+
+def ocupacion(acumulada, Q, SS, volumen, fases, bloque: int = 16) -> np.ndarray:
+    """Ocupación en m³ (réplicas, pasos) para cada vector de fases (réplicas, ítems).
+
+    Igual a volumen @ inventario(...) por réplica, con las réplicas en bloques.
+    """
+    fases = np.atleast_2d(np.asarray(fases, dtype=float))
+    base = volumen @ np.nan_to_num(SS)                             # m³ del SS por paso
+    salida = np.empty((len(fases), acumulada.shape[1]))
+    for i in range(0, len(fases), bloque):
+        restante = lote_restante(acumulada[None], Q[None], fases[i:i + bloque])
+        salida[i:i + bloque] = base + np.einsum('rit,i->rt', restante, volumen)
+    return salida
+
+
+def resumir(ocup: np.ndarray, ocup_fases_cero: np.ndarray, lleno: np.ndarray, estacion_paso, nombres,
+            suma_maximos) -> pd.DataFrame:
+    """Pico y percentiles de ocupación por estación (sobre pasos y réplicas).
+
+    lleno es la ocupación sincronizada v (SS + Q) por paso (ver sincronizada()).
+    """
+    filas = []
+    for k, nombre in enumerate(nombres):
+        en_est = estacion_paso == k
+        bloque = ocup[:, en_est]
+        picos = bloque.max(axis=1)
+        fila = {
+            'Estacion': nombre,
+            'Suma_Maximos_m3': suma_maximos[k],
+            'Termino_ROP_m3': suma_maximos[k] - lleno[en_est].max(),
+            'Pico_Sincronizado_m3': lleno[en_est].max(),
+            'Pico_Fases_Cero_m3': ocup_fases_cero[en_est].max(),
+            'Pico_Medio_m3': picos.mean(),
+            'Pico_P95_m3': np.percentile(picos, 95),
+            'Pico_Maximo_m3': picos.max(),
+            'Ocupacion_Media_m3': bloque.mean(),
+        }
+        for p, valor in zip(PERCENTILES, np.percentile(bloque, PERCENTILES)):
+            fila[f'Ocupacion_P{p}_m3'] = valor
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ocupación del almacén día a día (diente de sierra por ítem)')
+    parser.add_argument('--modo', choices=['servicio', 'costo'], default='servicio')
+    parser.add_argument('--replicas', type=int, default=200, help='Sorteos de fases de pedido')
+    parser.add_argument('--pasos-dia', type=int, default=1, help='Pasos de la grilla por día')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    from instrumentacion import traza
+    from resultados_db import leer_pronostico
+
+    traza.etapa('carga')
+    df_pronostico = leer_pronostico('prophet', os.path.join(project_root, 'outputs', 'forecast',
+                                                            'prophet', 'prophet_forecast.csv'))
+    componentes = COMPONENTES
+    demanda = matriz_demanda(componentes, df_pronostico)
+    estacion_mes = etiquetas_fijas(pd.to_datetime(df_pronostico['Periodo']).dt.month.to_numpy())
+    nombres = list(ESTACIONES_FIJAS)
+    politica = calcular_politicas(demanda, estacion_mes, componentes['Costo_Unitario'],
+                                  componentes['Lead_Time_Semanas'],
+                                  lead_time_desvio_semanas=componentes['Lead_Time_Desvio_Semanas'])[args.modo]
+    volumen = componentes['Volumen_m3'].to_numpy(dtype=float)
+
+    traza.etapa('simulacion')
+    grilla = grilla_diaria(df_pronostico['Periodo'], args.pasos_dia)
+    estacion_paso = estacion_mes[grilla['mes']]
+    traza.filas(demanda.shape[0] * len(estacion_paso) * (args.replicas + 1))
+    acumulada = demanda_acumulada(demanda, grilla)
+    Q = politica['EOQ'][:, estacion_paso]
+    SS = politica.get('Stock_Seguridad', np.zeros_like(politica['EOQ']))[:, estacion_paso]
+    rng = np.random.default_rng(args.semilla)
+    fases = rng.uniform(0, 1, (args.replicas, len(volumen)))
+    ocup = ocupacion(acumulada, Q, SS, volumen, fases)
+    ocup_cero = ocupacion(acumulada, Q, SS, volumen, np.zeros((1, len(volumen))))[0]
+
+    # Definición de capacidad_minima_almacen.py: ROP + EOQ + SS por ítem, todos a la vez
+    suma_maximos = (volumen[:, None] * (politica['ROP'] + politica['EOQ']
+                                        + np.nan_to_num(politica.get('Stock_Seguridad', 0.0)))).sum(axis=0)
+    resumen = resumir(ocup, ocup_cero, sincronizada(Q, SS, volumen), estacion_paso, nombres, suma_maximos)
+    diaria = pd.DataFrame({
+        'Fecha': grilla['fecha'],
+        'Estacion': np.asarray(nombres)[estacion_paso],
+        'Ocupacion_Fases_Cero_m3': ocup_cero,
+        'Ocupacion_Media_m3': ocup.mean(axis=0),
+        'Ocupacion_P95_m3': np.percentile(ocup, 95, axis=0),
+        'Ocupacion_Maxima_m3': ocup.max(axis=0),
+    })
+
+    traza.etapa('exportacion')
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sufijo = '' if args.modo == 'servicio' else '_costo'
+    salida = os.path.join(OUTPUT_DIR, f'ocupacion_temporal{sufijo}.csv')
+    resumen.to_csv(salida, index=False)
+    diaria.to_csv(os.path.join(OUTPUT_DIR, f'ocupacion_temporal_diaria{sufijo}.csv'), index=False)
+    traza.fin()
+
+    print("=" * 70)
+    print(f"OCUPACIÓN TEMPORAL DEL ALMACÉN (modo {args.modo}, {args.replicas} sorteos de fases)")
+    print("=" * 70)
+    print(resumen.to_string(index=False, float_format=lambda x: f'{x:,.1f}'))
+    print("\nDiferencia entre la suma de máximos y el pico medio con fases al azar:")
+    for fila in resumen.itertuples(index=False):
+        print(f"  {fila.Estacion}: {fila.Termino_ROP_m3:,.1f} m³ del término ROP + "
+              f"{fila.Pico_Sincronizado_m3 - fila.Pico_Medio_m3:,.1f} m³ por ciclos desfasados")
+    print(f"\n[OK] Resultados exportados a: {salida}")
+
+
+if __name__ == '__main__':
+    main()